@@ -11,9 +11,12 @@ from .models.v3_binds import *
 from .exceptions import *
 from .utils import *
 from .fetch import *
+from .metrics import *
+from .tracing import *
+from .slow_operations import *
 from .config import *
 from .module import *
-from .database.mongodb import fetch_item, update_item
+from .database.mongodb import ensure_indexes, fetch_item, update_item
 from .database.redis import redis
 
 logging.basicConfig(level=CONFIG.LOG_LEVEL)
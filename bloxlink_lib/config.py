@@ -11,6 +11,16 @@ class BaseConfig(BaseSettings):
     #############################
     LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
     SENTRY_DSN: str | None = None
+    # spans are sent to the OpenTelemetry tracer provider of the app if opentelemetry-api is installed,
+    # otherwise to Sentry
+    TRACING_ENABLED: bool = False
+    # operations slower than these thresholds are logged; set a threshold to 0 to log every call
+    SLOW_FETCH_SECONDS: float = 2
+    SLOW_DATABASE_SECONDS: float = 0.5
+    SLOW_REDIS_SECONDS: float = 0.1
+    SLOW_BIND_EVALUATION_SECONDS: float = 3  # includes the Roblox requests a bind makes, so above SLOW_FETCH_SECONDS
+    SLOW_LOG_SAMPLE_RATE: float = 1  # ratio of slow operations that are logged
+    SLOW_LOG_PER_SECOND: float = 5  # max slow operations logged per second
     NODE_LOCK_TTL: int = 600
     #############################
     # BOT SETTINGS
@@ -20,10 +30,22 @@ class BaseConfig(BaseSettings):
 
     BOT_API: str | None = None
     BOT_API_AUTH: str | None = None
+    # set if the bot API accepts comma-separated IDs at /users?ids=, otherwise users are synced one by one
+    BOT_API_BATCH_USERS: bool = False
 
     PROXY_URL: str | None = None
+    # a pool of proxies to spread Roblox requests over, by health. PROXY_URL is used if this is empty
+    PROXY_URLS: list[str] = []
     DISCORD_PROXY_URL: str | None = None
 
+    # latency-critical GETs get a second attempt once they are slower than HEDGE_PERCENTILE of recent requests
+    HEDGE_REQUESTS: bool = False
+    HEDGE_PERCENTILE: float = 0.95
+    HEDGE_BUDGET: float = 0.1  # at most this ratio of extra requests
+    HEDGE_PROXY_URL: str | None = None  # proxy for the second attempt, if not PROXY_URL
+    # requests paginate() sends to each host per second, to stay under the rate limits of list endpoints
+    PAGINATE_REQUESTS_PER_SECOND: float = 10
+
     SHARD_COUNT: int | None = None
     SHARDS_PER_NODE: int | None = None
     #############################
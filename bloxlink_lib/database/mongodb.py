@@ -2,15 +2,35 @@ from __future__ import annotations
 
 import asyncio
 import datetime
+import json
 import os
-from typing import Type, TYPE_CHECKING
+import time
+from typing import Final, Type, TYPE_CHECKING
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from bloxlink_lib.config import CONFIG
 from bloxlink_lib.database.redis import redis  # pylint: disable=no-name-in-module
+from bloxlink_lib.metrics import METRICS
+from bloxlink_lib.slow_operations import slow_operation
+from bloxlink_lib.tracing import span
+from bloxlink_lib.validators import TRUSTED_DATA_CONTEXT
 
 mongo: AsyncIOMotorClient = None
 
+# prefixes the marker set next to each cached value that was migrated and JSON-encoded before it was cached
+TRUSTED_CACHE_PREFIX: Final[str] = "_trusted:"
+
+ITEM_LOOKUPS: Final = METRICS.counter(
+    "bloxlink_item_lookups_total",
+    "How many item lookups each storage tier could answer.",
+    ("domain", "tier", "result"),
+)
+ITEM_FETCH_SECONDS: Final = METRICS.histogram(
+    "bloxlink_item_fetch_seconds",
+    "How long fetching an item takes, by the tier that served it.",
+    ("domain", "served_from"),
+)
+
 if TYPE_CHECKING:
     from bloxlink_lib.models.schemas import BaseSchema
 
@@ -44,6 +64,27 @@ def connect_database():
     mongo.get_io_loop = asyncio.get_running_loop
 
 
+async def ensure_indexes():
+    """Create the indexes declared in DATABASE_INDEXES for every database domain.
+    Existing indexes are left as they are, so this is safe to call on every startup.
+
+    connect_database() runs when this module is imported, before an event loop is running, so it
+    cannot create the indexes itself. Services await this once at startup, after their event loop starts.
+    """
+
+    from bloxlink_lib.models.schemas import (  # pylint: disable=import-outside-toplevel
+        DATABASE_INDEXES,
+    )
+
+    await asyncio.gather(
+        *(
+            mongo.bloxlink[database_domain.value].create_indexes(indexes)
+            for database_domain, indexes in DATABASE_INDEXES.items()
+            if indexes
+        )
+    )
+
+
 async def _db_fetch[T: "BaseSchema"](
     constructor: Type[T], item_id: str, *aspects
 ) -> dict:
@@ -51,9 +92,13 @@ async def _db_fetch[T: "BaseSchema"](
 
     database_domain = constructor.database_domain().value
 
-    item = await mongo.bloxlink[database_domain].find_one(
-        {"_id": item_id}, {x: True for x in aspects}
-    ) or {"_id": item_id}
+    with slow_operation(
+        "mongo.find_one", CONFIG.SLOW_DATABASE_SECONDS, f"{database_domain}:{item_id}"
+    ) as timed_operation:
+        item = await mongo.bloxlink[database_domain].find_one(
+            {"_id": item_id}, {x: True for x in aspects}
+        ) or {"_id": item_id}
+        timed_operation.payload_size = len(item)
 
     return item
 
@@ -65,15 +110,56 @@ async def _db_update[T: "BaseSchema"](
 
     database_domain = constructor.database_domain().value
 
-    await mongo.bloxlink[database_domain].update_one(
-        {"_id": item_id},
-        {
-            "$set": set_aspects,
-            "$unset": unset_aspects,
-            "$currentDate": {"updatedAt": True},
-        },
-        upsert=True,
-    )
+    with slow_operation(
+        "mongo.update_one", CONFIG.SLOW_DATABASE_SECONDS, f"{database_domain}:{item_id}"
+    ) as timed_operation:
+        timed_operation.payload_size = len(set_aspects) + len(unset_aspects)
+
+        await mongo.bloxlink[database_domain].update_one(
+            {"_id": item_id},
+            {
+                "$set": set_aspects,
+                "$unset": unset_aspects,
+                "$currentDate": {"updatedAt": True},
+            },
+            upsert=True,
+        )
+
+
+def _load_trusted_values(cached_item: dict[str, str]) -> tuple[dict, bool]:
+    """Split the trust markers out of a cached item, and decode the values they mark.
+
+    Args:
+        cached_item (dict[str, str]): The cached fields of the item, including the trust markers.
+
+    Returns:
+        tuple[dict, bool]: The cached values, and whether all of them were trusted.
+    """
+
+    markers = {
+        key.removeprefix(TRUSTED_CACHE_PREFIX)
+        for key in cached_item
+        if key.startswith(TRUSTED_CACHE_PREFIX)
+    }
+    item = {}
+    trusted = True
+
+    for key, value in cached_item.items():
+        if key.startswith(TRUSTED_CACHE_PREFIX):
+            continue
+
+        if key in markers:
+            try:
+                item[key] = json.loads(value)
+                continue
+            except json.JSONDecodeError:
+                pass
+
+        # written by something other than update_item(), so it is validated as usual
+        item[key] = value
+        trusted = False
+
+    return item, trusted
 
 
 async def fetch_item[T: "BaseSchema"](
@@ -82,52 +168,88 @@ async def fetch_item[T: "BaseSchema"](
     """
     Fetch an item from local cache, then redis, then database.
     Will populate caches for later access
+
+    If aspects are given, a projection of the item is returned which only validates those aspects.
     """
 
     # should check local cache but for now just fetch from redis
 
     database_domain = constructor.database_domain().value
+    started_at = time.perf_counter()
 
     if aspects:
-        item = await redis.hmget(f"{database_domain}:{item_id}", *aspects)
-        item = {x: y for x, y in zip(aspects, item) if y is not None}
-    else:
-        item = await redis.hgetall(f"{database_domain}:{item_id}")
-
-    if not item:
-        item = await _db_fetch(constructor, item_id, *aspects)
-
-        if item and not isinstance(item, (list, dict)):
-            if aspects:
-                items = {
-                    x: item[x]
-                    for x in aspects
-                    if item.get(x) and not isinstance(item[x], dict)
-                }
-
-                if items:
-                    async with redis.pipeline() as pipeline:
-                        await pipeline.hmset(f"{database_domain}:{item_id}", items)
-                        await pipeline.expire(
-                            f"{database_domain}:{item_id}",
-                            int(datetime.timedelta(hours=1).total_seconds()),
-                        )
-                        await pipeline.execute()
-            else:
-                async with redis.pipeline() as pipeline:
-                    await pipeline.hmset(f"{database_domain}:{item_id}", item)
-                    await pipeline.expire(
-                        f"{database_domain}:{item_id}",
-                        int(datetime.timedelta(hours=1).total_seconds()),
-                    )
-                    await pipeline.execute()
+        aspects = constructor.expand_aspects(*aspects)
+
+    with (
+        span("fetch_item.redis", domain=database_domain) as redis_span,
+        slow_operation(
+            "redis.hmget" if aspects else "redis.hgetall",
+            CONFIG.SLOW_REDIS_SECONDS,
+            f"{database_domain}:{item_id}",
+        ) as timed_operation,
+    ):
+        if aspects:
+            fields = [*aspects, *(f"{TRUSTED_CACHE_PREFIX}{x}" for x in aspects)]
+            values = await redis.hmget(f"{database_domain}:{item_id}", *fields)
+            cached_item = {x: y for x, y in zip(fields, values) if y is not None}
+        else:
+            cached_item = await redis.hgetall(f"{database_domain}:{item_id}")
+
+        item, trusted = _load_trusted_values(cached_item)
+
+        timed_operation.payload_size = len(item)
+
+        # aspects that Redis does not hold still need to come from the database
+        missing_aspects = [x for x in aspects if x not in item]
+        redis_hit = bool(item) and not missing_aspects
+        redis_span.set_attribute("cache.hit", redis_hit)
+
+    served_from = "redis"
+
+    ITEM_LOOKUPS.inc(
+        domain=database_domain,
+        tier="redis",
+        result="hit" if redis_hit else "miss",
+    )
+
+    if not redis_hit:
+        served_from = "database"
+
+        with span("fetch_item.database", domain=database_domain) as database_span:
+            db_item = await _db_fetch(
+                constructor, item_id, *(missing_aspects or aspects)
+            )
+            database_span.set_attribute("cache.hit", bool(db_item))
+
+        ITEM_LOOKUPS.inc(
+            domain=database_domain,
+            tier="database",
+            result="hit" if db_item else "miss",
+        )
+
+        item = {
+            **db_item,
+            **item,
+        }
 
     if item.get("_id"):
         item.pop("_id")
 
     item["id"] = item_id
 
-    return constructor(**item)
+    ITEM_FETCH_SECONDS.observe(
+        time.perf_counter() - started_at,
+        domain=database_domain,
+        served_from=served_from,
+    )
+
+    model = constructor.projection(*aspects) if aspects else constructor
+
+    # values cached by update_item() were already migrated, so the migrators can be skipped
+    if redis_hit and trusted:
+        return model.model_validate(item, context=TRUSTED_DATA_CONTEXT)
+
+    return model(**item)
 
 
 async def update_item[T: "BaseSchema"](
@@ -150,24 +272,33 @@ async def update_item[T: "BaseSchema"](
             set_aspects[key] = val
 
     # validate the model to ensure no invalid fields are being set
-    constructor.model_validate({"id": item_id, **aspects})
+    validated_item = constructor.model_validate({"id": item_id, **aspects})
 
     await _db_update(constructor, item_id, set_aspects, unset_aspects)
 
     if unset_aspects:
-        await redis.hdel(f"{database_domain}:{item_id}", *unset_aspects.keys())
+        await redis.hdel(
+            f"{database_domain}:{item_id}",
+            *unset_aspects.keys(),
+            *(f"{TRUSTED_CACHE_PREFIX}{x}" for x in unset_aspects),
+        )
 
     if set_aspects:
-        cacheable_aspects = {
-            key: value
-            for key, value in set_aspects.items()
-            if not isinstance(value, (dict, list, bool))
-        }
+        # the migrated values are cached as JSON, each with a marker so that fetch_item() can trust it
+        cacheable_aspects = {}
+
+        for key, value in validated_item.model_dump(
+            mode="json", include=set(set_aspects)
+        ).items():
+            if value is not None:
+                cacheable_aspects[key] = json.dumps(value)
+                cacheable_aspects[f"{TRUSTED_CACHE_PREFIX}{key}"] = "1"
 
         if cacheable_aspects:
             async with redis.pipeline() as pipeline:
                 await pipeline.hset(
-                    f"{database_domain}:{item_id}", mapping=cacheable_aspects
+                    f"{database_domain}:{item_id}",
+                    mapping=cacheable_aspects,
                 )
                 await pipeline.expire(
                     f"{database_domain}:{item_id}",
@@ -49,6 +49,12 @@ class RobloxDown(Error):
     status_code = HTTPStatus.SERVICE_UNAVAILABLE
 
 
+class DeadlineExceeded(RobloxDown):
+    """Raised when a request is abandoned because the deadline of its context has passed."""
+
+    status_code = HTTPStatus.GATEWAY_TIMEOUT
+
+
 class UserNotVerified(Error):
     """Raised when a user is not verified."""
 
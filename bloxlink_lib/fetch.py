@@ -1,26 +1,390 @@
 import asyncio
+import codecs
+from collections import deque
+from contextvars import ContextVar
+import json
 import logging
+import random
+import re
+import time
+from contextlib import ExitStack, asynccontextmanager, contextmanager
 from http import HTTPStatus
-from typing import Literal, Type, Union, Tuple, Any, Final
+from urllib.parse import urlparse
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Final,
+    Iterator,
+    Literal,
+    Tuple,
+    Type,
+    Union,
+)
 from requests.utils import requote_uri
-from aiohttp_retry import RetryClient, ExponentialRetry
 import aiohttp
 from pydantic_core import to_json
-from bloxlink_lib.models.base import BaseModel, BaseResponse
+from bloxlink_lib.models.base import BaseModel, BaseResponse, CursorPage
 from bloxlink_lib.utils import parse_into
 
-from .exceptions import RobloxAPIError, RobloxDown, RobloxNotFound
+from .exceptions import DeadlineExceeded, RobloxAPIError, RobloxDown, RobloxNotFound
 from .config import CONFIG
+from .metrics import METRICS
+from .slow_operations import record_operation
+from .tracing import span
 
-__all__ = ("fetch", "fetch_typed")
+__all__ = (
+    "fetch",
+    "fetch_typed",
+    "fetch_list_items",
+    "paginate",
+    "request_deadline",
+    "remaining_request_time",
+)
 
 MAX_HTTP_RETRIES: Final[int] = 3
+RETRY_BACKOFF_BASE: Final[float] = 0.1
+RETRY_BACKOFF_MAX: Final[float] = 5
+RETRY_BUDGET_RATIO: Final[float] = 0.2
+RETRY_BUDGET_MAX_TOKENS: Final[float] = 10
+RETRYABLE_METHODS: Final[set[str]] = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRYABLE_STATUSES: Final[set[int]] = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+RETRYABLE_EXCEPTIONS: Final[tuple[type[Exception], ...]] = (
+    aiohttp.ClientConnectorError,
+    aiohttp.ServerDisconnectedError,
+)
+# the request headers that make a 304 Not Modified a successful response
+CONDITIONAL_HEADERS: Final[frozenset[str]] = frozenset(
+    {"if-none-match", "if-modified-since"}
+)
+HEDGE_MIN_SAMPLES: Final[int] = 20
+HEDGE_LATENCY_WINDOW: Final[int] = 200
+HEDGE_MAX_TOKENS: Final[float] = 10
+PROXY_EWMA_ALPHA: Final[float] = 0.2
+PROXY_EJECT_ERROR_RATE: Final[float] = 0.5
+PROXY_EJECT_SECONDS: Final[float] = 30
+
+HTTP_REQUEST_SECONDS: Final = METRICS.histogram(
+    "bloxlink_http_request_seconds",
+    "How long HTTP requests take until their response, including retries.",
+    ("host", "endpoint", "status"),
+)
+HTTP_RETRIES: Final = METRICS.counter(
+    "bloxlink_http_retries_total",
+    "How many HTTP requests were retried.",
+    ("host", "reason"),
+)
+HTTP_HEDGES: Final = METRICS.counter(
+    "bloxlink_http_hedges_total",
+    "How many hedges of slow HTTP requests were sent, won or lost against the first attempt, "
+    "or skipped for the budget.",
+    ("host", "result"),
+)
+
+_request_deadline: ContextVar[float | None] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+@contextmanager
+def request_deadline(seconds: float) -> Iterator[None]:
+    """Give the requests in this context, including nested calls and tasks created in it, a shared budget.
+
+    A nested deadline can only shorten the budget. Requests made once it is spent raise DeadlineExceeded
+    without being sent, and requests still in flight when it runs out are abandoned.
+
+    Args:
+        seconds (float): How long the requests in this context may take in total.
+    """
+
+    deadline = time.monotonic() + seconds
+    outer_deadline = _request_deadline.get()
+
+    if outer_deadline is not None:
+        deadline = min(deadline, outer_deadline)
+
+    token = _request_deadline.set(deadline)
+
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+def remaining_request_time() -> float | None:
+    """Get how many seconds are left before the deadline of this context, or None if it has none."""
+
+    deadline = _request_deadline.get()
+
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _endpoint_label(url: str) -> str:
+    """Get the path of a URL with its IDs replaced, so that requests of the same endpoint share a label."""
+
+    return re.sub(r"/\d+(?=/|$)", "/{id}", urlparse(url).path) or "/"
 
 
 def _bytes_to_str_wrapper(data: Any) -> str:
     return to_json(data).decode("utf-8")
 
 
+async def _raise_for_status(
+    url: str, response: aiohttp.ClientResponse, proxy: str | None = None
+):
+    """Raise the error of an unsuccessful response."""
+
+    if response.status == HTTPStatus.SERVICE_UNAVAILABLE:
+        logging.warning(f"{url} is down: {await response.text()}")
+        raise RobloxDown("Roblox is down. Please try again later.")
+
+    # Roblox APIs sometimes use 400 as not found
+    if response.status in (
+        HTTPStatus.BAD_REQUEST,
+        HTTPStatus.NOT_FOUND,
+    ):
+        logging.debug(f"{url} not found: {await response.text()}")
+        raise RobloxNotFound("An unexpected error occurred while fetching data. 1")
+
+    logging.warning(
+        f"{url} failed with status {response.status} and body {await response.text()}; proxy: {proxy}",
+    )
+    raise RobloxAPIError("An unexpected error occurred while fetching data. 2")
+
+
+@asynccontextmanager
+async def _request(
+    method: str,
+    url: str,
+    *,
+    params: dict[str, str] = None,
+    headers: dict = None,
+    body: dict = None,
+    raise_on_failure: bool = True,
+    timeout: float = 30,
+    proxy: str | None = None,
+) -> AsyncIterator[aiohttp.ClientResponse]:
+    """Send a request and yield its response, with the error handling shared by fetch() and fetch_list_items()."""
+
+    params = params or {}
+    headers = headers or {}
+
+    url = requote_uri(url)
+
+    for k, v in dict(params).items():
+        if isinstance(v, bool):
+            params[k] = "true" if v else "false"
+        elif v is None:
+            del params[k]
+
+    if CONFIG.BOT_API and url.startswith(CONFIG.BOT_API):
+        headers["Authorization"] = f"Bearer {CONFIG.BOT_API_AUTH}"
+
+    # Roblox requests are sent through a proxy from the pool, unless one was given
+    pool = proxy_pool() if "roblox.com" in url else None
+    host = urlparse(url).hostname
+
+    if pool and not proxy:
+        proxy = pool.choose()
+
+    if "roblox.com" not in url:
+        proxy = None
+
+    # a 304 only answers a conditional request, such as the revalidation of group rolesets
+    ok_statuses = (
+        (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED)
+        if CONDITIONAL_HEADERS.intersection(map(str.lower, headers))
+        else (HTTPStatus.OK,)
+    )
+
+    remaining_time = remaining_request_time()
+
+    if remaining_time is not None:
+        if remaining_time <= 0:
+            logging.debug(f"Abandoning {url}, the deadline of its context has passed")
+            raise DeadlineExceeded("The request took too long. Please try again later.")
+
+        timeout = min(timeout, remaining_time) if timeout else remaining_time
+
+    with ExitStack() as span_stack:
+        request_span = span_stack.enter_context(
+            span(
+                "http.request",
+                **{
+                    "http.request.method": method.upper(),
+                    "server.address": host,
+                    "url.path": _endpoint_label(url),
+                    "proxied": bool(proxy),
+                },
+            )
+        )
+        session = aiohttp.ClientSession(json_serialize=_bytes_to_str_wrapper)
+        started_at = time.monotonic()
+        recorded = observed = False
+
+        def _record_proxy_result(failed: bool):
+            nonlocal recorded
+
+            if pool and not recorded:
+                pool.record(proxy, time.monotonic() - started_at, failed=failed)
+                recorded = True
+
+        def _observe_request(status: int | str, payload_size: int | None = None):
+            nonlocal observed
+
+            if not observed:
+                duration = time.monotonic() - started_at
+                endpoint = _endpoint_label(url)
+
+                HTTP_REQUEST_SECONDS.observe(
+                    duration,
+                    host=host or "",
+                    endpoint=endpoint,
+                    status=str(status),
+                )
+                record_operation(
+                    "fetch",
+                    duration,
+                    CONFIG.SLOW_FETCH_SECONDS,
+                    key=f"{method.upper()} {host}{endpoint} ({status})",
+                    payload_size=payload_size,
+                )
+                request_span.set_attribute(
+                    (
+                        "http.response.status_code"
+                        if isinstance(status, int)
+                        else "error.type"
+                    ),
+                    status,
+                )
+                observed = True
+
+        try:
+            # the deadline also covers the retries. The callers read the body within it themselves,
+            # so that it does not cover their own code
+            async with asyncio.timeout(remaining_time):
+                response = await _send_with_retries(
+                    session,
+                    method,
+                    url,
+                    json=body,
+                    params=params,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=timeout) if timeout else None,
+                    proxy=proxy,
+                )
+
+                _observe_request(response.status, response.content_length)
+
+                # rate limits and server errors count against the health of the proxy
+                _record_proxy_result(
+                    response.status == HTTPStatus.TOO_MANY_REQUESTS
+                    or response.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+                )
+
+                if response.status not in ok_statuses and raise_on_failure:
+                    async with response:
+                        await _raise_for_status(url, response, proxy)
+
+            # the span ends with the request, it does not cover the code of the caller
+            span_stack.close()
+
+            async with response:
+                yield response
+
+        except asyncio.TimeoutError:
+            if remaining_time is not None and remaining_request_time() <= 0:
+                logging.debug(
+                    f"Abandoned {url}, the deadline of its context has passed"
+                )
+                _observe_request("deadline_exceeded")
+
+                raise DeadlineExceeded(
+                    "The request took too long. Please try again later."
+                ) from None
+
+            logging.warning(f"URL {url} timed out")
+            _record_proxy_result(True)
+            _observe_request("timeout")
+
+            raise RobloxDown(
+                "An unexpected error occurred while fetching data. 4"
+            ) from None
+        except RETRYABLE_EXCEPTIONS:
+            logging.warning(f"URL {url} failed to connect")
+            _record_proxy_result(True)
+            _observe_request("connection_error")
+
+            raise RobloxDown(
+                "An unexpected error occurred while fetching data. 5"
+            ) from None
+
+        finally:
+            await session.close()
+
+
+def _retry_backoff(attempt: int) -> float:
+    """Get how long to wait before a retry, with full jitter so that clients don't retry in lockstep."""
+
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2**attempt))
+
+
+async def _send_with_retries(
+    session: aiohttp.ClientSession, method: str, url: str, **kwargs
+) -> aiohttp.ClientResponse:
+    """Send a request, and retry it if it failed in a way that is worth retrying.
+
+    Only idempotent methods are retried, on rate limits, server errors and connection errors, and
+    only while the RetryBudget of the host allows it.
+    """
+
+    budget = retry_budget(url)
+    budget.deposit()
+    retryable_method = method.upper() in RETRYABLE_METHODS
+
+    for attempt in range(1, MAX_HTTP_RETRIES + 1):
+        can_retry = retryable_method and attempt < MAX_HTTP_RETRIES
+
+        try:
+            response = await session.request(method, url, **kwargs)
+        except RETRYABLE_EXCEPTIONS as exc:
+            if not (can_retry and budget.withdraw()):
+                raise
+
+            logging.debug(f"Retrying {url} after {exc!r}")
+            HTTP_RETRIES.inc(
+                host=urlparse(url).hostname or "", reason="connection_error"
+            )
+            await asyncio.sleep(_retry_backoff(attempt))
+            continue
+
+        if response.status not in RETRYABLE_STATUSES:
+            return response
+
+        retry_after = response.headers.get("Retry-After", "")
+        retry_wait = (
+            float(retry_after) if retry_after.isdigit() else _retry_backoff(attempt)
+        )
+
+        if not (can_retry and retry_wait <= RETRY_BACKOFF_MAX and budget.withdraw()):
+            return response
+
+        logging.debug(f"Retrying {url} after status {response.status}")
+        HTTP_RETRIES.inc(host=urlparse(url).hostname or "", reason=str(response.status))
+        response.release()
+        await asyncio.sleep(retry_wait)
+
+    return response
+
+
 async def fetch[T](
     method: str,
     url: str,
@@ -31,6 +395,7 @@ async def fetch[T](
     parse_as: Literal["JSON", "BYTES", "TEXT"] | BaseModel | Type[T] = "JSON",
     raise_on_failure: bool = True,
     timeout: float = 30,
+    hedge: bool = False,
 ) -> Union[
     Tuple[dict, aiohttp.ClientResponse],
     Tuple[str, aiohttp.ClientResponse],
@@ -51,6 +416,8 @@ async def fetch[T](
             Defaults to JSON.
         raise_on_failure (bool, optional): Whether an exception be raised if the request fails. Defaults to True.
         timeout (float, optional): How long should we wait for a request to succeed. Defaults to 10 seconds.
+        hedge (bool, optional): Whether a slow GET should be hedged with a second attempt, see HedgePolicy.
+            Only used if CONFIG.HEDGE_REQUESTS is set. Defaults to False.
 
     Raises:
         RobloxAPIError:
@@ -62,98 +429,252 @@ async def fetch[T](
 
     Returns:
         Tuple[dict, ClientResponse] | Tuple[str, ClientResponse] | Tuple[bytes, ClientResponse] | ClientResponse:
-        The requested data from the request, if any.
+        The requested data from the request, if any. The data is None for 304 responses to conditional requests.
     """
 
-    params = params or {}
-    headers = headers or {}
+    fetch_kwargs = {
+        "params": params,
+        "headers": headers,
+        "body": body,
+        "parse_as": parse_as,
+        "raise_on_failure": raise_on_failure,
+        "timeout": timeout,
+    }
 
-    url = requote_uri(url)
+    if hedge and CONFIG.HEDGE_REQUESTS and method.upper() == "GET":
+        pool = proxy_pool() if "roblox.com" in url else None
+        proxy = hedge_proxy = None
 
-    for k, v in dict(params).items():
-        if isinstance(v, bool):
-            params[k] = "true" if v else "false"
-        elif v is None:
-            del params[k]
+        if pool:
+            # without a HEDGE_PROXY_URL, the hedge is sent through another proxy than the first attempt
+            proxy = pool.choose()
+            hedge_proxy = pool.choose(exclude=proxy)
 
-    if CONFIG.BOT_API and url.startswith(CONFIG.BOT_API):
-        headers["Authorization"] = f"Bearer {CONFIG.BOT_API_AUTH}"
+        return await hedge_policy(url).run(
+            lambda attempt_proxy: _fetch(
+                method, url, proxy=attempt_proxy, **fetch_kwargs
+            ),
+            proxy,
+            hedge_proxy,
+        )
 
-    session = aiohttp.ClientSession(json_serialize=_bytes_to_str_wrapper)
-    retry_options = ExponentialRetry(attempts=MAX_HTTP_RETRIES)
-    retry_client = RetryClient(
-        client_session=session, raise_for_status=False, retry_options=retry_options
-    )
+    return await _fetch(method, url, **fetch_kwargs)
 
-    try:
-        async with retry_client.request(
+
+async def _fetch[T](
+    method: str,
+    url: str,
+    *,
+    params: dict[str, str],
+    headers: dict,
+    body: dict,
+    parse_as: Literal["JSON", "BYTES", "TEXT"] | BaseModel | Type[T],
+    raise_on_failure: bool,
+    timeout: float,
+    proxy: str | None = None,
+):
+    """Send one attempt of a request for fetch(), and parse its response."""
+
+    async with (
+        _request(
             method,
             url,
-            json=body,
             params=params,
             headers=headers,
-            timeout=aiohttp.ClientTimeout(total=timeout) if timeout else None,
-            proxy=(
-                CONFIG.PROXY_URL if CONFIG.PROXY_URL and "roblox.com" in url else None
-            ),
-        ) as response:
-            if response.status != HTTPStatus.OK and raise_on_failure:
-                if response.status == HTTPStatus.SERVICE_UNAVAILABLE:
-                    logging.warning(f"{url} is down: {await response.text()}")
-                    raise RobloxDown("Roblox is down. Please try again later.")
-
-                # Roblox APIs sometimes use 400 as not found
-                if response.status in (
-                    HTTPStatus.BAD_REQUEST,
-                    HTTPStatus.NOT_FOUND,
-                ):
-                    logging.debug(f"{url} not found: {await response.text()}")
-                    raise RobloxNotFound(
-                        "An unexpected error occurred while fetching data. 1"
-                    )
+            body=body,
+            raise_on_failure=raise_on_failure,
+            timeout=timeout,
+            proxy=proxy,
+        ) as response,
+        asyncio.timeout(remaining_request_time()),
+    ):
+        if response.status == HTTPStatus.NOT_MODIFIED:
+            return None, response
+
+        if parse_as == "TEXT":
+            return await response.text(), response
+
+        if parse_as == "JSON":
+            try:
+                json_response = await response.json()
+            except aiohttp.client_exceptions.ContentTypeError as exc:
+                logging.debug(f"{url} {await response.text()}")
 
-                logging.warning(
-                    f"{url} failed with status {response.status} and body {await response.text()}; proxy: {CONFIG.PROXY_URL}, using proxy: {CONFIG.PROXY_URL and 'roblox.com' in url}",
-                )
                 raise RobloxAPIError(
-                    "An unexpected error occurred while fetching data. 2"
+                    "An unexpected error occurred while fetching data. 3"
+                ) from exc
+
+            return json_response, response
+
+        if parse_as == "BYTES":
+            return await response.read(), response
+
+        return parse_into(await response.read(), parse_as), response
+
+
+async def fetch_list_items[T](
+    url: str,
+    item_model: Type[T],
+    *,
+    list_key: str = "data",
+    method: str = "GET",
+    **kwargs,
+) -> AsyncGenerator[T, None]:
+    """Stream the items of a JSON list in a response body, parsing each one as soon as it has arrived.
+
+    The whole body is never buffered, so only one item is held as a dictionary at a time.
+
+    Args:
+        url (str): The URL to send the request to.
+        item_model (Type[T]): The dataclass to parse each item as.
+        list_key (str, optional): The top-level key of the list in the body. Defaults to "data".
+        method (str, optional): The HTTP request method to use for this query. Defaults to GET.
+        **kwargs: Passed to the request, see fetch().
+
+    Raises:
+        RobloxAPIError: Raised when the body ends before the list does.
+        RobloxDown, RobloxNotFound: See fetch().
+
+    Yields:
+        T: The parsed items of the list. Nothing is yielded for unsuccessful responses if not raise_on_failure.
+    """
+
+    async with _request(method, url, **kwargs) as response:
+        if response.status != HTTPStatus.OK:
+            return
+
+        parser = JSONListItemParser(list_key)
+
+        while True:
+            # the deadline covers reading each chunk, but not the code that consumes the items
+            async with asyncio.timeout(remaining_request_time()):
+                chunk = await response.content.readany()
+
+            if not chunk:
+                raise RobloxAPIError(
+                    "An unexpected error occurred while fetching data. 6"
                 )
 
-            if parse_as == "TEXT":
-                return await response.text(), response
+            for item in parser.feed(chunk):
+                yield parse_into(item, item_model)
+
+            if parser.done:
+                return
+
+
+class JSONListItemParser:
+    """Incrementally extract the items of a top-level JSON list from chunks of a body.
 
-            if parse_as == "JSON":
+    Items are expected to be JSON objects or arrays, so an item that is cut off by a chunk
+    boundary always fails to decode until the rest of it has arrived.
+    """
+
+    _decoder: Final[json.JSONDecoder] = json.JSONDecoder()
+    _key_separator: Final[re.Pattern] = re.compile(r"\s*:?\s*")
+
+    def __init__(self, list_key: str):
+        self._list_key = list_key
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._in_list = False
+        self.done = False
+        # the state of the scan for the list key, outside of the list
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._expecting_key = False
+
+    def _find_list_start(self) -> int | None:
+        """Scan the top-level object for the list key, and return the position of the first item of its list.
+
+        Keys of nested objects and strings that look like the key are skipped. The scan stops
+        before a key that has not fully arrived yet, and resumes from it with the next chunk.
+        """
+
+        buffer = self._buffer
+        position = 0
+
+        while position < len(buffer):
+            character = buffer[position]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif character == "\\":
+                    self._escaped = True
+                elif character == '"':
+                    self._in_string = False
+            elif character == '"' and self._depth == 1 and self._expecting_key:
                 try:
-                    json_response = await response.json()
-                except aiohttp.client_exceptions.ContentTypeError as exc:
-                    logging.debug(f"{url} {await response.text()}")
+                    key, key_end = self._decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # the rest of this key has not arrived yet
+                    break
 
-                    raise RobloxAPIError(
-                        "An unexpected error occurred while fetching data. 3"
-                    ) from exc
+                value_start = self._key_separator.match(buffer, key_end).end()
 
-                return json_response, response
+                if value_start == len(buffer):
+                    break
 
-            if parse_as == "BYTES":
-                return await response.read(), response
+                if key == self._list_key and buffer[value_start] == "[":
+                    return value_start + 1
 
-            return parse_into(await response.json(), parse_as), response
+                self._expecting_key = False
+                position = value_start
+                continue
+            elif character == '"':
+                self._in_string = True
+            elif character in "{[":
+                self._depth += 1
+                self._expecting_key = self._depth == 1 and character == "{"
+            elif character in "}]":
+                self._depth -= 1
+            elif character == "," and self._depth == 1:
+                self._expecting_key = True
 
-    except asyncio.TimeoutError:
-        logging.warning(f"URL {url} timed out")
+            position += 1
 
-        raise RobloxDown(
-            "An unexpected error occurred while fetching data. 4"
-        ) from None
-    except aiohttp.client_exceptions.ClientConnectorError:
-        logging.warning(f"URL {url} failed to connect")
+        self._buffer = buffer[position:]
 
-        raise RobloxDown(
-            "An unexpected error occurred while fetching data. 5"
-        ) from None
+        return None
 
-    finally:
-        await retry_client.close()
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Add a chunk of the body, and return the items that were completed by it."""
+
+        self._buffer += self._text_decoder.decode(chunk)
+        position = 0
+        items = []
+
+        if not self._in_list:
+            position = self._find_list_start()
+
+            if position is None:
+                return items
+
+            self._in_list = True
+
+        while True:
+            while position < len(self._buffer) and self._buffer[position] in " \t\r\n,":
+                position += 1
+
+            if position == len(self._buffer):
+                break
+
+            if self._buffer[position] == "]":
+                self.done = True
+                break
+
+            try:
+                item, position = self._decoder.raw_decode(self._buffer, position)
+            except json.JSONDecodeError:
+                # the rest of this item has not arrived yet
+                break
+
+            items.append(item)
+
+        self._buffer = self._buffer[position:]
+
+        return items
 
 
 async def fetch_typed[T](
@@ -170,14 +691,392 @@ async def fetch_typed[T](
     """
 
     if CONFIG.BOT_API and url.startswith(CONFIG.BOT_API):
+        # the envelope and the payload are validated from the body in one pass
         fetch_body, fetch_headers = await fetch(
-            url=url, parse_as=BaseResponse, method=method, **kwargs
+            url=url, parse_as=BaseResponse[parse_as], method=method, **kwargs
         )
 
-        return parse_into(fetch_body.data, parse_as), fetch_headers
+        return (fetch_body.data if fetch_body else None), fetch_headers
 
     fetch_body, fetch_headers = await fetch(
         url=url, parse_as=parse_as, method=method, **kwargs
     )
 
     return fetch_body, fetch_headers
+
+
+class HostRateLimiter:
+    """Space out the requests sent to a host so they stay under its rate limit."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1 / requests_per_second
+        self._next_slot = 0.0
+
+    async def wait(self):
+        """Wait for the next free slot to send a request in."""
+
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+_host_rate_limiters: dict[str, HostRateLimiter] = {}
+
+
+def host_rate_limiter(url: str) -> HostRateLimiter:
+    """Get the rate limiter shared by all requests to the host of a URL."""
+
+    host = urlparse(url).hostname
+
+    if host not in _host_rate_limiters:
+        _host_rate_limiters[host] = HostRateLimiter(CONFIG.PAGINATE_REQUESTS_PER_SECOND)
+
+    return _host_rate_limiters[host]
+
+
+async def _fetch_page[T](
+    url: str, model: Type[T], params: dict[str, str]
+) -> CursorPage[T]:
+    """Fetch one page of a list endpoint, once the HostRateLimiter of its host has a free slot.
+
+    Rate limited pages are retried by fetch() itself, within the RetryBudget of the host.
+    """
+
+    await host_rate_limiter(url).wait()
+
+    page, _ = await fetch_typed(CursorPage[model], url, params=params)
+
+    return page
+
+
+async def paginate[T](
+    url: str,
+    model: Type[T],
+    page_size: int = 100,
+    max_items: int | None = None,
+    *,
+    params: dict[str, str] = None,
+) -> AsyncGenerator[T, None]:
+    """Iterate over every item of a Roblox v1/v2 list endpoint that is paginated with nextPageCursor.
+
+    The next page is fetched while the current one is being consumed, and requests to the same host
+    are spaced out by its HostRateLimiter. Stop iterating to stop fetching pages.
+
+    Args:
+        url (str): The URL of the list endpoint.
+        model (Type[T]): The dataclass to parse each item as.
+        page_size (int, optional): How many items are requested per page. Roblox endpoints accept
+            10, 25, 50 or 100. Defaults to 100.
+        max_items (int | None, optional): Stop after this many items. Defaults to None, for all items.
+        params (dict, optional): Extra query parameters to send with every page. Defaults to None.
+
+    Raises:
+        RobloxAPIError: Raised if a page is still rate limited once fetch() stopped retrying it.
+        RobloxDown, RobloxNotFound: See fetch().
+
+    Yields:
+        T: The items of each page, in order.
+    """
+
+    params = {**(params or {}), "limit": page_size}
+    yielded_items = 0
+    next_page = asyncio.create_task(_fetch_page(url, model, params))
+
+    try:
+        while next_page:
+            page = await next_page
+            next_page = None
+
+            if page.next_page_cursor and (
+                max_items is None or yielded_items + len(page.data) < max_items
+            ):
+                next_page = asyncio.create_task(
+                    _fetch_page(url, model, {**params, "cursor": page.next_page_cursor})
+                )
+
+            for item in page.data:
+                if max_items is not None and yielded_items >= max_items:
+                    return
+
+                yielded_items += 1
+                yield item
+    finally:
+        if next_page:
+            next_page.cancel()
+
+
+class HedgePolicy:
+    """Hedge slow requests to a host with a second attempt, within a budget.
+
+    A request that has not finished by the `percentile` latency of recent requests gets a second
+    attempt, and the first attempt to succeed wins. Every request earns `budget` of a hedge, so
+    hedging adds at most that ratio of extra requests.
+    """
+
+    def __init__(
+        self,
+        percentile: float,
+        budget: float,
+        alternate_proxy: str | None = None,
+        host: str = "",
+    ):
+        self.percentile = percentile
+        self.budget = budget
+        self.alternate_proxy = alternate_proxy
+        # the label of the HTTP_HEDGES of this policy
+        self.host = host
+        self.latencies: deque[float] = deque(maxlen=HEDGE_LATENCY_WINDOW)
+        self._tokens = 0.0
+
+    def delay(self) -> float | None:
+        """How long a request may take before it is hedged. None until enough latencies are known."""
+
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+
+        latencies = sorted(self.latencies)
+
+        return latencies[min(int(len(latencies) * self.percentile), len(latencies) - 1)]
+
+    async def run[T](
+        self,
+        attempt: Callable[[str | None], Awaitable[T]],
+        proxy: str | None = None,
+        hedge_proxy: str | None = None,
+    ) -> T:
+        """Run a request, and hedge it if it is slow.
+
+        Args:
+            attempt (Callable[[str | None], Awaitable[T]]): Sends one attempt of the request, through
+                the given proxy, or the default proxy if None.
+            proxy (str | None, optional): The proxy of the first attempt. Defaults to None.
+            hedge_proxy (str | None, optional): The proxy of the hedge, if this policy has no alternate_proxy.
+                Defaults to None.
+
+        Returns:
+            T: The result of the first attempt to succeed. If every attempt fails, the error of the
+                first attempt is raised.
+        """
+
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        delay = self.delay()
+        self._tokens = min(self._tokens + self.budget, HEDGE_MAX_TOKENS)
+        attempts = [asyncio.create_task(attempt(proxy))]
+
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+
+                if not done and self._tokens >= 1:
+                    self._tokens -= 1
+                    HTTP_HEDGES.inc(host=self.host, result="sent")
+                    attempts.append(
+                        asyncio.create_task(
+                            attempt(self.alternate_proxy or hedge_proxy)
+                        )
+                    )
+                elif not done:
+                    HTTP_HEDGES.inc(host=self.host, result="skipped")
+
+            pending = set(attempts)
+            errors = {}
+
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in (task for task in attempts if task in done):
+                    if task.exception():
+                        errors[task] = task.exception()
+                        continue
+
+                    self.latencies.append(loop.time() - started_at)
+
+                    if len(attempts) > 1:
+                        hedge_won = task is attempts[1]
+                        HTTP_HEDGES.inc(
+                            host=self.host, result="won" if hedge_won else "lost"
+                        )
+                        logging.debug(
+                            f"Hedged request {'won' if hedge_won else 'lost'} after {delay:.3f}s"
+                        )
+
+                    return task.result()
+
+            raise next(errors[task] for task in attempts if task in errors)
+
+        finally:
+            for task in attempts:
+                task.cancel()
+
+
+_hedge_policies: dict[str, HedgePolicy] = {}
+
+
+def hedge_policy(url: str) -> HedgePolicy:
+    """Get the hedge policy shared by all requests to the host of a URL."""
+
+    host = urlparse(url).hostname
+
+    if host not in _hedge_policies:
+        _hedge_policies[host] = HedgePolicy(
+            CONFIG.HEDGE_PERCENTILE,
+            CONFIG.HEDGE_BUDGET,
+            CONFIG.HEDGE_PROXY_URL,
+            host=host or "",
+        )
+
+    return _hedge_policies[host]
+
+
+class ProxyHealth:
+    """The health of a proxy, as moving averages of its latency and error rate."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self.ejected_until = 0.0
+
+    def record(self, latency: float, failed: bool):
+        """Add the result of a request to the moving averages."""
+
+        self.latency = (
+            latency
+            if self.latency is None
+            else PROXY_EWMA_ALPHA * latency + (1 - PROXY_EWMA_ALPHA) * self.latency
+        )
+        self.error_rate = (
+            PROXY_EWMA_ALPHA * failed + (1 - PROXY_EWMA_ALPHA) * self.error_rate
+        )
+
+    def score(self, default_latency: float) -> float:
+        """How much traffic this proxy should get, relative to other proxies."""
+
+        return (1 - self.error_rate) / max(self.latency or default_latency, 0.001)
+
+
+class ProxyPool:
+    """Spread requests over proxies, weighted by their health.
+
+    Proxies whose error rate passes PROXY_EJECT_ERROR_RATE are ejected for PROXY_EJECT_SECONDS.
+    Every request chooses its proxy by weight. Requests open their own session, so sticking to a
+    proxy would not reuse its connections.
+    """
+
+    def __init__(self, urls: list[str]):
+        self.urls = list(urls)
+        self.proxies = {url: ProxyHealth(url) for url in urls}
+
+    def choose(self, exclude: str | None = None) -> str:
+        """Choose the proxy to send a request through.
+
+        Args:
+            exclude (str | None, optional): A proxy to avoid, such as the proxy of the request that is hedged.
+                It is still chosen if it is the only one. Defaults to None.
+        """
+
+        now = time.monotonic()
+        healthy = [
+            proxy for proxy in self.proxies.values() if proxy.ejected_until <= now
+        ]
+
+        if not healthy:
+            # every proxy is ejected, which is more likely an upstream outage than bad proxies
+            healthy = list(self.proxies.values())
+
+        if exclude:
+            healthy = [proxy for proxy in healthy if proxy.url != exclude] or healthy
+
+        known_latencies = [proxy.latency for proxy in healthy if proxy.latency]
+        default_latency = (
+            sum(known_latencies) / len(known_latencies) if known_latencies else 1
+        )
+        scores = [proxy.score(default_latency) for proxy in healthy]
+
+        if not any(scores):
+            scores = [1] * len(healthy)
+
+        return random.choices(healthy, weights=scores)[0].url
+
+    def record(self, url: str, latency: float, failed: bool):
+        """Record the result of a request through a proxy, ejecting the proxy if it is failing."""
+
+        proxy = self.proxies.get(url)
+
+        if not proxy:
+            return
+
+        proxy.record(latency, failed)
+
+        if proxy.error_rate >= PROXY_EJECT_ERROR_RATE:
+            logging.warning(
+                f"Ejecting proxy {url} for {PROXY_EJECT_SECONDS}s, error rate {proxy.error_rate:.2f}"
+            )
+            proxy.ejected_until = time.monotonic() + PROXY_EJECT_SECONDS
+            # it is on probation when it returns, so another failure or two ejects it again
+            proxy.error_rate = PROXY_EJECT_ERROR_RATE / 2
+
+
+_proxy_pool: ProxyPool | None = None
+
+
+def proxy_pool() -> ProxyPool | None:
+    """Get the pool of the configured proxies, or None if no proxy is configured."""
+
+    global _proxy_pool  # pylint: disable=global-statement
+
+    urls = CONFIG.PROXY_URLS or ([CONFIG.PROXY_URL] if CONFIG.PROXY_URL else [])
+
+    if not urls:
+        return None
+
+    if _proxy_pool is None or _proxy_pool.urls != urls:
+        _proxy_pool = ProxyPool(urls)
+
+    return _proxy_pool
+
+
+class RetryBudget:
+    """Cap the retries to a host at a ratio of its requests, so retries cannot multiply an outage.
+
+    Every request deposits RETRY_BUDGET_RATIO of a retry, up to RETRY_BUDGET_MAX_TOKENS, and every
+    retry withdraws one.
+    """
+
+    def __init__(self):
+        self.tokens = RETRY_BUDGET_MAX_TOKENS
+
+    def deposit(self):
+        """Add the share of a retry that a request earns."""
+
+        self.tokens = min(self.tokens + RETRY_BUDGET_RATIO, RETRY_BUDGET_MAX_TOKENS)
+
+    def withdraw(self) -> bool:
+        """Take a retry from the budget, if there is one."""
+
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+
+        return True
+
+
+_retry_budgets: dict[str, RetryBudget] = {}
+
+
+def retry_budget(url: str) -> RetryBudget:
+    """Get the retry budget shared by all requests to the host of a URL."""
+
+    host = urlparse(url).hostname
+
+    if host not in _retry_budgets:
+        _retry_budgets[host] = RetryBudget()
+
+    return _retry_budgets[host]
@@ -0,0 +1,265 @@
+from abc import ABC, abstractmethod
+import time
+from contextlib import contextmanager
+from typing import Final, Iterator
+from aiohttp import web
+
+__all__ = (
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "METRICS",
+    "size_bucket",
+    "metrics_handler",
+    "start_metrics_server",
+)
+
+LATENCY_BUCKETS: Final[tuple[float, ...]] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+SIZE_BUCKETS: Final[tuple[int, ...]] = (10, 50, 250, 1000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+
+    return (
+        "{"
+        + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+        + "}"
+    )
+
+
+def size_bucket(size: int) -> str:
+    """Get the label of the size bucket a count falls in, to keep the cardinality of labels low."""
+
+    lower_bound = 0
+
+    for upper_bound in SIZE_BUCKETS:
+        if size <= upper_bound:
+            return f"{lower_bound}-{upper_bound}"
+
+        lower_bound = upper_bound + 1
+
+    return f"{SIZE_BUCKETS[-1] + 1}+"
+
+
+class Metric(ABC):
+    """A metric with a value per combination of its labels."""
+
+    metric_type = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple[str, ...] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+
+    def _label_values(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"{self.name} expects the labels {self.label_names}, got {tuple(labels)}"
+            )
+
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def expose(self) -> list[str]:
+        """Get the lines of this metric in the Prometheus text exposition format."""
+
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            *self._expose_samples(),
+        ]
+
+    @abstractmethod
+    def _expose_samples(self) -> list[str]:
+        """Get the sample lines of this metric in the Prometheus text exposition format."""
+        raise NotImplementedError()
+
+
+class Counter(Metric):
+    """A value that only goes up, such as a number of requests."""
+
+    metric_type = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple[str, ...] = ()
+    ):
+        super().__init__(name, documentation, label_names)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        """Increase the counter of these labels."""
+
+        label_values = self._label_values(labels)
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        """Get the value of the counter of these labels."""
+
+        return self.values.get(self._label_values(labels), 0)
+
+    def _expose_samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(dict(zip(self.label_names, label_values)))} {value}"
+            for label_values, value in self.values.items()
+        ]
+
+
+class Histogram(Metric):
+    """A distribution of observed values, such as latencies, counted into buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = buckets
+        # per combination of labels: the count of each bucket, the sum and the count
+        self.values: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str):
+        """Count a value for these labels."""
+
+        label_values = self._label_values(labels)
+        bucket_counts, total, count = self.values.get(
+            label_values, ([0] * len(self.buckets), 0.0, 0)
+        )
+
+        for i, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                bucket_counts[i] += 1
+
+        self.values[label_values] = (bucket_counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe how many seconds the body of this context takes."""
+
+        started_at = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def count(self, **labels: str) -> int:
+        """Get how many values were observed for these labels."""
+
+        return self.values.get(self._label_values(labels), (None, 0.0, 0))[2]
+
+    def _expose_samples(self) -> list[str]:
+        lines = []
+
+        for label_values, (bucket_counts, total, count) in self.values.items():
+            labels = dict(zip(self.label_names, label_values))
+
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(
+                    f"{self.name}_bucket{_format_labels({**labels, 'le': str(upper_bound)})} {bucket_count}"
+                )
+
+            lines.append(
+                f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}"
+            )
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics of the library, which can be exposed in the Prometheus text format."""
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def _register[T: Metric](self, metric: T) -> T:
+        existing_metric = self.metrics.get(metric.name)
+
+        if existing_metric:
+            if type(existing_metric) is not type(metric):
+                raise ValueError(f"{metric.name} is already registered as another type")
+
+            return existing_metric
+
+        self.metrics[metric.name] = metric
+
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, label_names: tuple[str, ...] = ()
+    ) -> Counter:
+        """Get or register a counter."""
+
+        return self._register(Counter(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Get or register a histogram."""
+
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def expose(self) -> str:
+        """Get every metric in the Prometheus text exposition format."""
+
+        return "".join(
+            line + "\n" for metric in self.metrics.values() for line in metric.expose()
+        )
+
+
+METRICS: Final[MetricsRegistry] = MetricsRegistry()
+
+
+async def metrics_handler(_request: web.Request) -> web.Response:
+    """An aiohttp handler that serves the metrics, to mount on an existing web application."""
+
+    return web.Response(
+        text=METRICS.expose(), content_type="text/plain", charset="utf-8"
+    )
+
+
+async def start_metrics_server(
+    host: str = "0.0.0.0", port: int = 9090
+) -> web.AppRunner:
+    """Serve the metrics at /metrics. This is optional; the metrics are collected either way.
+
+    Returns:
+        web.AppRunner: The runner of the server, to clean up when shutting down.
+    """
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_handler)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+
+    return runner
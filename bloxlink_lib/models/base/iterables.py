@@ -65,10 +65,11 @@ class PydanticDict[K, V](RootModel[dict[K, V]]):
         return len(self.root)
 
     def __eq__(self, other) -> bool:
+        if isinstance(other, PydanticDict):
+            return self.root == other.root
+
         return (
-            self.root == PydanticDict(other).root
-            if isinstance(other, (PydanticDict, dict))
-            else False
+            self.root == PydanticDict(other).root if isinstance(other, dict) else False
         )
 
     def __str__(self) -> str:
@@ -129,10 +130,11 @@ class PydanticList[T](RootModel[list[T]]):
         return len(self.root)
 
     def __eq__(self, other) -> bool:
+        if isinstance(other, PydanticList):
+            return self.root == other.root
+
         return (
-            self.root == PydanticList(other).root
-            if isinstance(other, (PydanticList, list))
-            else False
+            self.root == PydanticList(other).root if isinstance(other, list) else False
         )
 
     def __str__(self) -> str:
@@ -1,4 +1,5 @@
 from typing import Any
+from pydantic import Field
 from bloxlink_lib.models.base import BaseModel
 
 
@@ -12,3 +13,12 @@ class BaseResponse[T: Any](BaseModel):
     success: bool
     error: str | None = None
     data: T | None = None
+
+
+class CursorPage[T: Any](BaseModel):
+    """A page of a Roblox v1/v2 list endpoint, paginated with cursors."""
+
+    previous_page_cursor: str | None = Field(alias="previousPageCursor", default=None)
+    next_page_cursor: str | None = Field(alias="nextPageCursor", default=None)
+    # rate limited and failed responses have no data
+    data: list[T] = Field(default_factory=list)
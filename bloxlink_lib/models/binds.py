@@ -1,18 +1,27 @@
 from __future__ import annotations
 
+from collections import Counter
 from typing import (
     TYPE_CHECKING,
     Any,
+    Iterable,
     Literal,
     NotRequired,
     TypedDict,
     Annotated,
     Self,
     Type,
+    Final,
 )
 
-from pydantic import Field, ValidationError, field_validator
+from pydantic import (
+    Field,
+    ValidationError,
+    ValidationInfo,
+    field_validator,
+)
 
+from bloxlink_lib.config import CONFIG
 from bloxlink_lib.models.base import (
     BaseModel,
     CoerciveSet,
@@ -20,9 +29,13 @@ from bloxlink_lib.models.base import (
     RoleSerializable,
     MemberSerializable,
 )
-from bloxlink_lib.models.roblox import RobloxEntity, create_entity
+from bloxlink_lib.models.roblox import RobloxEntity, create_entity, sync_entities
 from bloxlink_lib.models.v3_binds import V3RoleBinds
+from bloxlink_lib.metrics import METRICS, size_bucket
+from bloxlink_lib.slow_operations import slow_operation
+from bloxlink_lib.tracing import span
 from bloxlink_lib.utils import find
+from bloxlink_lib.validators import is_trusted_data
 
 if TYPE_CHECKING:
     from hikari import Member
@@ -39,6 +52,14 @@ VALID_BIND_TYPES = Literal[
 VALID_BIND_TYPES_SET = {"group", "asset", "badge", "gamepass", "verified", "unverified"}
 BIND_GROUP_SUBTYPES = Literal["role_bind", "full_group"]
 
+BIND_EVALUATION_SECONDS: Final = METRICS.histogram(
+    "bloxlink_bind_evaluation_seconds",
+    "How long checking whether a member satisfies a bind takes.",
+    ("bind_type", "guild_roles"),
+)
+
+type BindIdentityKey = tuple[str, int | None, tuple | None]
+
 
 class BindCalculationResult(BaseModel):
     """The result of bind calculation for the user"""
@@ -95,18 +116,22 @@ class GroupBindData(BaseModel):
                 "Everyone condition cannot have any other conditions."
             )
 
-    def __hash__(self) -> int:
-        return hash(
-            (
-                self.everyone,
-                self.guest,
-                self.min,
-                self.max,
-                self.roleset,
-                self.dynamicRoles,
-            )
+    @property
+    def identity_key(self) -> tuple:
+        """The conditions of this group bind as a hashable tuple."""
+
+        return (
+            self.everyone,
+            self.guest,
+            self.min,
+            self.max,
+            self.roleset,
+            self.dynamicRoles,
         )
 
+    def __hash__(self) -> int:
+        return hash(self.identity_key)
+
 
 class BindCriteria(BaseModel):
     """Represents the criteria required for a bind. If anything is set, it must ALL be met."""
@@ -119,16 +144,25 @@ class BindCriteria(BaseModel):
     @field_validator("type", mode="before")
     @classmethod
     def transform_type(
-        cls: Type[Self], bind_type: VALID_BIND_TYPES | str
+        cls: Type[Self], bind_type: VALID_BIND_TYPES | str, info: ValidationInfo
     ) -> VALID_BIND_TYPES:
         """Transform the type to a valid bind type."""
 
+        if is_trusted_data(info):
+            return bind_type
+
         from bloxlink_lib.models.migrators import migrate_bind_criteria_type
 
         return migrate_bind_criteria_type(bind_type)
 
+    @property
+    def identity_key(self) -> BindIdentityKey:
+        """The criteria as a hashable tuple. Equal criteria have equal keys."""
+
+        return (self.type, self.id, self.group.identity_key if self.group else None)
+
     def __hash__(self) -> int:
-        return hash((self.type, self.id, self.group))
+        return hash(self.identity_key)
 
 
 class BindData(BaseModel):
@@ -168,20 +202,30 @@ class GuildBind(BaseModel):
     )  # highest role in the guild
 
     def model_post_init(self, __context):
-        self.entity = self.entity or create_entity(self.criteria.type, self.criteria.id)
-        self.type = self.criteria.type
+        # these are only assigned when missing, since validated assignment is costly for every loaded bind
+        if self.entity is None:
+            self.entity = create_entity(self.criteria.type, self.criteria.id)
+
+        if self.type != self.criteria.type:
+            self.type = self.criteria.type
 
         if self.type == "group":
-            self.subtype = (
-                "full_group" if self.criteria.group.dynamicRoles else "role_bind"
-            )
+            subtype = "full_group" if self.criteria.group.dynamicRoles else "role_bind"
+
+            if self.subtype != subtype:
+                self.subtype = subtype
 
     # Field migrators
     @field_validator("nickname", mode="before")
     @classmethod
-    def migrate_nickname(cls: Type[Self], nickname: str | None) -> str | None:
+    def migrate_nickname(
+        cls: Type[Self], nickname: str | None, info: ValidationInfo
+    ) -> str | None:
         """Migrate the nickname field."""
 
+        if is_trusted_data(info):
+            return nickname
+
         from bloxlink_lib.models.migrators import migrate_nickname_template
 
         return migrate_nickname_template(nickname)
@@ -329,6 +373,41 @@ class GuildBind(BaseModel):
     ) -> BindCalculationResult:
         """Check if a user satisfies the requirements for this bind."""
 
+        # this runs for every bind of every member, so the attributes are only built when they are traced
+        span_attributes = (
+            {
+                "bind.type": self.criteria.type,
+                "bind.roles": len(self.roles),
+                "guild.roles": len(guild_roles),
+                "roblox_user.verified": roblox_user is not None,
+            }
+            if CONFIG.TRACING_ENABLED
+            else {}
+        )
+
+        with (
+            BIND_EVALUATION_SECONDS.time(
+                bind_type=self.criteria.type, guild_roles=size_bucket(len(guild_roles))
+            ),
+            span("bind.satisfies_for", **span_attributes) as bind_span,
+            slow_operation(
+                "bind_evaluation",
+                CONFIG.SLOW_BIND_EVALUATION_SECONDS,
+                f"{self.criteria.type}:{self.criteria.id}",
+            ) as timed_operation,
+        ):
+            timed_operation.payload_size = len(guild_roles)
+            result = await self._satisfies_for(guild_roles, member, roblox_user)
+            bind_span.set_attribute("bind.successful", result.successful)
+
+            return result
+
+    async def _satisfies_for(
+        self,
+        guild_roles: dict[int, RoleSerializable],
+        member: Member | MemberSerializable,
+        roblox_user: RobloxUser | None = None,
+    ) -> BindCalculationResult:
         ineligible_roles = SnowflakeSet()
         additional_roles = SnowflakeSet()
         missing_roles = CoerciveSet[str]()
@@ -357,18 +436,15 @@ class GuildBind(BaseModel):
 
                     # check if the user has any group roleset roles they shouldn't have
                     if self.criteria.group.dynamicRoles:
-                        await group.sync_for(roblox_user, sync=True)
-
-                        user_roleset = group.user_roleset
+                        user_roleset = await group.sync_for(roblox_user, sync=True)
 
-                        for roleset in group.rolesets.values():
-                            for role_id in member.role_ids:
-                                if (
-                                    role_id in guild_roles
-                                    and guild_roles[role_id].name == roleset.name
-                                    and str(roleset) != str(user_roleset)
-                                ):
-                                    ineligible_roles.add(role_id)
+                        for role_id in member.role_ids:
+                            if (
+                                role_id in guild_roles
+                                and guild_roles[role_id].name in group.rolesets_by_name
+                                and guild_roles[role_id].name != str(user_roleset)
+                            ):
+                                ineligible_roles.add(role_id)
 
                     if self.criteria.id in roblox_user.groups:
                         user_roleset = roblox_user.groups[self.criteria.id].role
@@ -543,53 +619,97 @@ class GuildBind(BaseModel):
                 remove_role_mentions}'}_"
         )
 
+    @property
+    def identity_key(self) -> BindIdentityKey:
+        """The identity of this bind, which is its criteria as a hashable tuple.
+
+        This is not cached, since the criteria can be changed in place.
+        """
+
+        return self.criteria.identity_key
+
     def __eq__(self, other: GuildBind) -> bool:
         """
         Check if two GuildBind objects are equal.
         We define this ourselves since there are other fields that are not included in the comparison.
         """
 
-        return isinstance(other, GuildBind) and self.criteria == getattr(
-            other, "criteria", None
-        )
+        return isinstance(other, GuildBind) and self.identity_key == other.identity_key
 
     def __hash__(self) -> int:
-        return hash(self.criteria)
+        return hash(self.identity_key)
+
+
+def exclude_existing_binds(
+    binds: Iterable[GuildBind], new_binds: Iterable[GuildBind]
+) -> list[GuildBind]:
+    """Return the new binds that are not already in binds."""
+
+    existing_keys = {b.identity_key for b in binds}
+
+    return [b for b in new_binds if b.identity_key not in existing_keys]
+
+
+def remove_binds(binds: Iterable[GuildBind], *remove: GuildBind) -> list[GuildBind]:
+    """Return binds without the binds to remove.
+
+    Like list.remove(), each bind to remove only removes the first bind that is equal to it.
+
+    Raises:
+        ValueError: If a bind to remove is not in binds.
+    """
+
+    remove_counts = Counter(b.identity_key for b in remove)
+    kept_binds = []
+
+    for bind in binds:
+        bind_key = bind.identity_key
+
+        if remove_counts[bind_key]:
+            remove_counts[bind_key] -= 1
+        else:
+            kept_binds.append(bind)
+
+    for bind in remove:
+        if remove_counts[bind.identity_key]:
+            raise ValueError(f"Bind not found: {bind.criteria.id}")
+
+    return kept_binds
 
 
 async def build_binds_desc(
     guild_id: int | str,
     bind_id: int | str = None,
     bind_type: VALID_BIND_TYPES = None,
+    limit: int = 5,
 ) -> str:
     """Get a string-based representation of all bindings (matching the bind_id and bind_type).
 
-    Output is limited to 5 bindings, after that the user is told to visit the website to see the rest.
+    Output is limited to the first bindings, after that the user is told to visit the website to see the rest.
 
     Args:
         guild_id (int | str): ID of the guild.
         bind_id (int | str, optional): The entity ID to filter binds from. Defaults to None.
         bind_type (ValidBindType, optional): The type of bind to filter the response by.
             Defaults to None.
+        limit (int, optional): How many binds to show. Defaults to 5.
 
     Returns:
-        str: Sentence representation of the first five binds matching the filters.
+        str: Sentence representation of the first binds matching the filters.
     """
 
     from bloxlink_lib.models.roblox.binds import get_binds
 
     guild_binds = await get_binds(guild_id, category=bind_type, bind_id=bind_id)
 
-    # sync the first 5 binds
-    for bind in guild_binds[:5]:
-        await bind.entity.sync()
+    await sync_entities(bind.entity for bind in guild_binds[:limit])
 
-    bind_strings = [str(bind) for bind in guild_binds[:5]]
+    bind_strings = [str(bind) for bind in guild_binds[:limit]]
     output = "\n".join(bind_strings)
 
-    if len(guild_binds) > 5:
+    if len(guild_binds) > limit:
         output += (
-            f"\n_... and {len(guild_binds) - 5} more. "
+            f"\n_... and {len(guild_binds) - limit} more. "
             f"Click [here](https://www.blox.link/dashboard/guilds/{
                 guild_id}/binds) to view the rest!_"
         )
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import Type
-from bloxlink_lib.models.binds import GuildBind, VALID_BIND_TYPES
+from bloxlink_lib.models.binds import BindIdentityKey, GuildBind, VALID_BIND_TYPES
 from bloxlink_lib.models.schemas.guilds import (  # pylint: disable=no-name-in-module
     GuildRestriction,
 )
@@ -211,15 +211,15 @@ def migrate_nickname_template(nickname_template: str | None) -> str | None:
 def migrate_binds(guild_binds: list[GuildBind]) -> list[GuildBind]:
     """Migrate the binds field. This will merge duplicate binds."""
 
-    binds_by_hash: dict[int, GuildBind] = {}
+    binds_by_key: dict[BindIdentityKey, GuildBind] = {}
 
     for bind in guild_binds:
-        bind_hash = hash(bind)
+        bind_key = bind.identity_key
 
-        if bind_hash not in binds_by_hash:
-            binds_by_hash[bind_hash] = bind
+        if bind_key not in binds_by_key:
+            binds_by_key[bind_key] = bind
         else:
-            binds_by_hash[bind_hash].roles.extend(bind.roles)
-            binds_by_hash[bind_hash].remove_roles.extend(bind.remove_roles)
+            binds_by_key[bind_key].roles.extend(bind.roles)
+            binds_by_key[bind_key].remove_roles.extend(bind.remove_roles)
 
-    return list(binds_by_hash.values())
+    return list(binds_by_key.values())
@@ -1,7 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import Literal
+import asyncio
+from functools import cache
+import logging
+import time
+from typing import Final, Iterable, Literal, Type
+from weakref import WeakValueDictionary
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
+
+from bloxlink_lib.exceptions import RobloxAPIError, RobloxDown, RobloxNotFound
+
+# how long an interned entity is shared before create_entity() replaces it with a fresh one
+ENTITY_REGISTRY_TTL: Final[int] = 300
+
+_entity_registry: WeakValueDictionary[tuple[str, int | None], "RobloxEntity"] = (
+    WeakValueDictionary()
+)
 
 
 class RobloxEntity(BaseModel, ABC):
@@ -20,6 +34,17 @@ class RobloxEntity(BaseModel, ABC):
     synced: bool = False
     url: str = None
 
+    _interned_at: float | None = PrivateAttr(default=None)
+
+    @property
+    def stale(self) -> bool:
+        """If this entity was interned more than ENTITY_REGISTRY_TTL seconds ago."""
+
+        return (
+            self._interned_at is not None
+            and time.monotonic() - self._interned_at > ENTITY_REGISTRY_TTL
+        )
+
     @abstractmethod
     async def sync(self):
         """Sync a Roblox entity with the data from Roblox."""
@@ -43,6 +68,21 @@ class BloxlinkEntity(RobloxEntity):
         return "Verified Users" if self.type == "verified" else "Unverified Users"
 
 
+@cache
+def _entity_types() -> dict[str, Type[RobloxEntity]]:
+    """Get the entity class of each category. Imported on first use to avoid circular imports."""
+
+    # pylint: disable=import-outside-toplevel
+    from bloxlink_lib.models.roblox import assets, badges, gamepasses, groups
+
+    return {
+        "asset": assets.RobloxAsset,
+        "badge": badges.RobloxBadge,
+        "gamepass": gamepasses.RobloxGamepass,
+        "group": groups.RobloxGroup,
+    }
+
+
 def create_entity(
     category: (
         Literal["asset", "badge", "gamepass", "group", "verified", "unverified"] | str
@@ -51,47 +91,53 @@ def create_entity(
 ) -> RobloxEntity | None:
     """Create a respective Roblox entity from a category and ID.
 
+    Entities are interned by (category, ID), so every caller in the process shares the
+    same instance and its sync state for as long as it is referenced. An interned entity
+    is replaced with a fresh, unsynced one once it is older than ENTITY_REGISTRY_TTL, so
+    changes on Roblox (such as group rolesets) are picked up by the next sync. Holders
+    of the old instance keep it until they create the entity again.
+
     Args:
         category(str): Type of Roblox entity to make. Subset from asset, badge, group, gamepass.
         entity_id(int): ID of the entity on Roblox.
 
     Returns:
-        RobloxEntity: The respective RobloxEntity implementer, unsynced, or None if the category is invalid.
+        RobloxEntity: The respective RobloxEntity implementer, or None if the category is invalid.
     """
 
-    match category:
-        case "asset":
-            from bloxlink_lib.models.roblox import (
-                assets,
-            )  # pylint: disable=import-outside-toplevel
+    if category in ("verified", "unverified"):
+        entity_id = None
+    elif category not in _entity_types():
+        return None
 
-            return assets.RobloxAsset(id=entity_id)
+    entity_key = (category, entity_id)
+    entity = _entity_registry.get(entity_key)
 
-        case "badge":
-            from bloxlink_lib.models.roblox import (
-                badges,
-            )  # pylint: disable=import-outside-toplevel
+    if entity is None or entity.stale:
+        entity = (
+            BloxlinkEntity(type=category)
+            if category in ("verified", "unverified")
+            else _entity_types()[category](id=entity_id)
+        )
+        entity._interned_at = time.monotonic()  # pylint: disable=protected-access
 
-            return badges.RobloxBadge(id=entity_id)
+        _entity_registry[entity_key] = entity
+
+    return entity
 
-        case "gamepass":
-            from bloxlink_lib.models.roblox import (
-                gamepasses,
-            )  # pylint: disable=import-outside-toplevel
 
-            return gamepasses.RobloxGamepass(id=entity_id)
+def get_interned_entity(category: str, entity_id: int) -> RobloxEntity | None:
+    """Get the entity that create_entity() currently shares for a category and ID, without creating one."""
 
-        case "group":
-            from bloxlink_lib.models.roblox import (
-                groups,
-            )  # pylint: disable=import-outside-toplevel
+    return _entity_registry.get(
+        (category, None if category in ("verified", "unverified") else entity_id)
+    )
 
-            return groups.RobloxGroup(id=entity_id)
 
-        case "verified" | "unverified":
-            return BloxlinkEntity(type=category)
+def clear_entity_registry():
+    """Forget all interned entities, so the next create_entity() calls make fresh ones."""
 
-    return None
+    _entity_registry.clear()
 
 
 async def get_entity(
@@ -112,3 +158,61 @@ async def get_entity(
     await entity.sync()
 
     return entity
+
+
+async def sync_entities(
+    entities: Iterable[RobloxEntity | None], concurrency: int = 10
+) -> list[RobloxEntity]:
+    """Sync Roblox entities concurrently.
+
+    Entities are deduplicated by their type and ID, so each is only synced once. Duplicate
+    instances receive the synced data of the first one. Entities that fail to sync are
+    logged and skipped instead of failing the whole batch.
+
+    Args:
+        entities (Iterable[RobloxEntity | None]): The entities to sync. None values are ignored.
+        concurrency (int, optional): How many entities can be synced at once. Defaults to 10.
+
+    Returns:
+        list[RobloxEntity]: The entities that failed to sync.
+    """
+
+    unique_entities: dict[tuple, list[RobloxEntity]] = {}
+
+    for entity in entities:
+        if entity is None:
+            continue
+
+        entity_key = (
+            (type(entity), entity.id) if entity.id is not None else (id(entity),)
+        )
+        unique_entities.setdefault(entity_key, []).append(entity)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    failed_entities: list[RobloxEntity] = []
+
+    async def _sync(entity: RobloxEntity, duplicates: list[RobloxEntity]):
+        async with semaphore:
+            try:
+                await entity.sync()
+            except (RobloxAPIError, RobloxDown, RobloxNotFound) as exc:
+                logging.warning(
+                    f"Failed to sync {type(entity).__name__} {entity.id}: {exc}"
+                )
+                failed_entities.extend([entity, *duplicates])
+                return
+
+        for duplicate in duplicates:
+            if duplicate is not entity:
+                for field_name, field in type(entity).model_fields.items():
+                    if not field.deprecated:
+                        setattr(duplicate, field_name, getattr(entity, field_name))
+
+    await asyncio.gather(
+        *(
+            _sync(same_entities[0], same_entities[1:])
+            for same_entities in unique_entities.values()
+        )
+    )
+
+    return failed_entities
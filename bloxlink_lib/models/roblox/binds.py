@@ -1,20 +1,35 @@
 from __future__ import annotations
 import logging
 import math
+from collections import OrderedDict
 from enum import Enum
 import re
-from typing import TYPE_CHECKING
+from datetime import datetime
+from typing import TYPE_CHECKING, AsyncGenerator, Final
 from hikari import Member, Role
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from bloxlink_lib.models.base import BaseModel
 from bloxlink_lib.models.base.serializable import MemberSerializable, RoleSerializable
 from bloxlink_lib.models.binds import (
     BindCriteria,
     GuildBind,
+    exclude_existing_binds,
+    remove_binds,
 )
 from bloxlink_lib.models.roblox.users import RobloxUser
+from bloxlink_lib.models.schemas import DatabaseDomains
+from bloxlink_lib.database.mongodb import (  # pylint: disable=no-name-in-module
+    mongo,
+    TRUSTED_CACHE_PREFIX,
+)
+from bloxlink_lib.database.redis import redis  # pylint: disable=no-name-in-module
 from bloxlink_lib.models.schemas.guilds import (  # pylint: disable=no-name-in-module
+    GuildData,
     fetch_guild_data,
     update_guild_data,
 )
+from bloxlink_lib.tracing import current_span, traced
 from bloxlink_lib.utils import find
 
 if TYPE_CHECKING:
@@ -24,11 +39,35 @@ if TYPE_CHECKING:
 
 POP_OLD_BINDS: bool = False  # remove old binds from the database
 SAVE_NEW_BINDS: bool = False  # save new binds to the database
+BINDS_MIGRATION_VERSION: Final[int] = 1  # bump when the stored bind format changes
 
 ARBITRARY_GROUP_TEMPLATE = re.compile(r"\{group-rank-(\d+)\}")
 NICKNAME_TEMPLATE_REGEX = re.compile(r"\{(.*?)\}")
 ROLESET_BRACKET_TEMPLATE = re.compile(r"\[(.*)\]")
 
+# every guild aspect that bind evaluation reads, so that it can be fetched in one round trip
+BIND_CONTEXT_ASPECTS: Final[tuple[str, ...]] = (
+    "binds",
+    "roleBinds",
+    "groupIDs",
+    "migratedBindsToV4",
+    "bindsMigrationVersion",
+    "verifiedRole",
+    "unverifiedRole",
+    "verifiedRoleName",
+    "unverifiedRoleName",
+    "verifiedRoleEnabled",
+    "unverifiedRoleEnabled",
+    "updatedAt",
+)
+BIND_CONTEXT_CACHE_SIZE: Final[int] = 1000
+# the aspects that migrate_guild_binds_batch() writes
+MIGRATED_ASPECTS: Final[tuple[str, ...]] = (
+    "binds",
+    "migratedBindsToV4",
+    "bindsMigrationVersion",
+)
+
 
 class RobloxUserNicknames(Enum):
     """Valid nickname templates for a Roblox user"""
@@ -58,33 +97,116 @@ class GenericTemplates(Enum):
     VERIFY_URL = "verify-url"
 
 
+class BindMigrationBatchResult(BaseModel):
+    """The outcome of migrating one batch of guilds to V4 binds.
+
+    Attributes:
+        migrated (int): Number of guilds whose binds were saved in V4.
+        skipped (int): Number of guilds that changed while the batch was migrating. These are left for a later run.
+        failed (int): Number of guilds that could not be migrated. These are logged to V4_MIGRATOR_ERROR_LOGS.
+        last_guild_id (str | int | None): The last guild ID in this batch. Pass it as after_id to resume.
+    """
+
+    migrated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    last_guild_id: str | int | None = None
+
+
+class GuildBindContext(BaseModel):
+    """Snapshot of the guild data required to evaluate binds.
+
+    Attributes:
+        guild_id (str): ID of the guild.
+        guild_data (GuildData): The guild data, projected to BIND_CONTEXT_ASPECTS. Its binds
+            are already migrated to V4.
+    """
+
+    guild_id: str
+    guild_data: GuildData
+
+    @property
+    def version(self) -> datetime | None:
+        """When the guild data was last updated. Can be used to key caches of this snapshot."""
+
+        return self.guild_data.updatedAt
+
+
+# the most recently used bind contexts, by guild ID and version
+_bind_contexts: OrderedDict[tuple[str, datetime], GuildBindContext] = OrderedDict()
+
+
+async def fetch_bind_context(guild_id: int | str) -> GuildBindContext:
+    """Fetch everything needed to evaluate the binds of a guild in a single read.
+
+    The V3 binds of the guild are migrated to V4 as part of loading the context. Contexts are cached
+    by guild ID and version, so only the version is read while the guild data is unchanged.
+    Each caller gets its own copy, since get_binds() changes the binds of its context.
+    """
+
+    guild_id = str(guild_id)
+
+    version = (await fetch_guild_data(guild_id, "updatedAt")).updatedAt
+    bind_context = _bind_contexts.get((guild_id, version)) if version else None
+
+    if bind_context:
+        _bind_contexts.move_to_end((guild_id, version))
+
+        return bind_context.model_copy(deep=True)
+
+    guild_data = await fetch_guild_data(guild_id, *BIND_CONTEXT_ASPECTS)
+
+    if not is_binds_migrated(guild_data):
+        guild_data.binds = await migrate_old_binds_to_v4(
+            guild_id,
+            guild_data.binds,
+            guild_data=guild_data,
+        )
+
+    bind_context = GuildBindContext(guild_id=guild_id, guild_data=guild_data)
+
+    # the migration above is a write, which gives the guild data a newer version than this snapshot
+    if bind_context.version and bind_context.version == version:
+        _bind_contexts[(guild_id, version)] = bind_context.model_copy(deep=True)
+
+        if len(_bind_contexts) > BIND_CONTEXT_CACHE_SIZE:
+            _bind_contexts.popitem(last=False)
+
+    return bind_context
+
+
+@traced("get_binds")
 async def get_binds(
     guild_id: int | str,
     category: VALID_BIND_TYPES = None,
     bind_id: int = None,
     guild_roles: dict[int, RoleSerializable] | list[Role] = None,
+    *,
+    bind_context: GuildBindContext | None = None,
 ) -> list[GuildBind]:
     """Get the current guild binds.
 
     Old binds will be included by default, but will not be saved in the database in the
     new format unless the POP_OLD_BINDS flag is set to True. While it is False, old formatted binds will
     be left as is.
+
+    A bind context from fetch_bind_context() can be passed to skip fetching the guild data.
     """
 
     guild_id = str(guild_id)
 
-    guild_data = await fetch_guild_data(guild_id, "binds")
-    guild_data.binds = await migrate_old_binds_to_v4(
-        guild_id,
-        guild_data.binds,
-    )
+    bind_context = bind_context or await fetch_bind_context(guild_id)
+    guild_data = bind_context.guild_data
 
     if isinstance(guild_roles, list):
         guild_roles = {r.id: RoleSerializable.from_hikari(r) for r in guild_roles}
 
     if guild_roles:
         await check_for_verified_roles(
-            guild_id, guild_roles=guild_roles, merge_to=guild_data.binds
+            guild_id,
+            guild_roles=guild_roles,
+            merge_to=guild_data.binds,
+            guild_data=guild_data,
         )
 
         # filter out invalid roles from binds
@@ -99,10 +221,10 @@ async def get_binds(
                 binds_to_remove.append(bind)
 
         # Remove binds that have no valid roles
-        for bind in binds_to_remove:
-            guild_data.binds.remove(bind)
+        if binds_to_remove:
+            guild_data.binds[:] = remove_binds(guild_data.binds, *binds_to_remove)
 
-    return list(
+    binds = list(
         filter(
             lambda b: b.type == category
             and ((bind_id and b.criteria.id == bind_id) or not bind_id),
@@ -112,6 +234,11 @@ async def get_binds(
         else guild_data.binds
     )
 
+    current_span().set_attribute("guild.roles", len(guild_roles or ()))
+    current_span().set_attribute("guild.binds", len(binds))
+
+    return binds
+
 
 async def get_nickname_template(
     guild_id, potential_binds: list[GuildBind], roblox_user: RobloxUser | None = None
@@ -143,6 +270,7 @@ async def get_nickname_template(
     return nickname_template, highest_priority_bind
 
 
+@traced("parse_template")
 async def parse_template(
     *,
     guild_id: int,
@@ -317,35 +445,32 @@ async def parse_template(
 async def migrate_old_binds_to_v4(
     guild_id: str,
     binds: list[GuildBind],
+    guild_data: GuildData | None = None,
 ) -> list[GuildBind]:
     """Migrates binds from the V3 structure to V4 and optionally saves them to the database.
 
     If POP_OLD_BINDS is true, the old binds will be removed from the database.
+    The guild data is fetched unless it is passed with the V3 bind aspects loaded.
     """
 
-    guild_data = await fetch_guild_data(
+    guild_data = guild_data or await fetch_guild_data(
         guild_id,
         "roleBinds",
         "groupIDs",
         "migratedBindsToV4",
     )
 
-    new_migrated_binds: list[GuildBind] = []
-
-    if not guild_data.migratedBindsToV4 and (
-        guild_data.roleBinds or guild_data.groupIDs
-    ):
-        new_migrated_binds = GuildBind.from_V3(guild_data)
+    new_migrated_binds = merge_v3_binds(binds, guild_data)
 
     if new_migrated_binds:
-        # Remove duplicates
-        binds.extend(b for b in new_migrated_binds if b not in binds)
+        binds.extend(new_migrated_binds)
 
         if SAVE_NEW_BINDS:
             await update_guild_data(
                 guild_id,
                 binds=[b.model_dump(exclude_unset=True, by_alias=True) for b in binds],
                 migratedBindsToV4=True,
+                bindsMigrationVersion=BINDS_MIGRATION_VERSION,
             )
 
     # if POP_OLD_BINDS, remove v3 binds from the database
@@ -358,20 +483,188 @@ async def migrate_old_binds_to_v4(
     return binds
 
 
+def is_binds_migrated(guild_data: GuildData) -> bool:
+    """Check if the guild's binds were persisted in the current V4 format."""
+
+    return (guild_data.bindsMigrationVersion or 0) >= BINDS_MIGRATION_VERSION
+
+
+def merge_v3_binds(binds: list[GuildBind], guild_data: GuildData) -> list[GuildBind]:
+    """Convert the guild's V3 binds and return the ones not already in binds.
+
+    Guilds flagged with migratedBindsToV4 have no V3 binds to convert.
+    """
+
+    if guild_data.migratedBindsToV4 or not (
+        guild_data.roleBinds or guild_data.groupIDs
+    ):
+        return []
+
+    # Remove duplicates
+    return exclude_existing_binds(binds, GuildBind.from_V3(guild_data))
+
+
+def binds_migration_query(after_id: str | int | None = None) -> dict:
+    """Build the query for the guilds with V3 binds that are not persisted in V4 yet."""
+
+    query = {
+        "bindsMigrationVersion": {"$not": {"$gte": BINDS_MIGRATION_VERSION}},
+        "$or": [
+            {"roleBinds": {"$exists": True, "$ne": None}},
+            {"groupIDs": {"$exists": True, "$ne": None}},
+        ],
+    }
+
+    if after_id is not None:
+        query["_id"] = {"$gt": after_id}
+
+    return query
+
+
+async def migrate_guild_binds_batch(
+    batch_size: int = 500, after_id: str | int | None = None
+) -> BindMigrationBatchResult:
+    """Convert the V3 binds of a batch of guilds and persist them in V4.
+
+    Guilds are processed in _id order, so the migration can be resumed by passing the
+    last_guild_id of the previous batch as after_id. Migrated guilds are stamped with
+    BINDS_MIGRATION_VERSION, which lets get_binds skip migrating them. Guilds whose binds or
+    updatedAt changed since they were read are not overwritten, and are counted as skipped.
+
+    Args:
+        batch_size (int, optional): The maximum number of guilds to migrate. Defaults to 500.
+        after_id (str | int, optional): Only migrate guilds with an _id after this one. Defaults to None.
+
+    Returns:
+        BindMigrationBatchResult: The outcome of this batch. last_guild_id is None if no guilds were left.
+    """
+
+    database_domain = GuildData.database_domain().value
+    guilds = mongo.bloxlink[database_domain]
+    error_logs = mongo.bloxlink[DatabaseDomains.V4_MIGRATOR_ERROR_LOGS.value]
+
+    cursor = (
+        guilds.find(
+            binds_migration_query(after_id),
+            {
+                "binds": 1,
+                "roleBinds": 1,
+                "groupIDs": 1,
+                "migratedBindsToV4": 1,
+                "updatedAt": 1,
+            },
+        )
+        .sort("_id", 1)
+        .limit(batch_size)
+    )
+
+    result = BindMigrationBatchResult()
+    updates: list[UpdateOne] = []
+    migrated_guild_ids: list[str | int] = []
+
+    async for guild in cursor:
+        guild_id = guild["_id"]
+        result.last_guild_id = guild_id
+
+        try:
+            guild_data = GuildData(**guild)
+        except ValidationError as exc:
+            logging.warning(f"Failed to migrate the binds of guild {guild_id}: {exc}")
+
+            await error_logs.update_one(
+                {"_id": guild_id},
+                {"$set": {"error": str(exc)}, "$currentDate": {"updatedAt": True}},
+                upsert=True,
+            )
+            result.failed += 1
+
+            continue
+
+        guild_binds = guild_data.binds
+        guild_binds.extend(merge_v3_binds(guild_binds, guild_data))
+
+        updates.append(
+            UpdateOne(
+                # only write over the binds this migration read
+                {
+                    "_id": guild_id,
+                    "binds": guild.get("binds"),
+                    "updatedAt": guild.get("updatedAt"),
+                },
+                {
+                    "$set": {
+                        "binds": [
+                            b.model_dump(exclude_unset=True, by_alias=True)
+                            for b in guild_binds
+                        ],
+                        "migratedBindsToV4": True,
+                        "bindsMigrationVersion": BINDS_MIGRATION_VERSION,
+                    },
+                    "$currentDate": {"updatedAt": True},
+                },
+            )
+        )
+        migrated_guild_ids.append(guild_id)
+
+    if updates:
+        write_result = await guilds.bulk_write(updates, ordered=False)
+
+        # drop cached copies of the written aspects so the next read sees the new version
+        async with redis.pipeline() as pipeline:
+            for guild_id in migrated_guild_ids:
+                await pipeline.hdel(
+                    f"{database_domain}:{guild_id}",
+                    *MIGRATED_ASPECTS,
+                    *(f"{TRUSTED_CACHE_PREFIX}{x}" for x in MIGRATED_ASPECTS),
+                )
+
+            await pipeline.execute()
+
+        result.migrated = write_result.matched_count
+        result.skipped = len(updates) - write_result.matched_count
+
+    return result
+
+
+async def migrate_all_guild_binds(
+    batch_size: int = 500, after_id: str | int | None = None
+) -> AsyncGenerator[BindMigrationBatchResult, None]:
+    """Migrate the V3 binds of every guild to V4 in batches.
+
+    Yields the result of each batch so that progress can be recorded, and the migration
+    resumed from the last_guild_id of a batch if it is interrupted.
+    """
+
+    while True:
+        batch_result = await migrate_guild_binds_batch(batch_size, after_id)
+
+        if batch_result.last_guild_id is None:
+            return
+
+        yield batch_result
+
+        after_id = batch_result.last_guild_id
+
+
 async def check_for_verified_roles(
     guild_id: int | str,
     guild_roles: dict[int, RoleSerializable],
     merge_to: list[GuildBind],
+    guild_data: GuildData | None = None,
 ):
-    """Check for existing verified/unverified roles and update the database."""
+    """Check for existing verified/unverified roles and update the database.
+
+    The guild data is fetched unless it is passed with the verified role aspects loaded.
+    """
 
     guild_id = str(guild_id)
-    guild_data = await fetch_guild_data(
+    guild_data = guild_data or await fetch_guild_data(
         guild_id,
         "verifiedRole",
         "unverifiedRole",
         "verifiedRoleName",
         "unverifiedRoleName",
+        "verifiedRoleEnabled",
         "unverifiedRoleEnabled",
     )
 
@@ -455,13 +748,7 @@ async def delete_bind(
         remove_bind_hashes (list[int]): Hashes of the binds to remove. This can be found by calling hash() on the bind.
     """
 
-    guild_binds = await get_binds(str(guild_id))
-
-    for bind in binds:
-        try:
-            guild_binds.remove(bind)
-        except ValueError:
-            raise ValueError(f"Bind not found: {bind.id}")
+    guild_binds = remove_binds(await get_binds(str(guild_id)), *binds)
 
     await update_guild_data(
         guild_id,
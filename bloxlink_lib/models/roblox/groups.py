@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
 from enum import Enum
+import hashlib
+import logging
 import re
-from typing import TYPE_CHECKING, Annotated
+import time
+from typing import TYPE_CHECKING, Annotated, Any, Callable, Coroutine, Final
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
-from bloxlink_lib.exceptions import RobloxAPIError, RobloxNotFound
+from bloxlink_lib.database.redis import redis  # pylint: disable=no-name-in-module
+from bloxlink_lib.exceptions import RobloxAPIError, RobloxDown, RobloxNotFound
 from bloxlink_lib.fetch import fetch_typed
 from bloxlink_lib.models.base import BaseModel
-from .base import RobloxEntity
+from bloxlink_lib.utils import create_task_log_exception
+from .base import RobloxEntity, get_interned_entity
 
 if TYPE_CHECKING:
     from .users import RobloxUser
@@ -17,6 +25,22 @@ if TYPE_CHECKING:
 GROUP_API = "https://groups.roblox.com/v1/groups"
 ROBLOX_GROUP_REGEX = re.compile(r"roblox.com/communities/(\d+)/")
 
+# rolesets rarely change, so they are kept for a long time and revalidated in the background
+GROUP_ROLESETS_TTL: Final[int] = int(timedelta(days=7).total_seconds())
+GROUP_ROLESETS_REFRESH_AFTER: Final[int] = int(timedelta(hours=1).total_seconds())
+GROUP_DATA_TTL: Final[int] = int(timedelta(days=1).total_seconds())
+GROUP_DATA_REFRESH_AFTER: Final[int] = int(timedelta(hours=1).total_seconds())
+
+# reads of each group since the last run of the refresher. The least read groups are trimmed
+# past HOT_GROUP_ROLESETS_MAX_SIZE, and the set expires if no refresher runs
+HOT_GROUP_ROLESETS_KEY: Final[str] = "group_rolesets:hot"
+HOT_GROUP_ROLESETS_MAX_SIZE: Final[int] = 10_000
+HOT_GROUP_ROLESETS_TTL: Final[int] = GROUP_ROLESETS_REFRESH_AFTER
+GROUP_ROLESETS_REFRESHER_LOCK_KEY: Final[str] = "group_rolesets:hot:lock"
+
+_refreshing_group_rolesets: set[int] = set()
+_refreshing_group_data: set[int] = set()
+
 
 class GroupRoleset(BaseModel):
     """Representation of a roleset in a Roblox group."""
@@ -37,6 +61,59 @@ class RobloxRoleset(BaseModel):
     roles: list[GroupRoleset]
 
 
+class CachedGroupRolesets(BaseModel):
+    """The rolesets of a group as they are stored in Redis.
+
+    Attributes:
+        rolesets (dict[int, GroupRoleset]): Rolesets of the group by rank, without the Guest roleset.
+        etag (str, optional): The ETag of the response from Roblox, used to revalidate the rolesets.
+        fetched_at (float): When the rolesets were last fetched or revalidated, as a UNIX timestamp.
+    """
+
+    rolesets: dict[int, GroupRoleset]
+    etag: str | None = None
+    fetched_at: float
+
+    @property
+    def content_hash(self) -> str:
+        """Hash of the rolesets, ignoring member counts. Used when Roblox does not send an ETag."""
+
+        content = ",".join(
+            f"{roleset.rank}:{roleset.id}:{roleset.name}"
+            for roleset in sorted(self.rolesets.values(), key=lambda r: r.rank)
+        )
+
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    @property
+    def stale(self) -> bool:
+        """If the rolesets are older than GROUP_ROLESETS_REFRESH_AFTER and should be revalidated."""
+
+        return time.time() - self.fetched_at > GROUP_ROLESETS_REFRESH_AFTER
+
+
+class CachedGroupData(BaseModel):
+    """The data of a group as it is stored in Redis.
+
+    Attributes:
+        name (str, optional): The name of the group.
+        description (str, optional): The description of the group.
+        member_count (int, optional): Number of members in the group.
+        fetched_at (float): When the data was last fetched, as a UNIX timestamp.
+    """
+
+    name: str | None = None
+    description: str | None = None
+    member_count: int | None = None
+    fetched_at: float
+
+    @property
+    def stale(self) -> bool:
+        """If the data is older than GROUP_DATA_REFRESH_AFTER and should be refetched."""
+
+        return time.time() - self.fetched_at > GROUP_DATA_REFRESH_AFTER
+
+
 class RobloxGroupOwner(BaseModel):
     """Representation of a group owner in a Roblox group."""
 
@@ -53,38 +130,54 @@ class RobloxGroup(RobloxEntity):
     Attributes:
         member_count (int): Number of members in this group. None by default.
         rolesets (dict[int, str], optional): Rolesets of this group, by {roleset_id: roleset_name}. None by default.
-        user_roleset (dict): The roleset of a specific user in this group. Used for applying binds.
+        user_roleset (dict): Deprecated and no longer set. Groups are shared between callers by
+            create_entity(), so the roleset of a user is only returned by sync_for().
+
+    The lookup tables of the rolesets (by name, sorted ranks and the enum) are built on first use
+    and rebuilt only after rolesets is assigned, such as by sync(). Mutating rolesets in place
+    does not rebuild them.
 
     This is in addition to attributes provided by RobloxEntity.
     """
 
     member_count: int = Field(alias="memberCount", default=None)
     rolesets: dict[int, GroupRoleset] | None = None
-    user_roleset: GroupRoleset | None = None
+    user_roleset: GroupRoleset | None = Field(
+        default=None,
+        deprecated="Groups are shared between users, use the roleset returned by sync_for() instead.",
+    )
     has_verified_badge: bool | None = Field(alias="hasVerifiedBadge", default=None)
     owner: RobloxGroupOwner | None = None
     public_entry_allowed: bool | None = Field(alias="publicEntryAllowed", default=None)
 
+    _rolesets_by_name: dict[str, GroupRoleset] | None = PrivateAttr(default=None)
+    _roleset_ranks: list[int] | None = PrivateAttr(default=None)
+    _roleset_enum: type[Enum] | None = PrivateAttr(default=None)
+
     def model_post_init(self, __context):
         self.url = f"https://www.roblox.com/groups/{self.id}"
 
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+
+        if name == "rolesets":
+            self._rolesets_by_name = None
+            self._roleset_ranks = None
+            self._roleset_enum = None
+
     async def sync(self):
-        """Retrieve the roblox group information, consisting of rolesets, name, description, and member count."""
+        """Retrieve the roblox group information, consisting of rolesets, name, description, and member count.
+
+        Stored rolesets and group data are used right away, only a group that is not stored waits on Roblox.
+        """
 
         if self.synced:
             return
 
         if self.rolesets is None:
-            roleset_data, _ = await fetch_typed(
-                RobloxRoleset, f"{GROUP_API}/{self.id}/roles"
-            )
-            self.rolesets = {
-                int(roleset.rank): roleset
-                for roleset in roleset_data.roles
-                if roleset.name != "Guest"
-            }
+            self.rolesets = await get_group_rolesets(self.id)
 
-        group_data, _ = await fetch_typed(RobloxGroup, f"{GROUP_API}/{self.id}")
+        group_data = await get_group_data(self.id)
 
         self.name = group_data.name
         self.description = group_data.description
@@ -92,20 +185,48 @@ class RobloxGroup(RobloxEntity):
 
         self.synced = True
 
-    async def sync_for(self, roblox_user: RobloxUser, sync: bool = False):
+    async def sync_for(
+        self, roblox_user: RobloxUser, sync: bool = False
+    ) -> GroupRoleset | None:
         """Sync and retrieve the roleset of a specific user in this group."""
 
         if sync:
             await self.sync()
 
-        if self.user_roleset is None:
-            if roblox_user.groups is None:
-                await roblox_user.sync(["groups"])
+        if roblox_user.groups is None:
+            await roblox_user.sync(["groups"])
 
-            user_group = roblox_user.groups.get(self.id)
+        user_group = roblox_user.groups.get(self.id)
 
-            if user_group:
-                self.user_roleset = user_group.role
+        return user_group.role if user_group else None
+
+    @property
+    def rolesets_by_name(self) -> dict[str, GroupRoleset]:
+        """Get the rolesets of this group by their name."""
+
+        if self._rolesets_by_name is None:
+            self._rolesets_by_name = {
+                roleset.name: roleset for roleset in (self.rolesets or {}).values()
+            }
+
+        return self._rolesets_by_name
+
+    @property
+    def roleset_ranks(self) -> list[int]:
+        """Get the ranks of the rolesets in this group, sorted from lowest to highest."""
+
+        if self._roleset_ranks is None:
+            self._roleset_ranks = sorted(self.rolesets or {})
+
+        return self._roleset_ranks
+
+    def rolesets_in_range(self, min_rank: int, max_rank: int) -> list[GroupRoleset]:
+        """Get the rolesets of this group with a rank between min_rank and max_rank, inclusive."""
+
+        ranks = self.roleset_ranks
+        start, end = bisect_left(ranks, min_rank), bisect_right(ranks, max_rank)
+
+        return [self.rolesets[rank] for rank in ranks[start:end]]
 
     def roleset_name_string(
         self, roleset_id: int, bold_name=True, include_id=True
@@ -121,11 +242,8 @@ class RobloxGroup(RobloxEntity):
             str: The roleset string as requested.
         """
 
-        roleset_name = (
-            self.rolesets[roleset_id].name
-            if self.synced and self.rolesets.get(roleset_id) is not None
-            else ""
-        )
+        roleset = self.rolesets.get(roleset_id) if self.synced else None
+        roleset_name = roleset.name if roleset is not None else ""
 
         if bold_name and roleset_name:
             roleset_name = f"**{roleset_name}**"
@@ -139,19 +257,296 @@ class RobloxGroup(RobloxEntity):
     def roleset_enum(self) -> Enum[str, GroupRoleset]:
         """Get the names of the rolesets in this group as an enum."""
 
-        return Enum(
-            "Rolesets",
-            [
-                (roleset.name.upper(), self.rolesets.get(roleset.rank))
-                for roleset in self.rolesets.values()
-            ],
-        )
+        if self._roleset_enum is None:
+            self._roleset_enum = Enum(
+                "Rolesets",
+                [
+                    (roleset.name.upper(), self.rolesets.get(roleset.rank))
+                    for roleset in self.rolesets.values()
+                ],
+            )
+
+        return self._roleset_enum
 
     def __str__(self) -> str:
         name = f"**{self.name}**" if self.name else "*(Unknown Group)*"
         return f"{name} ({self.id})"
 
 
+async def _read_cached_group_rolesets(
+    group_id: int, track_hot: bool = True
+) -> CachedGroupRolesets | None:
+    """Read the stored rolesets of a group. Reads are counted towards the hot groups by default."""
+
+    if not track_hot:
+        cached_rolesets = await redis.get(f"group_rolesets:{group_id}")
+    else:
+        async with redis.pipeline() as pipeline:
+            await pipeline.get(f"group_rolesets:{group_id}")
+            await pipeline.zincrby(HOT_GROUP_ROLESETS_KEY, 1, group_id)
+            await pipeline.zremrangebyrank(
+                HOT_GROUP_ROLESETS_KEY, 0, -HOT_GROUP_ROLESETS_MAX_SIZE - 1
+            )
+            await pipeline.expire(HOT_GROUP_ROLESETS_KEY, HOT_GROUP_ROLESETS_TTL)
+            cached_rolesets, *_ = await pipeline.execute()
+
+    if not cached_rolesets:
+        return None
+
+    return CachedGroupRolesets.model_validate_json(cached_rolesets)
+
+
+async def refresh_group_rolesets(
+    group_id: int, cached_rolesets: CachedGroupRolesets | None = None
+) -> tuple[CachedGroupRolesets | None, bool]:
+    """Fetch the rolesets of a group from Roblox and store them.
+
+    If stored rolesets are given, the request is conditional on their ETag. When the rolesets
+    changed, they are also applied to the interned RobloxGroup of this group.
+
+    Args:
+        group_id (int): ID of the group.
+        cached_rolesets (CachedGroupRolesets, optional): The currently stored rolesets. Defaults to None.
+
+    Returns:
+        tuple[CachedGroupRolesets | None, bool]: The stored rolesets, and if they changed.
+            The rolesets are None if there were none stored and Roblox did not return any.
+    """
+
+    roleset_data, response = await fetch_typed(
+        RobloxRoleset,
+        f"{GROUP_API}/{group_id}/roles",
+        headers=(
+            {"If-None-Match": cached_rolesets.etag}
+            if cached_rolesets and cached_rolesets.etag
+            else None
+        ),
+    )
+
+    if roleset_data is None and cached_rolesets is None:
+        logging.warning(f"Roblox returned no rolesets for group {group_id}")
+        return None, False
+
+    new_rolesets = (
+        CachedGroupRolesets(
+            rolesets={
+                int(roleset.rank): roleset
+                for roleset in roleset_data.roles
+                if roleset.name != "Guest"
+            },
+            etag=response.headers.get("ETag"),
+            fetched_at=time.time(),
+        )
+        if roleset_data is not None
+        else None
+    )
+    changed = cached_rolesets is None or (
+        new_rolesets is not None
+        and new_rolesets.content_hash != cached_rolesets.content_hash
+    )
+
+    if not changed:
+        # not modified (304) or the same content: keep the stored roleset objects
+        new_rolesets = cached_rolesets.model_copy(
+            update={
+                "etag": response.headers.get("ETag") or cached_rolesets.etag,
+                "fetched_at": time.time(),
+            }
+        )
+
+    await redis.set(
+        f"group_rolesets:{group_id}",
+        new_rolesets.model_dump_json(by_alias=True),
+        ex=GROUP_ROLESETS_TTL,
+    )
+
+    if changed:
+        group = get_interned_entity("group", group_id)
+
+        if group is not None and group.rolesets is not None:
+            group.rolesets = new_rolesets.rolesets
+
+    return new_rolesets, changed
+
+
+def _schedule_refresh(
+    refreshing: set[int], group_id: int, refresh: Callable[[], Coroutine]
+):
+    """Run a refresh of a group in the background, unless one is already running for the group."""
+
+    if group_id in refreshing:
+        return
+
+    refreshing.add(group_id)
+
+    task = create_task_log_exception(refresh())
+    task.add_done_callback(lambda _: refreshing.discard(group_id))
+
+
+def _schedule_group_rolesets_refresh(
+    group_id: int, cached_rolesets: CachedGroupRolesets
+):
+    """Refresh the rolesets of a group in the background, unless a refresh is already running."""
+
+    _schedule_refresh(
+        _refreshing_group_rolesets,
+        group_id,
+        lambda: refresh_group_rolesets(group_id, cached_rolesets),
+    )
+
+
+async def get_group_rolesets(group_id: int) -> dict[int, GroupRoleset]:
+    """Get the rolesets of a group from the roleset store.
+
+    Only the first read of a group waits on Roblox. Stored rolesets are returned right away,
+    and revalidated in the background once they are older than GROUP_ROLESETS_REFRESH_AFTER.
+
+    Args:
+        group_id (int): ID of the group.
+
+    Returns:
+        dict[int, GroupRoleset]: Rolesets of the group by rank, without the Guest roleset.
+    """
+
+    group_id = int(group_id)
+    cached_rolesets = await _read_cached_group_rolesets(group_id)
+
+    if cached_rolesets is None:
+        cached_rolesets, _ = await refresh_group_rolesets(group_id)
+
+        if cached_rolesets is None:
+            raise RobloxAPIError(f"Could not fetch the rolesets of group {group_id}.")
+    elif cached_rolesets.stale:
+        _schedule_group_rolesets_refresh(group_id, cached_rolesets)
+
+    return cached_rolesets.rolesets
+
+
+async def refresh_group_data(group_id: int) -> CachedGroupData:
+    """Fetch the data of a group from Roblox and store it. The data is also applied to the
+    interned RobloxGroup of this group, if it was synced.
+
+    Args:
+        group_id (int): ID of the group.
+
+    Returns:
+        CachedGroupData: The stored data of the group.
+    """
+
+    group_data, _ = await fetch_typed(RobloxGroup, f"{GROUP_API}/{group_id}")
+
+    cached_group_data = CachedGroupData(
+        name=group_data.name,
+        description=group_data.description,
+        member_count=group_data.member_count,
+        fetched_at=time.time(),
+    )
+
+    await redis.set(
+        f"group_data:{group_id}",
+        cached_group_data.model_dump_json(),
+        ex=GROUP_DATA_TTL,
+    )
+
+    group = get_interned_entity("group", group_id)
+
+    if group is not None and group.synced:
+        group.name = cached_group_data.name
+        group.description = cached_group_data.description
+        group.member_count = cached_group_data.member_count
+
+    return cached_group_data
+
+
+async def get_group_data(group_id: int) -> CachedGroupData:
+    """Get the name, description and member count of a group from the group data store.
+
+    Only the first read of a group waits on Roblox. Stored data is returned right away,
+    and refetched in the background once it is older than GROUP_DATA_REFRESH_AFTER.
+
+    Args:
+        group_id (int): ID of the group.
+
+    Returns:
+        CachedGroupData: The stored data of the group.
+    """
+
+    group_id = int(group_id)
+    cached_group_data = await redis.get(f"group_data:{group_id}")
+
+    if not cached_group_data:
+        return await refresh_group_data(group_id)
+
+    cached_group_data = CachedGroupData.model_validate_json(cached_group_data)
+
+    if cached_group_data.stale:
+        _schedule_refresh(
+            _refreshing_group_data, group_id, lambda: refresh_group_data(group_id)
+        )
+
+    return cached_group_data
+
+
+async def refresh_hot_group_rolesets(limit: int = 100) -> int:
+    """Revalidate the stale rolesets of the most read groups since the last run.
+
+    Args:
+        limit (int, optional): How many of the hottest groups to check. Defaults to 100.
+
+    Returns:
+        int: How many groups had their rolesets revalidated.
+    """
+
+    async with redis.pipeline() as pipeline:
+        await pipeline.zrevrange(HOT_GROUP_ROLESETS_KEY, 0, limit - 1)
+        await pipeline.delete(HOT_GROUP_ROLESETS_KEY)
+        hot_group_ids, _ = await pipeline.execute()
+
+    refreshed = 0
+
+    for group_id in hot_group_ids:
+        cached_rolesets = await _read_cached_group_rolesets(
+            int(group_id), track_hot=False
+        )
+
+        if cached_rolesets is None or cached_rolesets.stale:
+            try:
+                await refresh_group_rolesets(int(group_id), cached_rolesets)
+            except (RobloxAPIError, RobloxDown, RobloxNotFound) as exc:
+                logging.warning(
+                    f"Failed to refresh rolesets of group {group_id}: {exc}"
+                )
+                continue
+
+            refreshed += 1
+
+    return refreshed
+
+
+async def run_group_rolesets_refresher(
+    interval: int = GROUP_ROLESETS_REFRESH_AFTER // 2, limit: int = 100
+):
+    """Keep the rolesets of hot groups fresh, so reads rarely find stale rolesets.
+
+    Nothing in this library starts it. Services that read group rolesets should start it at
+    startup with create_task_log_exception(). Every process may run it: a Redis lock lets only
+    one of them refresh per interval, so the read counts of an interval are not split between them.
+    Without a refresher, stale rolesets are still revalidated in the background when they are read.
+
+    Args:
+        interval (int, optional): Seconds between refreshes. Defaults to half of GROUP_ROLESETS_REFRESH_AFTER.
+        limit (int, optional): How many of the hottest groups to check. Defaults to 100.
+    """
+
+    while True:
+        if await redis.set(
+            GROUP_ROLESETS_REFRESHER_LOCK_KEY, "1", nx=True, ex=interval
+        ):
+            await refresh_hot_group_rolesets(limit)
+
+        await asyncio.sleep(interval)
+
+
 async def get_group(
     group_id_or_url: Annotated[str | int, "Group ID or URL"],
 ) -> RobloxGroup:
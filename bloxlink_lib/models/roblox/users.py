@@ -1,22 +1,31 @@
 from __future__ import annotations
 
-from typing import Annotated, Literal, TYPE_CHECKING
-from pydantic import Field
+import asyncio
+import logging
+from typing import Annotated, AsyncGenerator, Final, Iterable, Literal, TYPE_CHECKING
+from pydantic import ConfigDict, Field
 import math
 from http import HTTPStatus
-from datetime import datetime
+from datetime import datetime, timedelta
 import hikari
 
 from bloxlink_lib.models.schemas.users import (  # pylint: disable=no-name-in-module
     fetch_user_data,
 )
-from bloxlink_lib.fetch import fetch, fetch_typed
+from bloxlink_lib.fetch import fetch, fetch_list_items, fetch_typed
 from bloxlink_lib.config import CONFIG
-from bloxlink_lib.exceptions import RobloxNotFound, RobloxAPIError, UserNotVerified
+from bloxlink_lib.exceptions import (
+    RobloxNotFound,
+    RobloxAPIError,
+    RobloxDown,
+    UserNotVerified,
+)
 from bloxlink_lib.database.mongodb import mongo  # pylint: disable=no-name-in-module
+from bloxlink_lib.database.redis import redis  # pylint: disable=no-name-in-module
 from bloxlink_lib.models.base import BaseModel, MemberSerializable, BaseResponse
+from bloxlink_lib.tracing import current_span, traced
 from bloxlink_lib.utils import get_environment, Environment
-from .groups import GroupRoleset, RobloxGroup
+from .groups import GroupRoleset
 
 if TYPE_CHECKING:
     from .base_assets import RobloxBaseAsset
@@ -31,6 +40,25 @@ AVATAR_URLS = {
     "headshotThumbnail": "https://thumbnails.roblox.com/v1/users/avatar-headshot?userIds={roblox_id}&size=420x420&format=Png&isCircular=false",
     "fullBody": "https://thumbnails.roblox.com/v1/users/avatar?userIds={roblox_id}&size=720x720&format=Png&isCircular=false",
 }
+AVATAR_BATCH_SIZE: Final[int] = 100
+USERS_BATCH_SIZE: Final[int] = 100
+
+# the parts of a user's profile are cached separately, so a sync only fetches what expired
+ROBLOX_USER_PROFILE_TTLS: Final[dict[str, int]] = {
+    "base": int(timedelta(minutes=10).total_seconds()),
+    "groups": int(timedelta(minutes=2).total_seconds()),
+    "avatar_url": int(timedelta(hours=1).total_seconds()),
+}
+ROBLOX_USER_BASE_FIELDS: Final[set[str]] = {
+    "id",
+    "username",
+    "banned",
+    "description",
+    "display_name",
+    "created",
+    "profile_link",
+    "avatar",
+}
 BLOXLINK_VERIFICATION_URL = (
     "https://api.blox.link/v4/public/discord-to-roblox/{user_id}"
 )
@@ -65,10 +93,21 @@ class RobloxUserAvatarResponse(BaseModel):
     data: list[RobloxUserAvatar]
 
 
+class RobloxUserGroupInfo(BaseModel):
+    """The group of one of a user's memberships, without the rest of the RobloxGroup entity."""
+
+    model_config = ConfigDict(
+        populate_by_name=True, validate_assignment=True, from_attributes=True
+    )
+
+    id: int
+    name: str | None = None
+
+
 class RobloxUserGroup(BaseModel):
     """Type definition for a Roblox group from a user from the Roblox API."""
 
-    group: RobloxGroup
+    group: RobloxUserGroupInfo
     role: GroupRoleset
 
 
@@ -101,11 +140,13 @@ class RobloxUser(BaseModel):  # pylint: disable=too-many-instance-attributes
 
     _complete: bool = False
 
+    @traced("roblox_user.sync")
     async def sync(
         self,
         includes: list[Literal["groups"]] | bool | None = None,
         *,
         cache: bool = True,
+        resolve_avatar: bool = True,
     ):
         """Retrieve and sync information about this user from Roblox. Requires a username or id to be set.
 
@@ -114,66 +155,111 @@ class RobloxUser(BaseModel):  # pylint: disable=too-many-instance-attributes
                 True retrieves all available data; otherwise, a list can be passed with either
                 "groups" in it.
             cache (bool, optional): Should we check the object for values before retrieving. Defaults to True.
+            resolve_avatar (bool, optional): Should the avatar URL be resolved. Batch callers can disable this
+                and use resolve_avatar_urls() instead. Defaults to True.
+
+        Returns:
+            bool: If the user was synced. False if the bot API did not return the user.
         """
 
+        # copied, since the includes are removed from as they are found in the cache
         if includes is None:
             includes = []
 
         elif includes is True:
-            includes = VALID_INFO_SERVER_SCOPES
+            includes = list(VALID_INFO_SERVER_SCOPES)
             self._complete = True
 
+        else:
+            includes = list(includes)
+
         if includes is not None and any(
             (x is False or x not in [*VALID_INFO_SERVER_SCOPES, True, None])
             for x in includes
         ):
             raise ValueError("Invalid includes provided.")
 
+        cached_profile = (
+            await _read_cached_user_profile(self.id) if cache and self.id else {}
+        )
+        current_span().set_attribute("cache.hit", bool(cached_profile.get("base")))
+
         if cache:
             # remove includes if we already have the value saved
-            if self.groups and "groups" in includes:
+            if "groups" in includes and (
+                self.groups or cached_profile.get("groups") is not None
+            ):
+                self.groups = self.groups or cached_profile["groups"]
                 includes.remove("groups")
 
-        roblox_user_data, user_data_response = await fetch_typed(
-            RobloxUser,
-            f"{CONFIG.BOT_API}/users",
-            params={
-                "id": self.id,
-                "username": self.username,
-                "include": ",".join(includes),
-            },
-        )
+        if cached_profile.get("base"):
+            # only fetch what is missing from the profile cache
+            self.merge_base_data(cached_profile["base"])
 
-        if user_data_response.status == HTTPStatus.OK:
-            self.id = roblox_user_data.id or self.id
-            self.description = roblox_user_data.description or self.description
-            self.username = roblox_user_data.username or self.username
-            self.banned = roblox_user_data.banned or self.banned
-            self.display_name = (
-                roblox_user_data.display_name or self.display_name or self.username
-            )
-            self.created = (roblox_user_data.created or self.created).replace(
-                tzinfo=None
+            if "groups" in includes:
+                user_groups = await fetch_user_groups(self.id)
+
+                if user_groups:
+                    self.groups = user_groups["groups"]
+                    await _cache_user_profile(self, "groups")
+        else:
+            roblox_user_data, user_data_response = await fetch_typed(
+                RobloxUser,
+                f"{CONFIG.BOT_API}/users",
+                params={
+                    "id": self.id,
+                    "username": self.username,
+                    "include": ",".join(includes),
+                },
+                hedge=True,
             )
-            self.avatar = roblox_user_data.avatar or self.avatar
-            self.profile_link = roblox_user_data.profile_link or self.profile_link
+
+            if user_data_response.status != HTTPStatus.OK:
+                return False
+
+            self.merge_base_data(roblox_user_data)
             self.groups = roblox_user_data.groups or self.groups or {}
 
-            self.parse_age()
+            await _cache_user_profile(
+                self, "base", *(["groups"] if "groups" in includes else [])
+            )
+
+        self.parse_age()
 
-            avatar = roblox_user_data.avatar
+        if cached_profile.get("avatar_url"):
+            self.avatar_url = cached_profile["avatar_url"]
 
-            if avatar:
-                avatar_url, avatar_response = await fetch(
-                    method="GET",
-                    url=avatar.bust_thumbnail,
-                    parse_as="JSON",
+        elif self.avatar and resolve_avatar:
+            avatar_url, avatar_response = await fetch(
+                method="GET",
+                url=self.avatar.bust_thumbnail,
+                parse_as="JSON",
+                hedge=True,
+            )
+
+            if avatar_response.status == HTTPStatus.OK:
+                self.avatar_url = (
+                    avatar_url.get("data", [{}])[0].get("imageUrl") or None
                 )
 
-                if avatar_response.status == HTTPStatus.OK:
-                    self.avatar_url = (
-                        avatar_url.get("data", [{}])[0].get("imageUrl") or None
-                    )
+                if self.avatar_url:
+                    await _cache_user_profile(self, "avatar_url")
+
+        return True
+
+    def merge_base_data(self, roblox_user_data: RobloxUser):
+        """Merge the base data of a user, from Roblox or the profile cache, into this user."""
+
+        self.id = roblox_user_data.id or self.id
+        self.description = roblox_user_data.description or self.description
+        self.username = roblox_user_data.username or self.username
+        self.banned = roblox_user_data.banned or self.banned
+        self.display_name = (
+            roblox_user_data.display_name or self.display_name or self.username
+        )
+        self.created = (roblox_user_data.created or self.created).replace(tzinfo=None)
+        self.avatar = roblox_user_data.avatar or self.avatar
+        self.profile_link = roblox_user_data.profile_link or self.profile_link
 
     async def owns_asset(self, asset: RobloxBaseAsset) -> bool:
         """Check if the user owns a specific asset.
@@ -190,6 +276,7 @@ class RobloxUser(BaseModel):  # pylint: disable=too-many-instance-attributes
                 method="GET",
                 url=f"{INVENTORY_API}/v1/users/{self.id}/items/{asset.type_number}/{asset.id}/is-owned",
                 parse_as="TEXT",
+                hedge=True,
             )
         except RobloxAPIError:
             return False
@@ -215,6 +302,71 @@ class RobloxUser(BaseModel):  # pylint: disable=too-many-instance-attributes
                 self.short_age_string = f"{self.age_days} {ending} ago"
 
 
+def _user_profile_key(roblox_id: int, part: str) -> str:
+    return f"roblox_users:{roblox_id}:{part}"
+
+
+async def _read_cached_user_profile(roblox_id: int) -> dict:
+    """Read the cached parts of a user's profile. Parts that are missing or expired are None."""
+
+    return (await _read_cached_user_profiles([roblox_id]))[0]
+
+
+async def _read_cached_user_profiles(roblox_ids: list[int]) -> list[dict]:
+    """Read the cached parts of the profiles of many users in one MGET, in the order of roblox_ids."""
+
+    parts = list(ROBLOX_USER_PROFILE_TTLS)
+    values = await redis.mget(
+        _user_profile_key(roblox_id, part) for roblox_id in roblox_ids for part in parts
+    )
+    cached_profiles = []
+
+    for i in range(0, len(values), len(parts)):
+        base, groups, avatar_url = values[i : i + len(parts)]
+
+        cached_profiles.append(
+            {
+                "base": RobloxUser.model_validate_json(base) if base else None,
+                "groups": (
+                    RobloxUser.model_validate_json(groups).groups if groups else None
+                ),
+                "avatar_url": avatar_url,
+            }
+        )
+
+    return cached_profiles
+
+
+async def _cache_user_profile(
+    roblox_user: RobloxUser, *parts: Literal["base", "groups", "avatar_url"]
+):
+    """Cache parts of a user's profile, each with its own TTL from ROBLOX_USER_PROFILE_TTLS."""
+
+    async with redis.pipeline() as pipeline:
+        for part in parts:
+            match part:
+                case "base":
+                    value = roblox_user.model_dump_json(
+                        include=ROBLOX_USER_BASE_FIELDS,
+                        by_alias=True,
+                        exclude_none=True,
+                    )
+                case "groups":
+                    value = roblox_user.model_dump_json(
+                        include={"groups"}, by_alias=True
+                    )
+                case "avatar_url":
+                    value = roblox_user.avatar_url
+
+            await pipeline.set(
+                _user_profile_key(roblox_user.id, part),
+                value,
+                ex=ROBLOX_USER_PROFILE_TTLS[part],
+            )
+
+        await pipeline.execute()
+
+
 class RobloxUsernameData(BaseModel):
     requestedUsername: str
     hasVerifiedBadge: bool
@@ -271,20 +423,18 @@ async def fetch_user_groups(
     so that this can be used with setattr() in the RobloxUser model.
     """
 
-    user_groups, user_groups_response = await fetch_typed(
-        RobloxUserGroupResponse,
-        USER_GROUPS_API.format(roblox_id=roblox_id),
-        raise_on_failure=False,
-    )
-
-    if user_groups_response.status != HTTPStatus.OK:
-        return None
-
-    return {
-        "groups": {
-            int(group_data.group.id): group_data for group_data in user_groups.data
+    try:
+        # the memberships are parsed as they arrive, instead of buffering the whole list
+        return {
+            "groups": {
+                group_data.group.id: group_data
+                async for group_data in fetch_list_items(
+                    USER_GROUPS_API.format(roblox_id=roblox_id), RobloxUserGroup
+                )
+            }
         }
-    }
+    except (RobloxAPIError, RobloxNotFound, RobloxDown):
+        return None
 
 
 async def fetch_user_avatars(
@@ -381,6 +531,7 @@ async def get_user_account(
     return None
 
 
+@traced("get_user")
 async def get_user(
     user: hikari.User | None = None,
     includes: list[Literal["groups", "badges"]] | None = None,
@@ -441,14 +592,69 @@ async def get_user(
     return roblox_user
 
 
-async def get_accounts(user_id: int) -> list[RobloxUser]:
+async def resolve_avatar_urls(roblox_users: list[RobloxUser]):
+    """Resolve the avatar URLs of synced users with one thumbnails request per 100 users.
+
+    Args:
+        roblox_users (list[RobloxUser]): The users to resolve the avatar URL of.
+            Users without an avatar, or with an avatar URL from the profile cache, are skipped.
+    """
+
+    users_by_id = {
+        roblox_user.id: roblox_user
+        for roblox_user in roblox_users
+        if roblox_user.avatar and roblox_user.id and not roblox_user.avatar_url
+    }
+    roblox_ids = list(users_by_id)
+
+    for i in range(0, len(roblox_ids), AVATAR_BATCH_SIZE):
+        avatar_data, avatar_response = await fetch_typed(
+            RobloxUserAvatarResponse,
+            AVATAR_URLS["bustThumbnail"].format(
+                roblox_id=",".join(
+                    str(roblox_id)
+                    for roblox_id in roblox_ids[i : i + AVATAR_BATCH_SIZE]
+                )
+            ),
+            raise_on_failure=False,
+        )
+
+        if avatar_response.status != HTTPStatus.OK:
+            continue
+
+        async with redis.pipeline() as pipeline:
+            for avatar in avatar_data.data:
+                if avatar.target_id in users_by_id and avatar.image_url:
+                    users_by_id[avatar.target_id].avatar_url = avatar.image_url
+
+                    await pipeline.set(
+                        _user_profile_key(avatar.target_id, "avatar_url"),
+                        avatar.image_url,
+                        ex=ROBLOX_USER_PROFILE_TTLS["avatar_url"],
+                    )
+
+            await pipeline.execute()
+
+
+async def get_accounts(
+    user_id: int,
+    *,
+    sync: bool = False,
+    includes: list[Literal["groups"]] | bool | None = None,
+    concurrency: int = 10,
+) -> list[RobloxUser]:
     """Get a user's linked Roblox accounts.
 
     Args:
         user_id (int): The user to get linked Roblox accounts for.
+        sync (bool, optional): Should the accounts be synced. They are synced concurrently, and their
+            avatars are resolved in batches. Defaults to False.
+        includes (list | bool | None, optional): Data that should be included when syncing. Defaults to None.
+        concurrency (int, optional): How many accounts can be synced at once. Defaults to 10.
 
     Returns:
-        list[RobloxUser]: The linked Roblox accounts for this user.
+        list[RobloxUser]: The linked Roblox accounts for this user. Accounts that failed to sync are
+            returned unsynced.
     """
 
     bloxlink_user = await fetch_user_data(user_id, "robloxID", "robloxAccounts")
@@ -464,11 +670,360 @@ async def get_accounts(user_id: int) -> list[RobloxUser]:
 
     accounts = [RobloxUser(id=account_id) for account_id in account_ids]
 
+    if sync:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _sync_account(account: RobloxUser):
+            async with semaphore:
+                try:
+                    # sync() removes cached includes from the list, so each gets a copy
+                    await account.sync(
+                        (
+                            includes
+                            if isinstance(includes, bool)
+                            else list(includes or [])
+                        ),
+                        resolve_avatar=False,
+                    )
+                except (RobloxAPIError, RobloxNotFound, RobloxDown) as exc:
+                    logging.warning(
+                        f"Failed to sync Roblox account {account.id}: {exc}"
+                    )
+
+        await asyncio.gather(*(_sync_account(account) for account in accounts))
+        await resolve_avatar_urls(accounts)
+
     return accounts
 
 
+async def fetch_users_batch(
+    roblox_ids: list[int],
+    includes: list[Literal["groups"]] | None = None,
+    *,
+    cache: bool = True,
+) -> list[RobloxUser]:
+    """Fetch the base data of many users from the bot API in one request.
+
+    Args:
+        roblox_ids (list[int]): The users to fetch. At most USERS_BATCH_SIZE.
+        includes (list | None, optional): Data that should be included. Defaults to None.
+        cache (bool, optional): Should users be served from the profile cache, when it has every part
+            that is needed. Defaults to True.
+
+    Returns:
+        list[RobloxUser]: The users that were found. The fetched users are validated in one pass, and cached.
+    """
+
+    includes = list(includes or [])
+    cached_users: list[RobloxUser] = []
+    missing_ids = list(roblox_ids)
+
+    if cache:
+        cached_profiles = await _read_cached_user_profiles(roblox_ids)
+        missing_ids = []
+
+        for roblox_id, cached_profile in zip(roblox_ids, cached_profiles):
+            cached_user = cached_profile["base"]
+
+            if not cached_user or (
+                "groups" in includes and cached_profile["groups"] is None
+            ):
+                missing_ids.append(roblox_id)
+                continue
+
+            cached_user.groups = cached_profile["groups"] or {}
+            cached_user.avatar_url = cached_profile["avatar_url"]
+            cached_users.append(cached_user)
+
+    if not missing_ids:
+        return cached_users
+
+    users_data, users_response = await fetch(
+        "GET",
+        f"{CONFIG.BOT_API}/users",
+        params={
+            "ids": ",".join(str(roblox_id) for roblox_id in missing_ids),
+            "include": ",".join(includes),
+        },
+        parse_as=BaseResponse[list[RobloxUser]],
+    )
+
+    if users_response.status != HTTPStatus.OK or not users_data.data:
+        return cached_users
+
+    fetched_users = users_data.data
+    cached_parts = ["base", *(["groups"] if "groups" in includes else [])]
+
+    await asyncio.gather(
+        *(
+            _cache_user_profile(fetched_user, *cached_parts)
+            for fetched_user in fetched_users
+        )
+    )
+
+    return cached_users + fetched_users
+
+
+async def sync_users(
+    roblox_users: Iterable[RobloxUser],
+    includes: list[Literal["groups"]] | bool | None = None,
+    *,
+    batch_size: int = USERS_BATCH_SIZE,
+    concurrency: int = 10,
+) -> AsyncGenerator[RobloxUser, None]:
+    """Sync many users, yielding each one as soon as it is synced.
+
+    If BOT_API_BATCH_USERS is set, users are fetched batch_size at a time; otherwise, or for users
+    without an ID, they are synced with concurrent single requests. Avatar URLs are not resolved;
+    use resolve_avatar_urls() for that.
+
+    Args:
+        roblox_users (Iterable[RobloxUser]): The users to sync. Users with the same ID are synced once.
+        includes (list | bool | None, optional): Data that should be included. Defaults to None.
+        batch_size (int, optional): How many users are sent per batch request. Defaults to USERS_BATCH_SIZE.
+        concurrency (int, optional): How many requests can be in flight at once. Defaults to 10.
+
+    Yields:
+        RobloxUser: The synced users, in the order they arrive. Users that failed to sync are
+            logged and not yielded.
+    """
+
+    users_by_id: dict[int, RobloxUser] = {}
+    unbatched_users: list[RobloxUser] = []
+
+    for roblox_user in roblox_users:
+        if roblox_user.id is None:
+            unbatched_users.append(roblox_user)
+        else:
+            users_by_id.setdefault(roblox_user.id, roblox_user)
+
+    if CONFIG.BOT_API_BATCH_USERS:
+        batched_ids = list(users_by_id)
+    else:
+        batched_ids = []
+        unbatched_users.extend(users_by_id.values())
+
+    batch_includes = (
+        VALID_INFO_SERVER_SCOPES if includes is True else list(includes or [])
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _sync_batch(roblox_ids: list[int]) -> list[RobloxUser]:
+        async with semaphore:
+            try:
+                fetched_users = await fetch_users_batch(roblox_ids, batch_includes)
+            except (RobloxAPIError, RobloxNotFound, RobloxDown) as exc:
+                logging.warning(f"Failed to sync Roblox users {roblox_ids}: {exc}")
+                return []
+
+        synced_users = []
+
+        for fetched_user in fetched_users:
+            roblox_user = users_by_id.get(fetched_user.id)
+
+            if roblox_user is None:
+                continue
+
+            roblox_user.merge_base_data(fetched_user)
+            roblox_user.groups = fetched_user.groups or roblox_user.groups
+            roblox_user.avatar_url = fetched_user.avatar_url or roblox_user.avatar_url
+            roblox_user.parse_age()
+            synced_users.append(roblox_user)
+
+        return synced_users
+
+    async def _sync_user(roblox_user: RobloxUser) -> list[RobloxUser]:
+        async with semaphore:
+            try:
+                # sync() removes cached includes from the list, so each gets a copy
+                synced = await roblox_user.sync(
+                    includes if isinstance(includes, bool) else list(includes or []),
+                    resolve_avatar=False,
+                )
+            except (RobloxAPIError, RobloxNotFound, RobloxDown) as exc:
+                logging.warning(
+                    f"Failed to sync Roblox user {roblox_user.id or roblox_user.username}: {exc}"
+                )
+                return []
+
+        if not synced:
+            logging.warning(
+                f"Failed to sync Roblox user {roblox_user.id or roblox_user.username}"
+            )
+            return []
+
+        return [roblox_user]
+
+    tasks = [
+        asyncio.create_task(_sync_batch(batched_ids[i : i + batch_size]))
+        for i in range(0, len(batched_ids), batch_size)
+    ] + [
+        asyncio.create_task(_sync_user(roblox_user)) for roblox_user in unbatched_users
+    ]
+
+    try:
+        for task in asyncio.as_completed(tasks):
+            for roblox_user in await task:
+                yield roblox_user
+    finally:
+        # the caller may stop iterating early
+        for task in tasks:
+            task.cancel()
+
+
+type ReverseLookupIDType = Literal["number", "string"]
+
+# the _ids of users are numbers or strings. MongoDB sorts numbers before strings, and $gt
+# only matches _ids of the same type, so the types are paged through one after the other
+REVERSE_LOOKUP_ID_TYPES: Final[tuple[ReverseLookupIDType, ...]] = ("number", "string")
+
+
+class ReverseLookupPage(BaseModel):
+    """A page of Discord IDs linked to a Roblox account.
+
+    Attributes:
+        discord_ids (list[int]): The Discord IDs in this page.
+        cursor (str | None): Pass as `after` to continue after this page. None if this is the last page.
+    """
+
+    discord_ids: list[int]
+    cursor: str | None = None
+
+
+def reverse_lookup_query(
+    roblox_id: str,
+    after: int | str | None = None,
+    id_type: ReverseLookupIDType | None = None,
+) -> dict:
+    """Build the query for the users linked to a Roblox ID. Backed by the users indexes in DATABASE_INDEXES.
+
+    Args:
+        roblox_id (str): The Roblox ID to match.
+        after (int | str, optional): Only match users with an _id after this one. Defaults to None.
+        id_type (ReverseLookupIDType, optional): Only match users with an _id of this BSON type.
+            Defaults to the type of after, since $gt only matches _ids of the same type.
+
+    Returns:
+        dict: The query.
+    """
+
+    query = {"$or": [{"robloxID": roblox_id}, {"robloxAccounts.accounts": roblox_id}]}
+
+    if after is not None:
+        id_type = id_type or ("string" if isinstance(after, str) else "number")
+
+    if id_type is not None:
+        query["_id"] = {"$type": id_type}
+
+    if after is not None:
+        query["_id"]["$gt"] = after
+
+    return query
+
+
+def _encode_reverse_lookup_cursor(user_id: int | str) -> str:
+    """Encode the _id of the last user of a page as a cursor, with its type, since $gt only matches _ids of the same type."""
+
+    return f"{type(user_id).__name__}:{user_id}"
+
+
+def _decode_reverse_lookup_cursor(cursor: str) -> int | str:
+    """Decode a cursor from _encode_reverse_lookup_cursor() back to the _id it was made from."""
+
+    id_type, _, user_id = cursor.partition(":")
+
+    match id_type:
+        case "int":
+            return int(user_id)
+        case "str":
+            return user_id
+
+    raise ValueError(f"Invalid reverse lookup cursor: {cursor}")
+
+
+async def reverse_lookup_pages(
+    roblox_user: RobloxUser,
+    exclude_user_id: int | None = None,
+    *,
+    page_size: int = 100,
+    limit: int | None = None,
+    after: str | None = None,
+) -> AsyncGenerator[ReverseLookupPage, None]:
+    """Find the Discord IDs linked to a roblox id, page by page, in order of their ID.
+
+    Args:
+        roblox_user (RobloxUser): The roblox account that will be matched against.
+        exclude_user_id (int | None, optional): Discord user ID that will not be included in the output.
+            Defaults to None.
+        page_size (int, optional): How many users to read per page. Defaults to 100.
+        limit (int | None, optional): The maximum number of users to read. Defaults to None.
+        after (str | None, optional): The cursor of a previous page to continue after. Defaults to None.
+
+    Raises:
+        ValueError: If the cursor was not made by this function.
+
+    Yields:
+        ReverseLookupPage: The pages of Discord IDs.
+    """
+
+    roblox_id = str(roblox_user.id)
+    remaining = limit
+    after = _decode_reverse_lookup_cursor(after) if after is not None else None
+    id_types = list(REVERSE_LOOKUP_ID_TYPES)
+
+    if isinstance(after, str):
+        id_types.remove("number")
+
+    while remaining is None or remaining > 0:
+        batch_size = page_size if remaining is None else min(page_size, remaining)
+        users = []
+
+        # a page continues into the next _id type once the current one runs out
+        while id_types and len(users) < batch_size:
+            type_batch_size = batch_size - len(users)
+            type_users = await (
+                mongo.bloxlink["users"]
+                .find(
+                    reverse_lookup_query(roblox_id, after, id_types[0]),
+                    {"_id": 1},
+                )
+                .sort("_id", 1)
+                .limit(type_batch_size)
+                .to_list(type_batch_size)
+            )
+            users.extend(type_users)
+
+            if len(type_users) < type_batch_size:
+                id_types.pop(0)
+                after = None
+            else:
+                after = type_users[-1]["_id"]
+
+        if not users:
+            return
+
+        discord_ids = [
+            int(x["_id"]) for x in users if str(exclude_user_id) != str(x["_id"])
+        ]
+
+        if remaining is not None:
+            remaining -= len(users)
+
+        has_more = bool(id_types) and (remaining is None or remaining > 0)
+
+        yield ReverseLookupPage(
+            discord_ids=discord_ids,
+            cursor=_encode_reverse_lookup_cursor(after) if has_more else None,
+        )
+
+        if not has_more:
+            return
+
+
 async def reverse_lookup(
-    roblox_user: RobloxUser, exclude_user_id: int | None = None
+    roblox_user: RobloxUser,
+    exclude_user_id: int | None = None,
+    limit: int | None = None,
 ) -> list[int]:
     """Find Discord IDs linked to a roblox id.
 
@@ -476,20 +1031,18 @@ async def reverse_lookup(
         roblox_user (RobloxUser): The roblox account that will be matched against.
         exclude_user_id (int | None, optional): Discord user ID that will not be included in the output.
             Defaults to None.
+        limit (int | None, optional): The maximum number of users to read. Defaults to None.
 
     Returns:
         list[int]: All the discord IDs linked to this roblox_id.
     """
 
-    roblox_id = str(roblox_user.id)
-
-    cursor = mongo.bloxlink["users"].find(
-        {"$or": [{"robloxID": roblox_id}, {"robloxAccounts.accounts": roblox_id}]},
-        {"_id": 1},
-    )
-
     return [
-        int(x["_id"]) async for x in cursor if str(exclude_user_id) != str(x["_id"])
+        discord_id
+        async for page in reverse_lookup_pages(
+            roblox_user, exclude_user_id, limit=limit
+        )
+        for discord_id in page.discord_ids
     ]
 
 
@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
 from enum import Enum
+from functools import cache
+from typing import Any, ClassVar, Final, Self, Type
+from pydantic import PrivateAttr, create_model, field_validator, model_validator
+from pymongo import ASCENDING, IndexModel
 from bloxlink_lib.models.base import BaseModel
+from bloxlink_lib.validators import TRUSTED_DATA_CONTEXT
 
 
 class DatabaseDomains(Enum):
@@ -11,14 +16,176 @@ class DatabaseDomains(Enum):
     V4_MIGRATOR_ERROR_LOGS = "v4_schema_error_log"
 
 
+# Indexes that the queries of the library depend on, created by ensure_indexes().
+# Lookups by _id are served by the default _id index, so they are not declared here.
+DATABASE_INDEXES: Final[dict[DatabaseDomains, list[IndexModel]]] = {
+    DatabaseDomains.USERS: [
+        # reverse_lookup_pages(), paginated by _id
+        IndexModel([("robloxID", ASCENDING), ("_id", ASCENDING)], name="robloxID_id"),
+        IndexModel(
+            [("robloxAccounts.accounts", ASCENDING), ("_id", ASCENDING)],
+            name="robloxAccounts_accounts_id",
+        ),
+    ],
+    DatabaseDomains.GUILDS: [
+        # migrate_guild_binds_batch(), for guilds missing the migration version
+        IndexModel(
+            [("bindsMigrationVersion", ASCENDING), ("_id", ASCENDING)],
+            name="bindsMigrationVersion_id",
+        ),
+    ],
+    DatabaseDomains.V4_MIGRATOR_ERROR_LOGS: [],
+}
+
+
 class BaseSchema(BaseModel, ABC):
     """Base schema for all schemas to inherit from."""
 
+    # aspects that are always fetched and projected together with an aspect, because the schema
+    # normalises them together (such as in model_post_init)
+    aspect_dependencies: ClassVar[dict[str, tuple[str, ...]]] = {}
+
     @staticmethod
     @abstractmethod
     def database_domain() -> Enum:
         """The database domain for the schema."""
 
+    @classmethod
+    def model_validate_trusted(cls, data: dict[str, Any]) -> Self:
+        """Validate data that was already migrated, such as our own cached model_dump() output.
+
+        The field types are still validated, but the legacy migrators are skipped.
+        """
+
+        return cls.model_validate(data, context=TRUSTED_DATA_CONTEXT)
+
+    @classmethod
+    def model_validate(cls, obj: Any, *args, **kwargs) -> Self:
+        # projections are virtual subclasses of their schema, which pydantic would return unchanged
+        if isinstance(obj, SchemaProjection):
+            obj = obj.full()
+
+        return super().model_validate(obj, *args, **kwargs)
+
+    @classmethod
+    def expand_aspects(cls, *aspects: str) -> tuple[str, ...]:
+        """Get the aspects with their aspect_dependencies, sorted."""
+
+        return tuple(
+            sorted(
+                {
+                    *aspects,
+                    *(
+                        dependency
+                        for aspect in aspects
+                        for dependency in cls.aspect_dependencies.get(aspect, ())
+                    ),
+                }
+            )
+        )
+
+    @classmethod
+    def projection(cls, *aspects: str) -> Type["SchemaProjection[Self]"]:
+        """Get the projection model of this schema for the given aspects and their aspect_dependencies.
+
+        Projection models are generated once per aspect tuple.
+        """
+
+        return _build_projection(cls, cls.expand_aspects(*aspects))
+
+
+class SchemaProjection[T: BaseSchema](BaseModel):
+    """Lightweight model that only validates the requested aspects of a schema.
+
+    It is registered as a virtual subclass of its schema, so it can be passed anywhere
+    the schema is expected. Reading or assigning a field that was not projected builds the full
+    schema on demand, with the projected values and the defaults of every other field.
+    Assigned projected fields are kept in sync with the full schema.
+    """
+
+    schema_type: ClassVar[Type[BaseSchema]]
+    _full: T | None = PrivateAttr(default=None)
+
+    def full(self) -> T:
+        """Get the full schema of this projection. It is built once and then cached."""
+
+        if self._full is None:
+            self._full = self.schema_type.model_validate_trusted(
+                {
+                    field_name: getattr(self, field_name)
+                    for field_name in self.model_fields_set | {"id"}
+                }
+            )
+
+        return self._full
+
+    def model_post_init(self, __context: Any):
+        # the schema normalises its fields here, so the projection must too. The schema must only
+        # touch the fields that the projection holds, or the projection is built in full.
+        self.schema_type.model_post_init(self, __context)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return super().__getattr__(name)
+        except AttributeError:
+            if name in self.schema_type.model_fields:
+                return getattr(self.full(), name)
+
+            raise
+
+    def __setattr__(self, name: str, value: Any):
+        if name not in self.model_fields and name in self.schema_type.model_fields:
+            setattr(self.full(), name, value)
+            return
+
+        super().__setattr__(name, value)
+
+        if name in self.model_fields and self._full is not None:
+            setattr(self._full, name, getattr(self, name))
+
+
+@cache
+def _build_projection[T: BaseSchema](
+    schema: Type[T], aspects: tuple[str, ...]
+) -> Type[SchemaProjection[T]]:
+    """Generate the projection model of a schema, keeping only the fields and validators of the aspects."""
+
+    fields = {
+        field_name: (field.annotation, field)
+        for field_name, field in schema.model_fields.items()
+        if field_name == "id" or field_name in aspects or field.alias in aspects
+    }
+
+    # the validators are re-bound to the projection, and only kept for the projected fields
+    validators = {}
+    decorators = schema.__pydantic_decorators__
+
+    for validator_name, decorator in decorators.field_validators.items():
+        validator_fields = [x for x in decorator.info.fields if x in fields]
+
+        if validator_fields:
+            validators[validator_name] = field_validator(
+                *validator_fields, mode=decorator.info.mode
+            )(classmethod(decorator.func.__func__))
+
+    for validator_name, decorator in decorators.model_validators.items():
+        validators[validator_name] = model_validator(mode=decorator.info.mode)(
+            classmethod(decorator.func.__func__)
+        )
+
+    projection = create_model(
+        f"{schema.__name__}Projection",
+        __base__=SchemaProjection[schema],
+        __module__=schema.__module__,
+        __validators__=validators,
+        **fields,
+    )
+    projection.schema_type = schema
+
+    schema.register(projection)
+
+    return projection
+
 
 from .guilds import *
 from .users import *
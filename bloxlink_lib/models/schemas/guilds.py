@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Self, Type, Literal, Annotated
 from pydantic import Field, field_validator, model_validator, ValidationInfo
 from bloxlink_lib.models.base import (
@@ -8,7 +9,7 @@ from bloxlink_lib.models.base import (
 )
 from bloxlink_lib.models.base.serializable import GuildSerializable
 from bloxlink_lib.models.schemas import BaseSchema, DatabaseDomains
-from bloxlink_lib.validators import is_positive_number_as_str
+from bloxlink_lib.validators import is_positive_number_as_str, is_trusted_data
 from bloxlink_lib.models.binds import GuildBind
 from bloxlink_lib.database.mongodb import (  # pylint: disable=no-name-in-module
     fetch_item,
@@ -120,7 +121,16 @@ class GuildRestriction(BaseModel):
 class GuildData(BaseSchema):
     """Representation of the stored settings for a guild"""
 
+    # model_post_init clears the role names when the role IDs are set
+    aspect_dependencies = {
+        "verifiedRoleName": ("verifiedRole",),
+        "unverifiedRoleName": ("unverifiedRole",),
+    }
+
     id: Annotated[int, Field(alias="_id")]
+    updatedAt: Annotated[
+        datetime | None, Field(default=None, exclude=True)
+    ]  # stamped by the database on every update
 
     binds: Annotated[list[GuildBind], Field(default_factory=list)]
 
@@ -177,6 +187,7 @@ class GuildData(BaseSchema):
     roleBinds: PydanticDict | None = None
     groupIDs: PydanticDict | None = None
     migratedBindsToV4: bool | None = False
+    bindsMigrationVersion: int | None = None  # set once the binds are persisted in V4
     dynamicRoles: bool | None = True
 
     # model converters
@@ -205,9 +216,14 @@ class GuildData(BaseSchema):
     # field converters
     @field_validator("binds", mode="before")
     @classmethod
-    def transform_binds(cls: Type[Self], binds: list) -> list[GuildBind]:
+    def transform_binds(
+        cls: Type[Self], binds: list, info: ValidationInfo
+    ) -> list[GuildBind]:
         """Transforms DB binds to GuildBinds"""
 
+        if is_trusted_data(info):
+            return binds
+
         from bloxlink_lib.models.migrators import (
             migrate_binds,
         )
@@ -223,10 +239,13 @@ class GuildData(BaseSchema):
     @field_validator("deleteCommands", mode="before")
     @classmethod
     def transform_delete_commands(
-        cls: Type[Self], delete_commands: int | None | bool
+        cls: Type[Self], delete_commands: int | None | bool, info: ValidationInfo
     ) -> bool:
         """Migrate the deleteCommands field."""
 
+        if is_trusted_data(info):
+            return delete_commands
+
         from bloxlink_lib.models.migrators import (
             migrate_delete_commands,
         )
@@ -236,10 +255,13 @@ class GuildData(BaseSchema):
     @field_validator("nicknameTemplate", mode="before")
     @classmethod
     def transform_nickname_template(
-        cls: Type[Self], nickname_template: str | None
+        cls: Type[Self], nickname_template: str | None, info: ValidationInfo
     ) -> str:
         """Migrate the nicknameTemplate field."""
 
+        if is_trusted_data(info):
+            return nickname_template
+
         from bloxlink_lib.models.migrators import (
             migrate_nickname_template,
         )
@@ -249,10 +271,13 @@ class GuildData(BaseSchema):
     @field_validator("createMissingRoles", mode="before")
     @classmethod
     def transform_create_missing_roles(
-        cls: Type[Self], create_missing_roles: bool | str
+        cls: Type[Self], create_missing_roles: bool | str, info: ValidationInfo
     ) -> bool:
         """Migrate the createMissingRoles field."""
 
+        if is_trusted_data(info):
+            return create_missing_roles
+
         from bloxlink_lib.models.migrators import (
             migrate_create_missing_roles,
         )
@@ -261,9 +286,14 @@ class GuildData(BaseSchema):
 
     @field_validator("magicRoles", mode="before")
     @classmethod
-    def transform_magic_roles(cls: Type[Self], magic_roles: dict) -> MagicRoles:
+    def transform_magic_roles(
+        cls: Type[Self], magic_roles: dict, info: ValidationInfo
+    ) -> MagicRoles:
         """Migrate the magicRoles field."""
 
+        if is_trusted_data(info):
+            return magic_roles
+
         from bloxlink_lib.models.migrators import (
             migrate_magic_roles,
         )
@@ -273,10 +303,15 @@ class GuildData(BaseSchema):
     @field_validator("disallowBanEvaders", mode="before")
     @classmethod
     def transform_disallow_ban_evaders(
-        cls: Type[Self], disallow_ban_evaders: bool | str | None
+        cls: Type[Self],
+        disallow_ban_evaders: bool | str | None,
+        info: ValidationInfo,
     ) -> bool:
         """Migrate the disallowBanEvaders field."""
 
+        if is_trusted_data(info):
+            return disallow_ban_evaders
+
         from bloxlink_lib.models.migrators import (
             migrate_disallow_ban_evaders,
         )
@@ -286,10 +321,15 @@ class GuildData(BaseSchema):
     @field_validator("restrictions", mode="before")
     @classmethod
     def transform_restrictions(
-        cls: Type[Self], restrictions: dict[str, dict[str, GuildRestriction]]
+        cls: Type[Self],
+        restrictions: dict[str, dict[str, GuildRestriction]],
+        info: ValidationInfo,
     ) -> list[GuildRestriction]:
         """Migrate the restrictions field."""
 
+        if is_trusted_data(info):
+            return restrictions
+
         from bloxlink_lib.models.migrators import migrate_restrictions
 
         return migrate_restrictions(restrictions)
@@ -305,10 +345,21 @@ class GuildData(BaseSchema):
     def model_post_init(self, __context):
         """Post-init hook to handle verifiedRole and unverifiedRole"""
 
-        if self.verifiedRole is not None and self.verifiedRoleName is not None:
+        # projections only normalise the role names they hold, so that they are not built in full
+        model_fields = type(self).model_fields
+
+        if (
+            "verifiedRoleName" in model_fields
+            and self.verifiedRole is not None
+            and self.verifiedRoleName is not None
+        ):
             self.verifiedRoleName = None
 
-        if self.unverifiedRole is not None and self.unverifiedRoleName is not None:
+        if (
+            "unverifiedRoleName" in model_fields
+            and self.unverifiedRole is not None
+            and self.unverifiedRoleName is not None
+        ):
             self.unverifiedRoleName = None
 
     @staticmethod
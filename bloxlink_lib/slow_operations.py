@@ -0,0 +1,144 @@
+import contextlib
+import logging
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from typing import Final, Iterator
+from .config import CONFIG
+
+__all__ = ("SlowOperation", "slow_operation", "record_operation")
+
+# frames in these directories are skipped when finding the caller of a slow operation
+_SKIPPED_DIRECTORIES: Final[tuple[str, ...]] = (
+    os.path.dirname(__file__) + os.sep,
+    os.path.dirname(contextlib.__file__) + os.sep,
+)
+
+
+class SlowOperation:
+    """An operation that is timed by slow_operation(), whose payload size can be set once it is known."""
+
+    __slots__ = ("operation", "key", "payload_size")
+
+    def __init__(self, operation: str, key: str | None = None):
+        self.operation = operation
+        self.key = key
+        # bytes of HTTP bodies, or number of fields and documents of database calls
+        self.payload_size: int | None = None
+
+
+class _SlowLogLimiter:
+    """Limits the slow operations that are logged to CONFIG.SLOW_LOG_PER_SECOND, with a token bucket."""
+
+    def __init__(self):
+        self.tokens = 0.0
+        self.updated_at: float | None = None
+        self.suppressed = 0
+
+    def acquire(self) -> bool:
+        """Take a token, if one is left."""
+
+        now = time.monotonic()
+        rate = CONFIG.SLOW_LOG_PER_SECOND
+
+        if self.updated_at is None:
+            self.tokens = rate
+        else:
+            self.tokens = min(rate, self.tokens + (now - self.updated_at) * rate)
+
+        self.updated_at = now
+
+        if self.tokens < 1:
+            self.suppressed += 1
+            return False
+
+        self.tokens -= 1
+
+        return True
+
+
+_limiter = _SlowLogLimiter()
+
+
+def _find_caller() -> str:
+    """Get the first frame outside of the library that led to this operation."""
+
+    frame = sys._getframe(1)  # pylint: disable=protected-access
+
+    while frame:
+        if not frame.f_code.co_filename.startswith(_SKIPPED_DIRECTORIES):
+            return (
+                f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+            )
+
+        frame = frame.f_back
+
+    return "unknown"
+
+
+def record_operation(
+    operation: str,
+    duration: float,
+    threshold: float,
+    *,
+    key: str | None = None,
+    payload_size: int | None = None,
+):
+    """Log an operation that took longer than its threshold.
+
+    The records are sampled with CONFIG.SLOW_LOG_SAMPLE_RATE and rate limited to CONFIG.SLOW_LOG_PER_SECOND,
+    so that a slow dependency can't flood the log. Each record has a "slow_operation" attribute
+    with its fields, for structured log handlers.
+
+    Args:
+        operation (str): What was done, such as "fetch" or "mongo.find_one".
+        duration (float): How many seconds the operation took.
+        threshold (float): How many seconds the operation may take before it is logged.
+        key (str, optional): What the operation was done on, such as an endpoint or a database key.
+        payload_size (int, optional): The size of what was sent or received.
+    """
+
+    if duration < threshold:
+        return
+
+    if random.random() >= CONFIG.SLOW_LOG_SAMPLE_RATE or not _limiter.acquire():
+        return
+
+    record = {
+        "operation": operation,
+        "key": key,
+        "duration": round(duration, 4),
+        "payload_size": payload_size,
+        "caller": _find_caller(),
+        "suppressed": _limiter.suppressed,
+    }
+    _limiter.suppressed = 0
+
+    logging.warning(
+        f"Slow {operation} of {key} took {duration:.3f}s (threshold {threshold}s); "
+        f"payload size: {payload_size}; caller: {record['caller']}",
+        extra={"slow_operation": record},
+    )
+
+
+@contextmanager
+def slow_operation(
+    operation: str, threshold: float, key: str | None = None
+) -> Iterator[SlowOperation]:
+    """Time the body of this context, and log it with record_operation() if it took longer than the threshold."""
+
+    timed_operation = SlowOperation(operation, key)
+    started_at = time.perf_counter()
+
+    try:
+        yield timed_operation
+    finally:
+        record_operation(
+            operation,
+            time.perf_counter() - started_at,
+            threshold,
+            key=timed_operation.key,
+            payload_size=timed_operation.payload_size,
+        )
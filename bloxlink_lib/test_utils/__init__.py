@@ -1,3 +1,4 @@
 from .mockers import *
 from .fixtures import *
 from .utils import *
+from .database import *
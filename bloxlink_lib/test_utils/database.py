@@ -0,0 +1,35 @@
+from motor.motor_asyncio import AsyncIOMotorCursor
+
+__all__ = [
+    "query_plan_stages",
+    "assert_index_backed",
+]
+
+
+def query_plan_stages(plan: dict) -> set[str]:
+    """Get every stage of a query plan from explain(), such as IXSCAN or COLLSCAN"""
+
+    stages = {plan["stage"]} if "stage" in plan else set()
+
+    for key in ("inputStage", "queryPlan", "winningPlan"):
+        if key in plan:
+            stages |= query_plan_stages(plan[key])
+
+    for input_stage in plan.get("inputStages", []):
+        stages |= query_plan_stages(input_stage)
+
+    return stages
+
+
+async def assert_index_backed(cursor: AsyncIOMotorCursor) -> set[str]:
+    """Explain the query of a cursor against the database, and fail if it scans the whole collection
+
+    Returns the stages of the winning plan, so more assertions can be made on them.
+    """
+
+    explanation = await cursor.explain()
+    stages = query_plan_stages(explanation["queryPlanner"]["winningPlan"])
+
+    assert "COLLSCAN" not in stages, f"Query is not backed by an index: {stages}"
+
+    return stages
@@ -30,6 +30,7 @@ __all__ = [
     "MockUserData",
     "MockUser",
     "mock_guild_data",
+    "mock_redis_pipeline",
 ]
 
 
@@ -269,3 +270,17 @@ def mock_guild_data(
         new_callable=AsyncMock,
         side_effect=_mock_db_fetch,
     )
+
+
+def mock_redis_pipeline(mocker) -> AsyncMock:
+    """Mock Redis pipelines. The mocked pipeline is returned, so the queued commands can be asserted"""
+
+    pipeline = AsyncMock()
+    pipeline.__aenter__.return_value = pipeline
+
+    mocker.patch(
+        "bloxlink_lib.database.redis.redis.pipeline",
+        return_value=pipeline,
+    )
+
+    return pipeline
@@ -0,0 +1,113 @@
+import functools
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from typing import Any, Awaitable, Callable, Final, Iterator, Protocol
+import sentry_sdk
+from .config import CONFIG
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # spans are sent to Sentry instead
+    otel_trace = None
+
+__all__ = ("span", "current_span", "traced")
+
+TRACER_NAME: Final[str] = "bloxlink_lib"
+
+
+class Span(Protocol):
+    """The part of an OpenTelemetry span that the library uses."""
+
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+
+class _NoOpSpan:
+    """The span of disabled tracing."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+class _SentrySpan:
+    """Gives a Sentry span the set_attribute() of OpenTelemetry spans."""
+
+    def __init__(self, sentry_span: sentry_sdk.tracing.Span):
+        self.sentry_span = sentry_span
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.sentry_span.set_data(key, value)
+
+
+NO_OP_SPAN: Final[Span] = _NoOpSpan()
+_DISABLED_SPAN: Final = nullcontext(NO_OP_SPAN)
+
+
+@contextmanager
+def _start_span(name: str, attributes: dict[str, Any]) -> Iterator[Span]:
+    # OpenTelemetry rejects None attributes
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+
+    if otel_trace:
+        with otel_trace.get_tracer(TRACER_NAME).start_as_current_span(
+            name, attributes=attributes
+        ) as otel_span:
+            yield otel_span
+
+        return
+
+    with sentry_sdk.start_span(op=name, name=name) as sentry_span:
+        traced_span = _SentrySpan(sentry_span)
+
+        for key, value in attributes.items():
+            traced_span.set_attribute(key, value)
+
+        yield traced_span
+
+
+def span(name: str, **attributes: Any) -> AbstractContextManager[Span]:
+    """Trace the body of this context as a span, if CONFIG.TRACING_ENABLED is set.
+
+    Spans go to the tracer provider of the app when opentelemetry-api is installed, so they can be exported
+    to any OTLP collector it is configured with. Otherwise, they are added to the Sentry transaction.
+    While tracing is disabled this returns a shared no-op context.
+
+    Args:
+        name (str): The name of the span.
+        **attributes: Attributes of the span. None values are left out.
+    """
+
+    if not CONFIG.TRACING_ENABLED:
+        return _DISABLED_SPAN
+
+    return _start_span(name, attributes)
+
+
+def current_span() -> Span:
+    """Get the span of this context, to add attributes that are only known once the work is done."""
+
+    if not CONFIG.TRACING_ENABLED:
+        return NO_OP_SPAN
+
+    if otel_trace:
+        return otel_trace.get_current_span()
+
+    sentry_span = sentry_sdk.get_current_span()
+
+    return _SentrySpan(sentry_span) if sentry_span else NO_OP_SPAN
+
+
+def traced[**P, R](
+    name: str,
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Decorate a coroutine function to trace each call of it as a span."""
+
+    def decorator(
+        coroutine_function: Callable[P, Awaitable[R]]
+    ) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(coroutine_function)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with span(name):
+                return await coroutine_function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
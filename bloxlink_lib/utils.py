@@ -1,15 +1,18 @@
-from typing import Callable, Coroutine, Iterable, Awaitable, Type, TypeVar
+from typing import Callable, Coroutine, Final, Iterable, Awaitable, Type, TypeVar
 import logging
 import asyncio
 from inspect import isfunction
 import enum
 import json
+from functools import cache
 from aiohttp import ClientConnectorError
+from pydantic import TypeAdapter
 import sentry_sdk
 from sentry_sdk.integrations.aiohttp import AioHttpIntegration
 from .models.base import BaseModel
 from .database.redis import redis
 from .config import CONFIG
+from .metrics import METRICS
 
 
 class Environment(enum.Enum):
@@ -25,6 +28,12 @@ V = TypeVar("V")
 
 CachableCallable = Type[T] | Callable[[V], T]
 
+CACHED_REQUESTS: Final = METRICS.counter(
+    "bloxlink_cached_requests_total",
+    "How many cached requests were answered from Redis.",
+    ("cache_type", "result"),
+)
+
 
 def find[T](predicate: Callable[[T], bool], iterable: Iterable[T]) -> T | None:
     """Finds the first element in an iterable that matches the predicate."""
@@ -136,28 +145,79 @@ def get_node_count() -> int:
     return shard_count // shards_per_node
 
 
-def parse_into[T: BaseModel | dict](data: dict, model: Type[T]) -> T:
-    """Parse a dictionary into a dataclass.
+@cache
+def _compile_parser(model: Type[T]) -> Callable[[dict | bytes | str], T]:
+    """Build the parser of a model once, so parse_into() does no per-call field introspection."""
+
+    if not isinstance(model, type):
+        # generic aliases such as list[Model] are validated through a TypeAdapter
+        adapter = TypeAdapter(model)
+
+        def _parse_adapter(data: dict | list | bytes | str) -> T:
+            if isinstance(data, (bytes, str)):
+                return adapter.validate_json(data)
+
+            return adapter.validate_python(data)
+
+        return _parse_adapter
+
+    if not issubclass(model, BaseModel):
+
+        def _parse_kwargs(data: dict | bytes | str) -> T:
+            return model(
+                **(json.loads(data) if isinstance(data, (bytes, str)) else data)
+            )
+
+        return _parse_kwargs
+
+    if model.model_config.get("extra", "ignore") == "ignore":
+        # pydantic drops irrelevant fields itself, and validates JSON without an intermediate dict
+        def _parse_model(data: dict | bytes | str) -> T:
+            if isinstance(data, (bytes, str)):
+                return model.model_validate_json(data)
+
+            return model.model_validate(data)
+
+        return _parse_model
+
+    # models that don't ignore extra fields are filtered down to the keys they know
+    field_keys = {
+        key: field_name
+        for field_name, field in model.model_fields.items()
+        for key in (field.alias, field_name)
+        if key
+    }
+
+    def _parse_filtered(data: dict | bytes | str) -> T:
+        if isinstance(data, (bytes, str)):
+            data = json.loads(data)
+
+        relevant_fields = {}
+
+        for key, value in data.items():
+            field_name = field_keys.get(key)
+
+            # the field name takes precedence over its alias
+            if field_name and (key == field_name or field_name not in relevant_fields):
+                relevant_fields[field_name] = value
+
+        return model(**relevant_fields)
+
+    return _parse_filtered
+
+
+def parse_into[T: BaseModel | dict](data: dict | bytes | str, model: Type[T]) -> T:
+    """Parse a dictionary, or a raw JSON body, into a dataclass.
 
     Args:
-        data (dict): The dictionary to parse.
-        model (Type[T]): The dataclass to parse the dictionary into.
+        data (dict | bytes | str): The dictionary or JSON body to parse.
+        model (Type[T]): The dataclass to parse the data into.
 
     Returns:
         T: The dataclass instance of the response.
     """
 
-    if issubclass(model, BaseModel):
-        # Filter only relevant fields before constructing the pydantic instance
-        relevant_fields = {
-            field_name: data.get(field_name, data.get(field.alias))
-            for field_name, field in model.model_fields.items()
-            if field_name in data or field.alias in data
-        }
-
-        return model(**relevant_fields)
-
-    return model(**data)
+    return _compile_parser(model)(data)
 
 
 def get_environment() -> Environment:
@@ -272,6 +332,10 @@ async def use_cached_request(
     cache_key = f"requests:{request_coroutine.__name__}:{cache_type.value}:{cache_id}"
     redis_cache = await redis.get(cache_key)
 
+    CACHED_REQUESTS.inc(
+        cache_type=str(cache_type.value), result="hit" if redis_cache else "miss"
+    )
+
     if redis_cache:
         data = json.loads(redis_cache)
 
@@ -1,5 +1,18 @@
+from typing import Final
+from pydantic import ValidationInfo
+
+# validation context for data that was already validated and migrated, such as our own model_dump() output
+TRUSTED_DATA_CONTEXT: Final[dict] = {"trusted": True}
+
+
 def is_positive_number_as_str(value: str) -> str:
     if not value.isnumeric():
         raise ValueError("Value must be a positive number.")
 
     return value
+
+
+def is_trusted_data(info: ValidationInfo) -> bool:
+    """Check if the data is being validated with TRUSTED_DATA_CONTEXT, so migrators can be skipped."""
+
+    return bool(info.context and info.context.get("trusted"))
@@ -5,8 +5,14 @@ from bloxlink_lib import GuildSerializable
 from bloxlink_lib.models.base.iterables import PydanticList
 from bloxlink_lib.models.base.serializable import RoleSerializable
 from bloxlink_lib.models.binds import BindCriteria, GuildBind, GroupBindData
-from bloxlink_lib.models.roblox.binds import delete_bind, get_binds
+from bloxlink_lib.models.roblox.binds import (
+    delete_bind,
+    get_binds,
+    migrate_all_guild_binds,
+    BINDS_MIGRATION_VERSION,
+)
 from bloxlink_lib.models.schemas.guilds import (  # pylint: disable=no-name-in-module
+    fetch_guild_data,
     update_guild_data,
 )
 from tests.shared import BindConversionTestCase
@@ -215,3 +221,32 @@ class TestInvalidRoles:
         assert new_binds[0].roles == [str(r.id) for r in EXTRA_ROLES]
         assert new_binds[1].roles == [str(VERIFIED_ROLE.id)]
         assert new_binds[2].roles == [str(UNVERIFIED_ROLE.id)]
+
+
+class TestIntegrationBindMigration:
+    """Tests persisting V3 binds in V4."""
+
+    @pytest.mark.asyncio
+    async def test_migrate_all_guild_binds(
+        self, test_guild_id: int, bind_conversion_test_data: BindConversionTestCase
+    ):
+        """Test that migrated binds are saved and the guild is stamped with the migration version"""
+
+        v3_binds = bind_conversion_test_data.v3_binds
+
+        await update_guild_data(
+            test_guild_id,
+            roleBinds=v3_binds.roleBinds.model_dump(exclude_unset=True, by_alias=True),
+            groupIDs=v3_binds.groupIDs.model_dump(exclude_unset=True, by_alias=True),
+        )
+
+        async for batch_result in migrate_all_guild_binds(batch_size=10):
+            assert batch_result.failed == 0
+
+        guild_data = await fetch_guild_data(
+            test_guild_id, "binds", "bindsMigrationVersion"
+        )
+
+        assert guild_data.bindsMigrationVersion == BINDS_MIGRATION_VERSION
+        assert guild_data.binds == bind_conversion_test_data.v4_binds
+        assert await get_binds(test_guild_id) == bind_conversion_test_data.v4_binds
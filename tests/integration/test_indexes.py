@@ -0,0 +1,56 @@
+import pytest
+from bloxlink_lib.database.mongodb import ensure_indexes, mongo
+from bloxlink_lib.models.roblox.binds import binds_migration_query
+from bloxlink_lib.models.roblox.users import reverse_lookup_query
+from bloxlink_lib.models.schemas import DATABASE_INDEXES, DatabaseDomains
+from bloxlink_lib.test_utils.database import assert_index_backed
+
+pytestmark = pytest.mark.database
+
+
+class TestIntegrationIndexes:
+    """Tests the index bootstrap and the query plans of the library's queries."""
+
+    @pytest.mark.asyncio
+    async def test_ensure_indexes_is_idempotent(self):
+        await ensure_indexes()
+        await ensure_indexes()
+
+        for database_domain, indexes in DATABASE_INDEXES.items():
+            if not indexes:
+                continue
+
+            existing_indexes = await mongo.bloxlink[
+                database_domain.value
+            ].index_information()
+
+            assert {index.document["name"] for index in indexes} <= set(
+                existing_indexes
+            )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "database_domain, query, sort",
+        [
+            (DatabaseDomains.GUILDS, {"_id": "123"}, None),
+            (DatabaseDomains.USERS, {"_id": "123"}, None),
+            (DatabaseDomains.V4_MIGRATOR_ERROR_LOGS, {"_id": "123"}, None),
+            (DatabaseDomains.USERS, reverse_lookup_query("1", after="123"), "_id"),
+            (DatabaseDomains.GUILDS, binds_migration_query(after_id="123"), "_id"),
+        ],
+    )
+    async def test_queries_are_index_backed(
+        self, database_domain: DatabaseDomains, query: dict, sort: str | None
+    ):
+        await ensure_indexes()
+        await mongo.bloxlink[database_domain.value].insert_one({"_id": "seed"})
+
+        cursor = mongo.bloxlink[database_domain.value].find(query).limit(100)
+
+        if sort:
+            cursor = cursor.sort(sort, 1)
+
+        try:
+            await assert_index_backed(cursor)
+        finally:
+            await mongo.bloxlink[database_domain.value].delete_one({"_id": "seed"})
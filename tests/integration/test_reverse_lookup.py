@@ -0,0 +1,109 @@
+import pytest
+import pytest_asyncio
+from bloxlink_lib.database.mongodb import ensure_indexes, mongo
+from bloxlink_lib.test_utils.database import assert_index_backed
+from bloxlink_lib.models.roblox.users import (
+    RobloxUser,
+    reverse_lookup,
+    reverse_lookup_pages,
+    reverse_lookup_query,
+)
+
+pytestmark = pytest.mark.database
+
+ROBLOX_ID = "1000"
+LINKED_USERS = 2500
+
+
+@pytest_asyncio.fixture()
+async def linked_users():
+    """Seed users linked to ROBLOX_ID, through their primary account or as an alt, among unrelated users"""
+
+    users = mongo.bloxlink["users"]
+
+    await users.insert_many(
+        [
+            (
+                {"_id": f"{i:06}", "robloxID": ROBLOX_ID}
+                if i % 2
+                else {"_id": f"{i:06}", "robloxAccounts": {"accounts": [ROBLOX_ID]}}
+            )
+            for i in range(LINKED_USERS)
+        ]
+        + [{"_id": f"9{i:06}", "robloxID": str(i)} for i in range(LINKED_USERS * 4)]
+    )
+    await ensure_indexes()
+
+    yield
+
+    await users.delete_many({})
+
+
+class TestIntegrationReverseLookup:
+    """Tests paginated reverse lookups against a seeded database."""
+
+    @pytest.mark.asyncio
+    async def test_reverse_lookup_pages(
+        self, linked_users
+    ):  # pylint: disable=unused-argument
+        roblox_user = RobloxUser(id=int(ROBLOX_ID))
+
+        pages = [
+            page
+            async for page in reverse_lookup_pages(
+                roblox_user, exclude_user_id=1, page_size=1000
+            )
+        ]
+        discord_ids = [discord_id for page in pages for discord_id in page.discord_ids]
+
+        assert len(pages) == 3
+        assert pages[-1].cursor is None
+        assert discord_ids == [i for i in range(LINKED_USERS) if i != 1]
+
+        # continue from the cursor of the first page
+        next_page = await anext(
+            reverse_lookup_pages(roblox_user, page_size=10, after=pages[0].cursor)
+        )
+        assert next_page.discord_ids == list(range(1000, 1010))
+
+        assert await reverse_lookup(roblox_user, limit=5) == list(range(5))
+
+    @pytest.mark.asyncio
+    async def test_reverse_lookup_pages_mixed_id_types(self):
+        """Test that users with number and string _ids are all found, numbers first"""
+
+        users = mongo.bloxlink["users"]
+        await users.insert_many(
+            [{"_id": i, "robloxID": ROBLOX_ID} for i in (5, 6, 7)]
+            + [{"_id": f"{i:06}", "robloxID": ROBLOX_ID} for i in (1, 2, 3)]
+        )
+
+        try:
+            pages = [
+                page
+                async for page in reverse_lookup_pages(
+                    RobloxUser(id=int(ROBLOX_ID)), page_size=2
+                )
+            ]
+        finally:
+            await users.delete_many({})
+
+        assert [page.discord_ids for page in pages] == [[5, 6], [7, 1], [2, 3]]
+
+    @pytest.mark.benchmark
+    @pytest.mark.asyncio
+    async def test_reverse_lookup_is_index_backed(
+        self, linked_users
+    ):  # pylint: disable=unused-argument
+        stages = await assert_index_backed(
+            mongo.bloxlink["users"]
+            .find(reverse_lookup_query(ROBLOX_ID, after="001000"), {"_id": 1})
+            .sort("_id", 1)
+            .limit(100)
+        )
+
+        assert "IXSCAN" in stages
+
+        discord_ids = await reverse_lookup(RobloxUser(id=int(ROBLOX_ID)))
+
+        assert len(discord_ids) == LINKED_USERS
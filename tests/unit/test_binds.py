@@ -1,9 +1,24 @@
+from datetime import datetime, timezone
 from typing import Callable
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 import pytest
 from bloxlink_lib import GuildSerializable, SnowflakeSet, RoleSerializable
-from bloxlink_lib.models.binds import GuildBind, BindCriteria, GroupBindData, BindData
-from bloxlink_lib.models.roblox.binds import get_binds
+from bloxlink_lib.database import mongodb
+from bloxlink_lib.models.binds import (
+    GuildBind,
+    BindCriteria,
+    GroupBindData,
+    BindData,
+    exclude_existing_binds,
+    remove_binds,
+)
+from bloxlink_lib.models.roblox import binds as roblox_binds
+from bloxlink_lib.models.roblox.binds import (
+    get_binds,
+    fetch_bind_context,
+    migrate_guild_binds_batch,
+    BINDS_MIGRATION_VERSION,
+)
 from bloxlink_lib.models.schemas.guilds import GuildData
 from bloxlink_lib.test_utils.fixtures import (
     GuildRoles,
@@ -14,7 +29,7 @@ from bloxlink_lib.test_utils.fixtures import (
     verified_bind,
     unverified_bind,
 )
-from bloxlink_lib.test_utils.mockers import mock_guild_data
+from bloxlink_lib.test_utils.mockers import mock_guild_data, mock_redis_pipeline
 from .fixtures import (
     MockBindScenario,
     ExpectedBindsResult,
@@ -23,6 +38,7 @@ from .fixtures import (
     BindTestCase,
 )
 from bloxlink_lib.test_utils.mockers import MockUserData
+from tests.shared import BindConversionTestCase
 
 pytestmark = pytest.mark.binds
 
@@ -635,6 +651,58 @@ class TestBindHash:
         assert group_data_1.dynamicRoles != group_data_2.dynamicRoles
         assert hash(group_data_1) != hash(group_data_2)
 
+    @pytest.mark.asyncio()
+    async def test_bind_identity_key_follows_criteria(self):
+        """Test that the identity key follows the criteria of the bind, when it is reassigned or changed in place"""
+
+        bind = GuildBind(
+            roles=["1"],
+            criteria=BindCriteria(
+                type="group", id=1, group=GroupBindData(everyone=True)
+            ),
+        )
+        old_identity_key = bind.identity_key
+
+        bind.criteria = BindCriteria(
+            type="group", id=1, group=GroupBindData(guest=True)
+        )
+
+        assert bind.identity_key != old_identity_key
+        assert bind.identity_key == bind.criteria.identity_key
+
+        bind.criteria.group.guest = False
+        bind.criteria.group.everyone = True
+
+        assert bind.identity_key == old_identity_key
+
+    @pytest.mark.asyncio()
+    async def test_remove_and_exclude_binds(self):
+        """Test the set-based bind merge helpers"""
+
+        bind_1 = GuildBind(
+            roles=["1"],
+            criteria=BindCriteria(
+                type="group", id=1, group=GroupBindData(everyone=True)
+            ),
+        )
+        bind_2 = GuildBind(roles=["2"], criteria=BindCriteria(type="badge", id=2))
+        bind_2_copy = GuildBind(roles=["3"], criteria=BindCriteria(type="badge", id=2))
+
+        assert exclude_existing_binds([bind_1], [bind_2_copy, bind_1]) == [bind_2]
+        assert remove_binds([bind_1, bind_2], bind_2_copy) == [bind_1]
+
+        with pytest.raises(ValueError, match="Bind not found: 2"):
+            remove_binds([bind_1], bind_2)
+
+        # like list.remove(), only the first equal bind is removed for each bind to remove
+        assert remove_binds([bind_2, bind_1, bind_2_copy], bind_2) == [
+            bind_1,
+            bind_2_copy,
+        ]
+
+        with pytest.raises(ValueError):
+            remove_binds([bind_1, bind_2], bind_2, bind_2_copy)
+
 
 async def _assert_successful_binds_results(
     mocked_bind_scenario: MockedBindScenarioResult,
@@ -755,3 +823,199 @@ class TestBindVerifiedRoles:
 
         assert verified_bind in guild_binds
         assert unverified_bind in guild_binds
+
+
+class TestBindContext:
+    """Test loading the guild data used by bind evaluation"""
+
+    @pytest.mark.asyncio()
+    async def test_get_binds_fetches_guild_data_once(
+        self,
+        mocker,
+        test_guild: GuildSerializable,
+        verified_bind: GuildBind,
+        unverified_bind: GuildBind,
+    ):
+        """Test that the binds, V3 binds and verified role settings are read in a single fetch"""
+
+        mock_guild_data(
+            mocker,
+            GuildData(
+                id=test_guild.id,
+                binds=[],
+                verifiedRoleEnabled=True,
+                unverifiedRoleEnabled=True,
+            ),
+        )
+
+        guild_binds = await get_binds(
+            test_guild.id,
+            guild_roles=test_guild.roles,
+        )
+
+        aspect_fetches = [
+            call
+            for call in mongodb._db_fetch.await_args_list  # pylint: disable=protected-access
+            if "binds" in call.args
+        ]
+
+        assert verified_bind in guild_binds
+        assert unverified_bind in guild_binds
+        assert len(aspect_fetches) == 1
+
+    @pytest.mark.asyncio()
+    async def test_get_binds_converts_unmigrated_v3_binds(
+        self,
+        mocker,
+        test_guild: GuildSerializable,
+        bind_conversion_test_data: BindConversionTestCase,
+    ):
+        """Test that V3 binds are converted for guilds without a migration stamp"""
+
+        v3_binds = bind_conversion_test_data.v3_binds
+
+        mock_guild_data(
+            mocker,
+            GuildData(
+                id=test_guild.id,
+                roleBinds=v3_binds.roleBinds.model_dump(by_alias=True),
+                groupIDs=v3_binds.groupIDs.model_dump(by_alias=True),
+            ),
+        )
+
+        guild_binds = await get_binds(test_guild.id)
+
+        assert guild_binds == bind_conversion_test_data.v4_binds
+
+    @pytest.mark.asyncio()
+    async def test_get_binds_skips_migrated_guilds(
+        self,
+        mocker,
+        test_guild: GuildSerializable,
+        bind_conversion_test_data: BindConversionTestCase,
+    ):
+        """Test that V3 binds are not converted again once the guild is stamped as migrated"""
+
+        v3_binds = bind_conversion_test_data.v3_binds
+
+        mock_guild_data(
+            mocker,
+            GuildData(
+                id=test_guild.id,
+                roleBinds=v3_binds.roleBinds.model_dump(by_alias=True),
+                groupIDs=v3_binds.groupIDs.model_dump(by_alias=True),
+                bindsMigrationVersion=BINDS_MIGRATION_VERSION,
+            ),
+        )
+        from_v3 = mocker.spy(GuildBind, "from_V3")
+
+        guild_binds = await get_binds(test_guild.id)
+
+        assert guild_binds == []
+        from_v3.assert_not_called()
+
+    @pytest.mark.asyncio()
+    async def test_bind_context_cached_per_version(
+        self,
+        mocker,
+        test_guild: GuildSerializable,
+        verified_bind: GuildBind,
+    ):
+        """Test that the bind context is only refetched once the guild data has a new version"""
+
+        versions = [
+            datetime(2026, 1, 1, tzinfo=timezone.utc),
+            datetime(2026, 1, 1, tzinfo=timezone.utc),
+            datetime(2026, 1, 2, tzinfo=timezone.utc),
+        ]
+        guild_data = GuildData(
+            id=test_guild.id,
+            binds=[verified_bind],
+            bindsMigrationVersion=BINDS_MIGRATION_VERSION,
+        )
+
+        mock_guild_data(mocker, guild_data)
+        mocker.patch.object(roblox_binds, "_bind_contexts", roblox_binds.OrderedDict())
+
+        async def _mock_db_fetch(constructor, item_id, *aspects):
+            data = guild_data.model_dump(by_alias=True, exclude_unset=True)
+            data["_id"] = item_id
+            data["updatedAt"] = versions[0]
+
+            if aspects == ("updatedAt",) and len(versions) > 1:
+                versions.pop(0)
+
+            return data
+
+        mongodb._db_fetch.side_effect = (  # pylint: disable=protected-access
+            _mock_db_fetch
+        )
+
+        first = await fetch_bind_context(test_guild.id)
+        first.guild_data.binds.clear()
+        second = await fetch_bind_context(test_guild.id)
+        third = await fetch_bind_context(test_guild.id)
+
+        aspect_fetches = [
+            call
+            for call in mongodb._db_fetch.await_args_list  # pylint: disable=protected-access
+            if "binds" in call.args
+        ]
+
+        assert second.guild_data.binds == [verified_bind]
+        assert third.version == datetime(2026, 1, 2, tzinfo=timezone.utc)
+        assert len(aspect_fetches) == 2
+
+
+class TestBindMigrationBatch:
+    """Test migrating the V3 binds of a batch of guilds"""
+
+    @pytest.mark.asyncio()
+    async def test_changed_guilds_are_skipped(
+        self,
+        mocker,
+        bind_conversion_test_data: BindConversionTestCase,
+    ):
+        """Test that the writes only match the binds that were read, and unmatched guilds count as skipped"""
+
+        v3_binds = bind_conversion_test_data.v3_binds
+        updated_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        stored_guilds = [
+            {
+                "_id": guild_id,
+                "roleBinds": v3_binds.roleBinds.model_dump(by_alias=True),
+                "groupIDs": v3_binds.groupIDs.model_dump(by_alias=True),
+                "updatedAt": updated_at,
+            }
+            for guild_id in ("1", "2")
+        ]
+
+        async def _stored_guilds():
+            for guild in stored_guilds:
+                yield guild
+
+        collection = MagicMock()
+        collection.find.return_value.sort.return_value.limit.return_value = (
+            _stored_guilds()
+        )
+        collection.bulk_write = AsyncMock(return_value=MagicMock(matched_count=1))
+        mocker.patch.object(
+            roblox_binds,
+            "mongo",
+            MagicMock(bloxlink=MagicMock(__getitem__=lambda _, name: collection)),
+        )
+        mock_redis_pipeline(mocker)
+
+        batch_result = await migrate_guild_binds_batch(batch_size=10)
+
+        updates = collection.bulk_write.await_args.args[0]
+
+        assert [
+            update._filter for update in updates
+        ] == [  # pylint: disable=protected-access
+            {"_id": guild_id, "binds": None, "updatedAt": updated_at}
+            for guild_id in ("1", "2")
+        ]
+        assert batch_result.migrated == 1
+        assert batch_result.skipped == 1
+        assert batch_result.last_guild_id == "2"
@@ -0,0 +1,474 @@
+import gc
+import time
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from bloxlink_lib.models.binds import BindCriteria, GroupBindData, GuildBind
+from bloxlink_lib.models.roblox import base
+from bloxlink_lib.exceptions import RobloxAPIError, RobloxNotFound
+from bloxlink_lib.models.roblox.base import (
+    clear_entity_registry,
+    create_entity,
+    sync_entities,
+)
+from bloxlink_lib.models.roblox import groups
+from bloxlink_lib.models.roblox.users import (
+    RobloxUser,
+    RobloxUserGroup,
+    RobloxUserGroupInfo,
+)
+from bloxlink_lib.models.roblox.groups import (
+    CachedGroupData,
+    CachedGroupRolesets,
+    GroupRoleset,
+    RobloxGroup,
+    RobloxRoleset,
+    get_group_rolesets,
+    refresh_group_rolesets,
+    run_group_rolesets_refresher,
+)
+from bloxlink_lib.test_utils.mockers import mock_redis_pipeline
+
+
+@pytest.fixture(autouse=True)
+def fresh_entity_registry():
+    """Start every test with an empty entity registry"""
+
+    clear_entity_registry()
+    yield
+    clear_entity_registry()
+
+
+class TestEntityRegistry:
+    """Test the interning of entities by create_entity()"""
+
+    def test_create_entity_is_interned(self):
+        """Test that the same category and ID share one entity"""
+
+        group = create_entity("group", 1)
+
+        assert isinstance(group, RobloxGroup)
+        assert create_entity("group", 1) is group
+        assert create_entity("group", 2) is not group
+        assert create_entity("badge", 1) is not group
+        assert create_entity("verified", None) is create_entity("verified", None)
+        assert create_entity("invalid", 1) is None
+
+    def test_binds_share_entities(self):
+        """Test that binds for the same group share the synced state of the group"""
+
+        binds = [
+            GuildBind(
+                roles=[str(i)],
+                criteria=BindCriteria(
+                    type="group", id=1, group=GroupBindData(roleset=i)
+                ),
+            )
+            for i in range(1, 3)
+        ]
+
+        binds[0].entity.synced = True
+
+        assert binds[0].entity is binds[1].entity
+        assert binds[1].entity.synced
+
+    def test_stale_entities_are_replaced(self, mocker):
+        """Test that entities older than the TTL are replaced with unsynced ones"""
+
+        group = create_entity("group", 1)
+        group.synced = True
+
+        mocker.patch.object(base, "ENTITY_REGISTRY_TTL", -1)
+
+        assert group.stale
+        new_group = create_entity("group", 1)
+
+        assert new_group is not group
+        assert not new_group.synced
+
+    def test_unreferenced_entities_are_dropped(self):
+        """Test that the registry does not keep entities alive"""
+
+        create_entity("group", 1)
+        gc.collect()
+
+        assert (
+            "group",
+            1,
+        ) not in base._entity_registry  # pylint: disable=protected-access
+
+
+class TestSyncEntities:
+    """Test syncing entities concurrently"""
+
+    @pytest.mark.asyncio()
+    async def test_sync_entities_deduplicates(self, mocker):
+        """Test that each entity is synced once, and duplicates receive its data"""
+
+        async def _sync(self: RobloxGroup):
+            self.name = f"Group {self.id}"
+            self.synced = True
+
+        sync_mock = mocker.patch.object(
+            RobloxGroup, "sync", autospec=True, side_effect=_sync
+        )
+
+        first_group, other_group = RobloxGroup(id=1), RobloxGroup(id=2)
+        duplicate_group = RobloxGroup(id=1)
+
+        failed = await sync_entities(
+            [first_group, other_group, duplicate_group, first_group, None]
+        )
+
+        assert not failed
+        assert sync_mock.await_count == 2
+        assert duplicate_group.synced and duplicate_group.name == "Group 1"
+        assert other_group.name == "Group 2"
+
+    @pytest.mark.asyncio()
+    async def test_sync_entities_tolerates_failures(self, mocker):
+        """Test that one failing entity does not stop the others from syncing"""
+
+        async def _sync(self: RobloxGroup):
+            if self.id == 1:
+                raise RobloxNotFound()
+
+            self.synced = True
+
+        mocker.patch.object(RobloxGroup, "sync", autospec=True, side_effect=_sync)
+
+        groups_to_sync = [RobloxGroup(id=i) for i in range(1, 4)]
+
+        failed = await sync_entities(groups_to_sync, concurrency=2)
+
+        assert failed == [groups_to_sync[0]]
+        assert all(group.synced for group in groups_to_sync[1:])
+
+
+class TestGroupRolesetLookups:
+    """Test the cached roleset lookup tables of groups"""
+
+    def test_roleset_lookups(self, test_group: RobloxGroup):
+        """Test the roleset lookup tables against the rolesets of the group"""
+
+        ranks = sorted(test_group.rolesets)
+
+        assert test_group.roleset_ranks == ranks
+        assert test_group.rolesets_in_range(ranks[1], ranks[2]) == [
+            test_group.rolesets[ranks[1]],
+            test_group.rolesets[ranks[2]],
+        ]
+        assert all(
+            test_group.rolesets_by_name[roleset.name] is roleset
+            for roleset in test_group.rolesets.values()
+        )
+        assert test_group.roleset_enum is test_group.roleset_enum
+
+    def test_roleset_lookups_rebuild_on_assignment(self, test_group: RobloxGroup):
+        """Test that the lookup tables are rebuilt when the rolesets change"""
+
+        roleset_enum = test_group.roleset_enum
+        roleset = next(iter(test_group.rolesets.values()))
+
+        test_group.rolesets = {roleset.rank: roleset}
+
+        assert test_group.roleset_enum is not roleset_enum
+        assert list(test_group.rolesets_by_name) == [roleset.name]
+        assert test_group.roleset_ranks == [roleset.rank]
+
+
+class TestGroupSyncFor:
+    """Test getting the roleset of users in shared groups"""
+
+    @pytest.mark.asyncio()
+    async def test_sync_for_keeps_no_user_state(self):
+        """Test that users of the same interned group each get their own roleset"""
+
+        group = create_entity("group", 1)
+        rolesets = [GroupRoleset(name=f"Rank {i}", rank=i, id=i) for i in (1, 2)]
+        roblox_users = [
+            RobloxUser(
+                id=i,
+                groups={
+                    1: RobloxUserGroup(group=RobloxUserGroupInfo(id=1), role=roleset)
+                },
+            )
+            for i, roleset in enumerate(rolesets)
+        ]
+
+        assert [await group.sync_for(roblox_user) for roblox_user in roblox_users] == (
+            rolesets
+        )
+        assert await group.sync_for(RobloxUser(id=3, groups={})) is None
+
+        with pytest.deprecated_call():
+            assert group.user_roleset is None
+
+
+class TestGroupRolesetStore:
+    """Test the Redis roleset store of groups"""
+
+    @staticmethod
+    def _mock_roblox_rolesets(
+        mocker, roleset_data: RobloxRoleset | None, etag: str | None = None
+    ) -> AsyncMock:
+        mocker.patch("bloxlink_lib.database.redis.redis.set", new_callable=AsyncMock)
+
+        return mocker.patch.object(
+            groups,
+            "fetch_typed",
+            new_callable=AsyncMock,
+            return_value=(roleset_data, MagicMock(headers={"ETag": etag})),
+        )
+
+    @staticmethod
+    def _cached_rolesets(
+        fetched_at: float, etag: str | None = None
+    ) -> CachedGroupRolesets:
+        return CachedGroupRolesets(
+            rolesets={1: GroupRoleset(name="Member", rank=1, id=10)},
+            etag=etag,
+            fetched_at=fetched_at,
+        )
+
+    @pytest.mark.asyncio()
+    async def test_cold_read_fetches_rolesets(self, mocker):
+        """Test that rolesets are fetched from Roblox when none are stored"""
+
+        mocker.patch.object(
+            groups,
+            "_read_cached_group_rolesets",
+            new_callable=AsyncMock,
+            return_value=None,
+        )
+        fetch_mock = self._mock_roblox_rolesets(
+            mocker,
+            RobloxRoleset(
+                groupId=1,
+                roles=[
+                    GroupRoleset(name="Guest", rank=0, id=9),
+                    GroupRoleset(name="Member", rank=1, id=10),
+                ],
+            ),
+        )
+
+        rolesets = await get_group_rolesets(1)
+
+        assert list(rolesets) == [1]
+        fetch_mock.assert_awaited_once()
+
+    @pytest.mark.asyncio()
+    async def test_warm_read_does_not_fetch(self, mocker):
+        """Test that stored rolesets are returned without waiting on Roblox"""
+
+        cached_rolesets = self._cached_rolesets(fetched_at=time.time())
+        mocker.patch.object(
+            groups,
+            "_read_cached_group_rolesets",
+            new_callable=AsyncMock,
+            return_value=cached_rolesets,
+        )
+        fetch_mock = self._mock_roblox_rolesets(mocker, None)
+        schedule_mock = mocker.patch.object(groups, "_schedule_group_rolesets_refresh")
+
+        assert await get_group_rolesets(1) == cached_rolesets.rolesets
+        fetch_mock.assert_not_awaited()
+        schedule_mock.assert_not_called()
+
+        cached_rolesets.fetched_at = 0
+
+        assert await get_group_rolesets(1) == cached_rolesets.rolesets
+        fetch_mock.assert_not_awaited()
+        schedule_mock.assert_called_once_with(1, cached_rolesets)
+
+    @pytest.mark.asyncio()
+    async def test_revalidation_not_modified(self, mocker):
+        """Test that a 304 response keeps the stored rolesets"""
+
+        cached_rolesets = self._cached_rolesets(fetched_at=0, etag='"abc"')
+        fetch_mock = self._mock_roblox_rolesets(mocker, None)
+
+        new_rolesets, changed = await refresh_group_rolesets(1, cached_rolesets)
+
+        assert not changed
+        assert not new_rolesets.stale
+        assert new_rolesets.rolesets is cached_rolesets.rolesets
+        assert fetch_mock.await_args.kwargs["headers"] == {"If-None-Match": '"abc"'}
+
+    @pytest.mark.asyncio()
+    async def test_revalidation_by_content_hash(self, mocker):
+        """Test that rolesets without an ETag are compared by their content"""
+
+        cached_rolesets = self._cached_rolesets(fetched_at=0)
+        roleset_data = RobloxRoleset(
+            groupId=1, roles=[GroupRoleset(name="Member", rank=1, id=10, memberCount=5)]
+        )
+        self._mock_roblox_rolesets(mocker, roleset_data)
+
+        _, changed = await refresh_group_rolesets(1, cached_rolesets)
+        assert not changed
+
+        roleset_data.roles[0].name = "Members"
+
+        _, changed = await refresh_group_rolesets(1, cached_rolesets)
+        assert changed
+
+    @pytest.mark.asyncio()
+    async def test_failed_cold_fetch(self, mocker):
+        """Test that nothing is stored when Roblox returns no rolesets and none were stored"""
+
+        self._mock_roblox_rolesets(mocker, None)
+        mocker.patch.object(
+            groups,
+            "_read_cached_group_rolesets",
+            new_callable=AsyncMock,
+            return_value=None,
+        )
+
+        assert await refresh_group_rolesets(1) == (None, False)
+        groups.redis.set.assert_not_awaited()
+
+        with pytest.raises(RobloxAPIError):
+            await get_group_rolesets(1)
+
+    @pytest.mark.asyncio()
+    async def test_changed_rolesets_are_applied_to_interned_group(self, mocker):
+        """Test that the interned group picks up rolesets that changed on Roblox"""
+
+        group = create_entity("group", 1)
+        group.rolesets = self._cached_rolesets(fetched_at=0).rolesets
+        self._mock_roblox_rolesets(
+            mocker,
+            RobloxRoleset(
+                groupId=1, roles=[GroupRoleset(name="Members", rank=1, id=10)]
+            ),
+        )
+
+        _, changed = await refresh_group_rolesets(
+            1, self._cached_rolesets(fetched_at=0)
+        )
+
+        assert changed
+        assert group.rolesets[1].name == "Members"
+        assert group.rolesets_by_name.keys() == {"Members"}
+
+    @pytest.mark.asyncio()
+    async def test_hot_groups_are_capped(self, mocker):
+        """Test that counting a read also trims and expires the hot groups"""
+
+        pipeline = mock_redis_pipeline(mocker)
+        pipeline.execute.return_value = [None, 1, 0, True]
+
+        await groups._read_cached_group_rolesets(1)  # pylint: disable=protected-access
+
+        pipeline.zremrangebyrank.assert_awaited_once_with(
+            groups.HOT_GROUP_ROLESETS_KEY, 0, -groups.HOT_GROUP_ROLESETS_MAX_SIZE - 1
+        )
+        pipeline.expire.assert_awaited_once_with(
+            groups.HOT_GROUP_ROLESETS_KEY, groups.HOT_GROUP_ROLESETS_TTL
+        )
+
+    @pytest.mark.asyncio()
+    async def test_refresher_runs_once_per_interval(self, mocker):
+        """Test that only the process holding the refresher lock refreshes the hot groups"""
+
+        mocker.patch(
+            "bloxlink_lib.database.redis.redis.set",
+            new_callable=AsyncMock,
+            side_effect=[True, None],
+        )
+        refresh_mock = mocker.patch.object(
+            groups, "refresh_hot_group_rolesets", new_callable=AsyncMock
+        )
+        mocker.patch.object(
+            groups.asyncio,
+            "sleep",
+            new_callable=AsyncMock,
+            side_effect=[None, Exception],
+        )
+
+        with pytest.raises(Exception):
+            await run_group_rolesets_refresher(interval=60)
+
+        refresh_mock.assert_awaited_once()
+        groups.redis.set.assert_awaited_with(
+            groups.GROUP_ROLESETS_REFRESHER_LOCK_KEY, "1", nx=True, ex=60
+        )
+
+
+class TestGroupDataStore:
+    """Test the Redis store of the name, description and member count of groups"""
+
+    @pytest.mark.asyncio()
+    async def test_sync_uses_stored_group_data(self, mocker):
+        """Test that syncing a group with stored data and rolesets does not wait on Roblox"""
+
+        group_data = CachedGroupData(
+            name="Group", description="", member_count=5, fetched_at=time.time()
+        )
+        mocker.patch(
+            "bloxlink_lib.database.redis.redis.get",
+            new_callable=AsyncMock,
+            return_value=group_data.model_dump_json(),
+        )
+        mocker.patch.object(
+            groups,
+            "get_group_rolesets",
+            new_callable=AsyncMock,
+            return_value={1: GroupRoleset(name="Member", rank=1, id=10)},
+        )
+        fetch_mock = mocker.patch.object(groups, "fetch_typed", new_callable=AsyncMock)
+        schedule_mock = mocker.patch.object(groups, "_schedule_refresh")
+
+        group = RobloxGroup(id=1)
+        await group.sync()
+
+        assert group.name == "Group"
+        assert group.member_count == 5
+        fetch_mock.assert_not_awaited()
+        schedule_mock.assert_not_called()
+
+    @pytest.mark.asyncio()
+    async def test_stale_group_data_is_refreshed_in_background(self, mocker):
+        """Test that stale group data is returned right away and refetched in the background"""
+
+        mocker.patch(
+            "bloxlink_lib.database.redis.redis.get",
+            new_callable=AsyncMock,
+            return_value=CachedGroupData(name="Group", fetched_at=0).model_dump_json(),
+        )
+        fetch_mock = mocker.patch.object(groups, "fetch_typed", new_callable=AsyncMock)
+        schedule_mock = mocker.patch.object(groups, "_schedule_refresh")
+
+        group_data = await groups.get_group_data(1)
+
+        assert group_data.name == "Group"
+        fetch_mock.assert_not_awaited()
+        schedule_mock.assert_called_once()
+
+    @pytest.mark.asyncio()
+    async def test_cold_read_fetches_group_data(self, mocker):
+        """Test that group data is fetched from Roblox and stored when none is stored"""
+
+        mocker.patch(
+            "bloxlink_lib.database.redis.redis.get",
+            new_callable=AsyncMock,
+            return_value=None,
+        )
+        set_mock = mocker.patch(
+            "bloxlink_lib.database.redis.redis.set", new_callable=AsyncMock
+        )
+        mocker.patch.object(
+            groups,
+            "fetch_typed",
+            new_callable=AsyncMock,
+            return_value=(
+                RobloxGroup(id=1, name="Group", memberCount=5),
+                MagicMock(),
+            ),
+        )
+
+        group_data = await groups.get_group_data(1)
+
+        assert group_data.name == "Group"
+        assert group_data.member_count == 5
+        assert set_mock.await_args.args[0] == "group_data:1"
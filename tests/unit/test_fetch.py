@@ -0,0 +1,821 @@
+import asyncio
+import importlib
+from unittest.mock import AsyncMock, MagicMock
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import pytest
+from bloxlink_lib.config import CONFIG
+from bloxlink_lib.exceptions import (
+    DeadlineExceeded,
+    RobloxAPIError,
+    RobloxDown,
+    RobloxNotFound,
+)
+from bloxlink_lib.models.base import BaseModel, BaseResponse, CursorPage
+from bloxlink_lib.utils import parse_into
+from bloxlink_lib.metrics import MetricsRegistry
+from bloxlink_lib.fetch import (
+    HEDGE_MIN_SAMPLES,
+    HedgePolicy,
+    HostRateLimiter,
+    JSONListItemParser,
+    MAX_HTTP_RETRIES,
+    PROXY_EJECT_SECONDS,
+    ProxyPool,
+    RetryBudget,
+    paginate,
+    remaining_request_time,
+    request_deadline,
+)
+
+# the package re-exports the fetch() function under the same name as the module
+fetch_module = importlib.import_module("bloxlink_lib.fetch")
+
+
+class FetchedModel(BaseModel):
+    id: int
+    names: list[str]
+
+
+class TestFetchTyped:
+    """Test typed fetches"""
+
+    def test_parametrised_response_parses_in_one_pass(self):
+        """Test that the envelope and payload are validated straight from the body"""
+
+        body = b'{"success": true, "data": {"id": 1, "names": ["a", "b"], "extra": 1}}'
+
+        parsed = parse_into(body, BaseResponse[FetchedModel])
+
+        assert parsed.success
+        assert parsed.data == FetchedModel(id=1, names=["a", "b"])
+
+        parsed_list = parse_into(
+            b'{"success": true, "data": [{"id": 1, "names": []}]}',
+            BaseResponse[list[FetchedModel]],
+        )
+
+        assert parsed_list.data == [FetchedModel(id=1, names=[])]
+
+    @pytest.mark.asyncio()
+    async def test_bot_api_fetch_uses_parametrised_response(self, mocker):
+        """Test that bot API fetches request the parametrised envelope and unwrap its data"""
+
+        mocker.patch.object(CONFIG, "BOT_API", "http://bot-api")
+        fetch_mock = mocker.patch.object(
+            fetch_module,
+            "fetch",
+            new_callable=AsyncMock,
+            return_value=(
+                BaseResponse[FetchedModel](
+                    success=True, data=FetchedModel(id=1, names=[])
+                ),
+                MagicMock(status=200),
+            ),
+        )
+
+        data, _ = await fetch_module.fetch_typed(FetchedModel, "http://bot-api/users")
+
+        assert fetch_mock.await_args.kwargs["parse_as"] is BaseResponse[FetchedModel]
+        assert data == FetchedModel(id=1, names=[])
+
+    @pytest.mark.asyncio()
+    async def test_bot_api_fetch_not_modified(self, mocker):
+        """Test that a 304 from the bot API returns no data"""
+
+        mocker.patch.object(CONFIG, "BOT_API", "http://bot-api")
+        mocker.patch.object(
+            fetch_module,
+            "fetch",
+            new_callable=AsyncMock,
+            return_value=(None, MagicMock(status=304)),
+        )
+
+        data, response = await fetch_module.fetch_typed(
+            FetchedModel, "http://bot-api/users"
+        )
+
+        assert data is None
+        assert response.status == 304
+
+
+class TestJSONListItemParser:
+    """Test streaming the items of a JSON list"""
+
+    body = (
+        '{"nextPageCursor": null, "data": [{"id": 1, "name": "Grüppe ]"}, '
+        '{"id": 2, "name": "b", "roles": [1, 2]}]}'
+    ).encode()
+
+    def test_items_split_across_chunks(self):
+        """Test that items are returned once they are complete, whatever the chunk boundaries"""
+
+        for chunk_size in (1, 2, 7, len(self.body)):
+            parser = JSONListItemParser("data")
+            items = []
+
+            for i in range(0, len(self.body), chunk_size):
+                items.extend(parser.feed(self.body[i : i + chunk_size]))
+
+            assert items == [
+                {"id": 1, "name": "Grüppe ]"},
+                {"id": 2, "name": "b", "roles": [1, 2]},
+            ]
+            assert parser.done
+
+    def test_items_are_returned_as_they_arrive(self):
+        """Test that an item is returned before the rest of the body has arrived"""
+
+        parser = JSONListItemParser("data")
+
+        assert parser.feed(self.body[:66]) == [{"id": 1, "name": "Grüppe ]"}]
+        assert not parser.done
+
+    def test_empty_list(self):
+        """Test that an empty list completes without items"""
+
+        parser = JSONListItemParser("data")
+
+        assert not parser.feed(b'{"data": [ ]}')
+        assert parser.done
+
+    def test_only_top_level_key(self):
+        """Test that lists under the key in nested objects, or in strings, are skipped"""
+
+        body = (
+            b'{"meta": {"data": [{"id": 9}]}, "data\\"": [[8]], "note": "\\"data\\": [", '
+            b'"data" : [{"id": 1}]}'
+        )
+
+        for chunk_size in (1, 3, len(body)):
+            parser = JSONListItemParser("data")
+            items = []
+
+            for i in range(0, len(body), chunk_size):
+                items.extend(parser.feed(body[i : i + chunk_size]))
+
+            assert items == [{"id": 1}]
+            assert parser.done
+
+
+class TestPaginate:
+    """Test iterating over cursor-paginated list endpoints"""
+
+    @pytest.fixture(autouse=True)
+    def no_rate_limit(self, mocker):
+        mocker.patch.object(HostRateLimiter, "wait", new_callable=AsyncMock)
+
+    @staticmethod
+    def mock_pages(mocker, page_count: int):
+        """Serve pages of 2 items each."""
+
+        requested_cursors = []
+
+        async def _fetch_typed(parse_as, url, *, params):
+            page = int(params.get("cursor", 0))
+            requested_cursors.append(page)
+
+            return (
+                parse_as(
+                    data=[FetchedModel(id=page * 2 + i, names=[]) for i in range(2)],
+                    nextPageCursor=str(page + 1) if page + 1 < page_count else None,
+                ),
+                MagicMock(status=200),
+            )
+
+        mocker.patch.object(fetch_module, "fetch_typed", new=_fetch_typed)
+
+        return requested_cursors
+
+    @pytest.mark.asyncio()
+    async def test_paginate_all_pages(self, mocker):
+        """Test that every item of every page is yielded in order"""
+
+        requested_cursors = self.mock_pages(mocker, 3)
+
+        items = [
+            item.id
+            async for item in paginate("https://groups.roblox.com/v1/x", FetchedModel)
+        ]
+
+        assert items == list(range(6))
+        assert requested_cursors == [0, 1, 2]
+
+    @pytest.mark.asyncio()
+    async def test_paginate_prefetches_next_page(self, mocker):
+        """Test that the next page is requested before the current one is consumed"""
+
+        requested_cursors = self.mock_pages(mocker, 3)
+        pages = paginate("https://groups.roblox.com/v1/x", FetchedModel)
+
+        await anext(pages)
+        await asyncio.sleep(0)
+
+        assert requested_cursors == [0, 1]
+        await pages.aclose()
+
+    @pytest.mark.asyncio()
+    async def test_paginate_max_items(self, mocker):
+        """Test that no more items, or pages, than needed are fetched"""
+
+        requested_cursors = self.mock_pages(mocker, 10)
+
+        items = [
+            item.id
+            async for item in paginate(
+                "https://groups.roblox.com/v1/x", FetchedModel, max_items=3
+            )
+        ]
+
+        assert items == [0, 1, 2]
+        assert requested_cursors == [0, 1]
+
+    @staticmethod
+    def rate_limited_server(retry_after: str) -> tuple[TestServer, list[int]]:
+        """Answer the first request with a 429, and the next ones with a page of 2 items."""
+
+        statuses = []
+
+        async def _handler(_request: web.Request) -> web.Response:
+            if not statuses:
+                statuses.append(429)
+                return web.Response(status=429, headers={"Retry-After": retry_after})
+
+            statuses.append(200)
+            return web.json_response(
+                {"data": [{"id": 0, "names": []}, {"id": 1, "names": []}]}
+            )
+
+        app = web.Application()
+        app.router.add_get("/", _handler)
+
+        return TestServer(app), statuses
+
+    @pytest.mark.asyncio()
+    @pytest.mark.parametrize("retry_after", ["0", "Wed, 21 Oct 2015 07:28:00 GMT"])
+    async def test_paginate_retries_rate_limits(self, mocker, retry_after):
+        """Test that rate limited pages are retried once by fetch(), whatever the format of Retry-After"""
+
+        mocker.patch.object(fetch_module, "_retry_budgets", {})
+        mocker.patch.object(fetch_module, "_retry_backoff", return_value=0)
+        server, statuses = self.rate_limited_server(retry_after)
+
+        async with server:
+            items = [
+                item.id
+                async for item in paginate(str(server.make_url("/")), FetchedModel)
+            ]
+
+        assert items == [0, 1]
+        assert statuses == [429, 200]
+
+    @pytest.mark.asyncio()
+    async def test_paginate_rate_limits_use_retry_budget(self, mocker):
+        """Test that pages are not retried once the retry budget of their host is spent"""
+
+        mocker.patch.object(fetch_module, "_retry_budgets", {})
+        server, statuses = self.rate_limited_server("0")
+
+        async with server:
+            fetch_module.retry_budget(str(server.make_url("/"))).tokens = 0
+
+            with pytest.raises(RobloxAPIError):
+                async for _ in paginate(str(server.make_url("/")), FetchedModel):
+                    pass
+
+        assert statuses == [429]
+
+
+class TestHostRateLimiter:
+    """Test spacing out requests to a host"""
+
+    @pytest.mark.asyncio()
+    async def test_requests_are_spaced_out(self, mocker):
+        """Test that each waiter gets the next free slot"""
+
+        sleep_mock = mocker.patch.object(
+            fetch_module.asyncio, "sleep", new_callable=AsyncMock
+        )
+        rate_limiter = HostRateLimiter(requests_per_second=10)
+
+        for _ in range(3):
+            await rate_limiter.wait()
+
+        waits = [call.args[0] for call in sleep_mock.await_args_list]
+
+        assert len(waits) == 2
+        assert waits[0] == pytest.approx(0.1, abs=0.01)
+        assert waits[1] == pytest.approx(0.2, abs=0.01)
+
+    def test_rate_is_configured(self, mocker):
+        """Test that the rate limiters of hosts use the configured rate"""
+
+        mocker.patch.object(fetch_module, "_host_rate_limiters", {})
+        mocker.patch.object(CONFIG, "PAGINATE_REQUESTS_PER_SECOND", 4)
+
+        rate_limiter = fetch_module.host_rate_limiter("https://groups.roblox.com/v1/x")
+
+        assert rate_limiter.interval == 0.25
+        assert (
+            fetch_module.host_rate_limiter("https://groups.roblox.com/v1/y")
+            is rate_limiter
+        )
+
+
+class TestHedgePolicy:
+    """Test hedging slow requests"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_hedge_counter(self, mocker):
+        mocker.patch.object(
+            fetch_module,
+            "HTTP_HEDGES",
+            MetricsRegistry().counter(
+                "bloxlink_http_hedges_total", "", ("host", "result")
+            ),
+        )
+
+    @staticmethod
+    def hedge_results(*results: str) -> tuple[int, ...]:
+        return tuple(
+            fetch_module.HTTP_HEDGES.get(host="", result=result) for result in results
+        )
+
+    @staticmethod
+    def warmed_up_policy(budget: float = 1) -> HedgePolicy:
+        policy = HedgePolicy(0.9, budget, alternate_proxy="http://alternate-proxy")
+        policy.latencies.extend([0.01] * HEDGE_MIN_SAMPLES)
+
+        return policy
+
+    @staticmethod
+    def attempts(*delays: float, fail: tuple[int, ...] = ()):
+        """Create an attempt function whose n-th call takes delays[n], and fails if n is in fail."""
+
+        proxies = []
+
+        async def _attempt(proxy: str | None) -> int:
+            attempt_number = len(proxies)
+            proxies.append(proxy)
+            await asyncio.sleep(delays[attempt_number])
+
+            if attempt_number in fail:
+                raise RobloxNotFound()
+
+            return attempt_number
+
+        return _attempt, proxies
+
+    @pytest.mark.asyncio()
+    async def test_no_hedge_without_samples(self):
+        """Test that requests are not hedged until the latency percentile is known"""
+
+        policy = HedgePolicy(0.9, 1)
+        attempt, proxies = self.attempts(0.05)
+
+        assert await policy.run(attempt) == 0
+        assert proxies == [None]
+        assert len(policy.latencies) == 1
+
+    @pytest.mark.asyncio()
+    async def test_hedge_wins(self):
+        """Test that a slow request is hedged through the alternate proxy, and the hedge can win"""
+
+        policy = self.warmed_up_policy()
+        attempt, proxies = self.attempts(1, 0)
+
+        assert await policy.run(attempt) == 1
+        assert proxies == [None, "http://alternate-proxy"]
+        assert self.hedge_results("sent", "won", "lost") == (1, 1, 0)
+
+    @pytest.mark.asyncio()
+    async def test_hedge_loses(self):
+        """Test that the first attempt still wins if it finishes before the hedge"""
+
+        policy = self.warmed_up_policy()
+        attempt, _ = self.attempts(0.05, 1)
+
+        assert await policy.run(attempt) == 0
+        assert self.hedge_results("sent", "won", "lost") == (1, 0, 1)
+
+    @pytest.mark.asyncio()
+    async def test_budget_caps_hedges(self):
+        """Test that hedges are skipped once the budget is spent"""
+
+        policy = self.warmed_up_policy(budget=0.5)
+        attempt, proxies = self.attempts(0.05)
+
+        assert await policy.run(attempt) == 0
+        assert proxies == [None]
+        assert self.hedge_results("sent", "skipped") == (0, 1)
+
+    @pytest.mark.asyncio()
+    async def test_failed_attempts(self):
+        """Test that a failed attempt loses to a successful one, and the first error is raised if all fail"""
+
+        policy = self.warmed_up_policy(budget=2)
+        attempt, _ = self.attempts(0.05, 0, fail=(1,))
+
+        assert await policy.run(attempt) == 0
+
+        attempt, _ = self.attempts(0.05, 0, fail=(0, 1))
+
+        with pytest.raises(RobloxNotFound):
+            await policy.run(attempt)
+
+    @pytest.mark.asyncio()
+    async def test_fetch_hedges_opted_in_gets(self, mocker):
+        """Test that fetch() only hedges GETs that opt in, when hedging is enabled"""
+
+        mocker.patch.object(CONFIG, "HEDGE_REQUESTS", True)
+        fetch_mock = mocker.patch.object(
+            fetch_module, "_fetch", new_callable=AsyncMock, return_value=({}, None)
+        )
+        run_mock = mocker.patch.object(
+            HedgePolicy, "run", new_callable=AsyncMock, return_value=({}, None)
+        )
+
+        await fetch_module.fetch("GET", "https://inventory.roblox.com/x", hedge=True)
+        await fetch_module.fetch("POST", "https://inventory.roblox.com/x", hedge=True)
+        await fetch_module.fetch("GET", "https://inventory.roblox.com/x")
+
+        assert run_mock.await_count == 1
+        assert fetch_mock.await_count == 2
+
+        mocker.patch.object(CONFIG, "HEDGE_REQUESTS", False)
+        await fetch_module.fetch("GET", "https://inventory.roblox.com/x", hedge=True)
+
+        assert run_mock.await_count == 1
+
+    @pytest.mark.asyncio()
+    async def test_hedge_avoids_proxy_of_first_attempt(self, mocker):
+        """Test that without a HEDGE_PROXY_URL, the hedge goes through another proxy of the pool"""
+
+        mocker.patch.object(CONFIG, "HEDGE_REQUESTS", True)
+        mocker.patch.object(
+            fetch_module, "proxy_pool", return_value=ProxyPool(["http://a", "http://b"])
+        )
+        mocker.patch.object(fetch_module, "_hedge_policies", {})
+        fetch_mock = mocker.patch.object(
+            fetch_module, "_fetch", new_callable=AsyncMock, return_value=({}, None)
+        )
+        policy = self.warmed_up_policy()
+        policy.alternate_proxy = None
+        mocker.patch.object(fetch_module, "hedge_policy", return_value=policy)
+
+        async def _slow_fetch(method, url, *, proxy, **kwargs):
+            if len(fetch_mock.await_args_list) == 1:
+                await asyncio.sleep(1)
+
+            return {}, None
+
+        fetch_mock.side_effect = _slow_fetch
+
+        await fetch_module.fetch("GET", "https://inventory.roblox.com/x", hedge=True)
+
+        proxies = [call.kwargs["proxy"] for call in fetch_mock.await_args_list]
+
+        assert len(proxies) == 2
+        assert set(proxies) == {"http://a", "http://b"}
+
+
+class TestProxyPool:
+    """Test spreading requests over proxies by health"""
+
+    def test_failing_proxy_is_ejected(self):
+        """Test that a proxy is ejected once its error rate is too high, and traffic avoids it"""
+
+        pool = ProxyPool(["http://a", "http://b"])
+
+        for _ in range(5):
+            pool.record("http://a", 0.1, failed=True)
+            pool.record("http://b", 0.1, failed=False)
+
+        assert pool.proxies["http://a"].ejected_until > 0
+        assert {pool.choose() for _ in range(20)} == {"http://b"}
+
+    def test_all_ejected_fails_open(self, mocker):
+        """Test that ejected proxies are still used if every proxy is ejected"""
+
+        pool = ProxyPool(["http://a"])
+        pool.proxies["http://a"].ejected_until = float("inf")
+
+        assert pool.choose() == "http://a"
+
+    def test_weighted_by_latency(self, mocker):
+        """Test that faster proxies are chosen more often"""
+
+        pool = ProxyPool(["http://fast", "http://slow"])
+        pool.record("http://fast", 0.01, failed=False)
+        pool.record("http://slow", 1, failed=False)
+        choices_mock = mocker.patch(
+            "random.choices", side_effect=lambda population, weights: [population[0]]
+        )
+
+        pool.choose()
+        weights = dict(
+            zip(
+                (proxy.url for proxy in choices_mock.call_args.args[0]),
+                choices_mock.call_args.kwargs["weights"],
+            )
+        )
+
+        assert weights["http://fast"] == pytest.approx(100 * weights["http://slow"])
+
+    def test_excluded_proxy(self):
+        """Test that an excluded proxy is only chosen when it is the only one"""
+
+        pool = ProxyPool(["http://a", "http://b"])
+
+        assert {pool.choose(exclude="http://a") for _ in range(20)} == {"http://b"}
+        assert ProxyPool(["http://a"]).choose(exclude="http://a") == "http://a"
+
+    def test_every_request_chooses_by_weight(self, mocker):
+        """Test that every request chooses its proxy by weight, instead of sticking to a previous choice"""
+
+        pool = ProxyPool(["http://a", "http://b"])
+        choices_mock = mocker.patch(
+            "random.choices", side_effect=lambda population, weights: [population[0]]
+        )
+
+        for _ in range(3):
+            pool.choose()
+
+        assert choices_mock.call_count == 3
+
+    @pytest.mark.asyncio()
+    async def test_local_proxies(self, mocker):
+        """Test that requests move off a rate limited stand-in proxy onto a healthy one"""
+
+        served = {"good": 0, "bad": 0}
+
+        def _proxy(name: str, status: int):
+            async def _handler(request: web.Request) -> web.Response:
+                served[name] += 1
+                return web.Response(status=status, text=request.url.host)
+
+            app = web.Application()
+            app.router.add_route("*", "/{path:.*}", _handler)
+
+            return TestServer(app)
+
+        async with _proxy("good", 200) as good, _proxy("bad", 429) as bad:
+            proxy_urls = [str(good.make_url("")), str(bad.make_url(""))]
+            mocker.patch.object(CONFIG, "PROXY_URLS", proxy_urls)
+            mocker.patch.object(CONFIG, "PROXY_URL", None)
+            # every rate limited response should count against the proxy, not be retried
+            mocker.patch.object(fetch_module, "MAX_HTTP_RETRIES", 1)
+
+            for i in range(30):
+                text, response = await fetch_module.fetch(
+                    "GET",
+                    f"http://host{i}.roblox.com/v1/x",
+                    parse_as="TEXT",
+                    raise_on_failure=False,
+                )
+
+                if response.status == 200:
+                    assert text == f"host{i}.roblox.com"
+
+            pool = fetch_module.proxy_pool()
+
+            assert pool.proxies[proxy_urls[1]].ejected_until > 0
+            assert served["bad"] < 5
+            assert served["good"] + served["bad"] == 30
+
+    def test_ejection_expires(self, mocker):
+        """Test that an ejected proxy comes back after PROXY_EJECT_SECONDS"""
+
+        pool = ProxyPool(["http://a", "http://b"])
+
+        for _ in range(5):
+            pool.record("http://a", 0.1, failed=True)
+
+        now = fetch_module.time.monotonic()
+        mocker.patch.object(
+            fetch_module.time, "monotonic", return_value=now + PROXY_EJECT_SECONDS + 1
+        )
+
+        assert "http://a" in {pool.choose() for _ in range(50)}
+
+
+class TestRequestDeadline:
+    """Test sharing a deadline between the requests of a context"""
+
+    def test_nested_deadlines_only_shrink(self):
+        """Test that a nested deadline cannot extend the budget of its context"""
+
+        assert remaining_request_time() is None
+
+        with request_deadline(1):
+            with request_deadline(10):
+                assert remaining_request_time() <= 1
+
+            with request_deadline(0.5):
+                assert remaining_request_time() <= 0.5
+
+        assert remaining_request_time() is None
+
+    @pytest.mark.asyncio()
+    async def test_spent_budget_abandons_requests(self, mocker):
+        """Test that no request is sent once the deadline has passed"""
+
+        session_mock = mocker.patch.object(fetch_module.aiohttp, "ClientSession")
+
+        with request_deadline(0):
+            with pytest.raises(DeadlineExceeded):
+                await fetch_module.fetch("GET", "http://localhost/x")
+
+        session_mock.assert_not_called()
+
+    @pytest.mark.asyncio()
+    async def test_deadline_abandons_slow_requests(self):
+        """Test that a request in flight is abandoned when the deadline runs out, and tasks share it"""
+
+        async def _slow(request: web.Request) -> web.Response:
+            await asyncio.sleep(5)
+            return web.Response()
+
+        app = web.Application()
+        app.router.add_get("/slow", _slow)
+
+        async with TestServer(app) as server:
+            url = str(server.make_url("/slow"))
+            started_at = asyncio.get_running_loop().time()
+
+            with request_deadline(0.2):
+                results = await asyncio.gather(
+                    fetch_module.fetch("GET", url),
+                    asyncio.create_task(fetch_module.fetch("GET", url)),
+                    return_exceptions=True,
+                )
+
+            assert all(isinstance(result, DeadlineExceeded) for result in results)
+            # still a RobloxDown for callers that handle that
+            assert isinstance(results[0], RobloxDown)
+            assert asyncio.get_running_loop().time() - started_at < 1
+
+    @pytest.mark.asyncio()
+    async def test_deadline_does_not_cover_consumers(self):
+        """Test that the deadline of a streamed list only covers reading it, not the code consuming its items"""
+
+        async def _handler(_request: web.Request) -> web.Response:
+            return web.json_response(
+                {"data": [{"id": 1, "names": []}, {"id": 2, "names": []}]}
+            )
+
+        app = web.Application()
+        app.router.add_get("/", _handler)
+
+        async with TestServer(app) as server:
+            items = []
+
+            with request_deadline(0.1):
+                async for item in fetch_module.fetch_list_items(
+                    str(server.make_url("/")), FetchedModel
+                ):
+                    # outlives the deadline, but the body has already been read
+                    await asyncio.sleep(0.2)
+                    items.append(item.id)
+
+        assert items == [1, 2]
+
+
+class TestRetries:
+    """Test which requests are retried, and how often"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_budgets(self, mocker):
+        mocker.patch.object(fetch_module, "_retry_budgets", {})
+        mocker.patch.object(fetch_module, "_retry_backoff", return_value=0)
+
+    @staticmethod
+    def scripted_server(*statuses: int) -> tuple[TestServer, list[str]]:
+        """Serve the given statuses in order, repeating the last one, and record the methods received."""
+
+        received = []
+
+        async def _handler(request: web.Request) -> web.Response:
+            status = statuses[min(len(received), len(statuses) - 1)]
+            received.append(request.method)
+
+            return web.Response(
+                status=status,
+                text="{}",
+                headers={"Retry-After": "0"} if status == 429 else None,
+            )
+
+        app = web.Application()
+        app.router.add_route("*", "/", _handler)
+
+        return TestServer(app), received
+
+    @pytest.mark.asyncio()
+    @pytest.mark.parametrize(
+        "method,statuses,expected_status,expected_attempts",
+        [
+            ("GET", (503, 200), 200, 2),
+            ("GET", (429, 200), 200, 2),
+            ("GET", (503,), 503, MAX_HTTP_RETRIES),
+            ("GET", (404, 200), 404, 1),
+            ("GET", (501, 200), 501, 1),
+            ("POST", (503, 200), 503, 1),
+        ],
+    )
+    async def test_retry_classification(
+        self, method, statuses, expected_status, expected_attempts
+    ):
+        """Test that only idempotent requests are retried, and only on rate limits and server errors"""
+
+        server, received = self.scripted_server(*statuses)
+
+        async with server:
+            _, response = await fetch_module.fetch(
+                method,
+                str(server.make_url("/")),
+                raise_on_failure=False,
+                parse_as="TEXT",
+            )
+
+        assert response.status == expected_status
+        assert received == [method] * expected_attempts
+
+    @pytest.mark.asyncio()
+    async def test_spent_budget_stops_retries(self):
+        """Test that requests are not retried once the retry budget of their host is spent"""
+
+        server, received = self.scripted_server(503, 200)
+
+        async with server:
+            fetch_module.retry_budget(str(server.make_url("/"))).tokens = 0
+
+            with pytest.raises(RobloxDown):
+                await fetch_module.fetch("GET", str(server.make_url("/")))
+
+        assert len(received) == 1
+
+    @pytest.mark.asyncio()
+    async def test_connection_errors_are_retried(self, mocker):
+        """Test that connection errors are retried before being raised as RobloxDown"""
+
+        request_mock = mocker.patch.object(
+            aiohttp.ClientSession,
+            "request",
+            side_effect=aiohttp.ServerDisconnectedError(),
+        )
+
+        with pytest.raises(RobloxDown):
+            await fetch_module.fetch("GET", "http://localhost/x")
+
+        assert request_mock.call_count == MAX_HTTP_RETRIES
+
+    def test_budget_is_a_ratio_of_requests(self):
+        """Test that each request earns a share of a retry"""
+
+        budget = RetryBudget()
+        budget.tokens = 0
+
+        for _ in range(4):
+            budget.deposit()
+
+        assert not budget.withdraw()
+
+        budget.deposit()
+
+        assert budget.withdraw()
+        assert not budget.withdraw()
+
+
+class TestConditionalRequests:
+    """Test that 304 Not Modified is only a success for conditional requests"""
+
+    @staticmethod
+    def not_modified_server() -> TestServer:
+        async def _handler(_request: web.Request) -> web.Response:
+            return web.Response(status=304)
+
+        app = web.Application()
+        app.router.add_get("/", _handler)
+
+        return TestServer(app)
+
+    @pytest.mark.asyncio()
+    async def test_conditional_request_not_modified(self):
+        """Test that a 304 to a conditional request returns no data"""
+
+        async with self.not_modified_server() as server:
+            data, response = await fetch_module.fetch(
+                "GET", str(server.make_url("/")), headers={"If-None-Match": '"abc"'}
+            )
+
+        assert data is None
+        assert response.status == 304
+
+    @pytest.mark.asyncio()
+    async def test_unconditional_request_not_modified(self):
+        """Test that a 304 to a request that was not conditional is a failure"""
+
+        async with self.not_modified_server() as server:
+            with pytest.raises(RobloxAPIError):
+                await fetch_module.fetch("GET", str(server.make_url("/")))
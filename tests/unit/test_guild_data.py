@@ -0,0 +1,286 @@
+import importlib
+import json
+import timeit
+from unittest.mock import AsyncMock
+import pytest
+from bloxlink_lib import GuildSerializable
+from bloxlink_lib.models.binds import BindCriteria, GuildBind, GroupBindData
+from bloxlink_lib.models.schemas.guilds import (  # pylint: disable=no-name-in-module
+    GuildData,
+    GuildRestriction,
+    fetch_guild_data,
+    update_guild_data,
+)
+from bloxlink_lib.models import migrators
+from bloxlink_lib.test_utils.mockers import mock_guild_data, mock_redis_pipeline
+
+mongodb = importlib.import_module("bloxlink_lib.database.mongodb")
+
+
+def _guild_data_dump(guild_id: int, bind_count: int) -> dict:
+    """Dump guild data with the given number of binds, as it would be cached"""
+
+    guild_data = GuildData(
+        id=guild_id,
+        binds=[
+            GuildBind(
+                roles=[str(i)],
+                nickname="{roblox-name}",
+                criteria=BindCriteria(
+                    type="group", id=i, group=GroupBindData(roleset=i % 255 + 1)
+                ),
+            )
+            for i in range(bind_count)
+        ],
+        restrictions=[
+            GuildRestriction(id=1, displayName="Test", addedBy="2", type="users")
+        ],
+        magicRoles={"3": ["Bloxlink Admin"]},
+    )
+
+    return guild_data.model_dump(by_alias=True, exclude_unset=True)
+
+
+class TestTrustedGuildData:
+    """Test constructing guild data from trusted data"""
+
+    def test_trusted_construction_matches_validation(
+        self, test_guild: GuildSerializable
+    ):
+        """Test that the trusted path builds the same guild data as the validated path"""
+
+        guild_data_dump = _guild_data_dump(test_guild.id, bind_count=10)
+
+        validated_guild_data = GuildData(**guild_data_dump)
+        trusted_guild_data = GuildData.model_validate_trusted(guild_data_dump)
+
+        assert trusted_guild_data == validated_guild_data
+        assert all(isinstance(b, GuildBind) for b in trusted_guild_data.binds)
+        assert trusted_guild_data.binds[0].entity.id == 0
+        assert trusted_guild_data.restrictions[0].displayName == "Test"
+
+    @pytest.mark.asyncio()
+    async def test_trusted_construction_skips_migrators(
+        self, mocker, test_guild: GuildSerializable
+    ):
+        """Test that the trusted path skips the migrators that the validated path runs"""
+
+        guild_data_dump = _guild_data_dump(test_guild.id, bind_count=10)
+        guild_data_dump["nicknameTemplate"] = "{roblox-name}"
+        migrate_binds = mocker.spy(migrators, "migrate_binds")
+        migrate_nickname_template = mocker.spy(migrators, "migrate_nickname_template")
+
+        GuildData.model_validate_trusted(guild_data_dump)
+
+        migrate_binds.assert_not_called()
+        migrate_nickname_template.assert_not_called()
+
+        GuildData(**guild_data_dump)
+
+        migrate_binds.assert_called_once()
+        migrate_nickname_template.assert_any_call("{roblox-name}")
+
+    @pytest.mark.asyncio()
+    @pytest.mark.parametrize("trusted", [True, False])
+    async def test_cache_hits_of_migrated_values_are_trusted(
+        self, mocker, test_guild: GuildSerializable, trusted: bool
+    ):
+        """Test that fetch_item() only skips the migrators for values that update_item() cached"""
+
+        migrate_nickname_template = mocker.spy(migrators, "migrate_nickname_template")
+        mocker.patch(
+            "bloxlink_lib.database.redis.redis.hmget",
+            new_callable=AsyncMock,
+            return_value=(
+                ['"{roblox-name}"', "1"] if trusted else ["{roblox-name}", None]
+            ),
+        )
+        db_fetch = mocker.patch(
+            "bloxlink_lib.database.mongodb._db_fetch", new_callable=AsyncMock
+        )
+
+        guild_data = await fetch_guild_data(test_guild, "nicknameTemplate")
+
+        db_fetch.assert_not_awaited()
+        assert guild_data.nicknameTemplate == "{roblox-name}"
+        assert migrate_nickname_template.called is not trusted
+
+    @pytest.mark.asyncio()
+    async def test_update_caches_migrated_values(
+        self, mocker, test_guild: GuildSerializable
+    ):
+        """Test that update_item() caches the migrated values, marked as trusted"""
+
+        mocker.patch.object(mongodb, "_db_update", new_callable=AsyncMock)
+        mocker.patch.object(
+            migrators, "migrate_nickname_template", return_value="{smart-name}"
+        )
+        pipeline = mock_redis_pipeline(mocker)
+
+        await update_guild_data(test_guild, nicknameTemplate="{legacy}")
+
+        pipeline.hset.assert_awaited_once_with(
+            f"guilds:{test_guild.id}",
+            mapping={
+                "nicknameTemplate": '"{smart-name}"',
+                f"{mongodb.TRUSTED_CACHE_PREFIX}nicknameTemplate": "1",
+            },
+        )
+
+    @pytest.mark.asyncio()
+    async def test_cached_binds_are_trusted(
+        self, mocker, test_guild: GuildSerializable
+    ):
+        """Test that binds cached by update_item() are served from Redis without migrating them again"""
+
+        guild_data = GuildData(**_guild_data_dump(test_guild.id, bind_count=3))
+        cached_hash = {}
+
+        async def _hset(key, mapping):
+            cached_hash.update(mapping)
+
+        async def _hmget(key, *fields):
+            return [cached_hash.get(field) for field in fields]
+
+        mocker.patch.object(mongodb, "_db_update", new_callable=AsyncMock)
+        pipeline = mock_redis_pipeline(mocker)
+        pipeline.hset.side_effect = _hset
+        mocker.patch("bloxlink_lib.database.redis.redis.hmget", side_effect=_hmget)
+        db_fetch = mocker.patch.object(mongodb, "_db_fetch", new_callable=AsyncMock)
+
+        await update_guild_data(test_guild, binds=guild_data.binds)
+
+        migrate_binds = mocker.spy(migrators, "migrate_binds")
+        cached_guild_data = await fetch_guild_data(test_guild, "binds")
+
+        db_fetch.assert_not_awaited()
+        migrate_binds.assert_not_called()
+        assert cached_guild_data.binds == guild_data.binds
+
+    @pytest.mark.asyncio()
+    async def test_untrusted_fields_are_validated(
+        self, mocker, test_guild: GuildSerializable
+    ):
+        """Test that one cached field without a trust marker makes fetch_item() validate the whole item"""
+
+        migrate_nickname_template = mocker.spy(migrators, "migrate_nickname_template")
+        mocker.patch(
+            "bloxlink_lib.database.redis.redis.hgetall",
+            new_callable=AsyncMock,
+            return_value={
+                "nicknameTemplate": json.dumps("{roblox-name}"),
+                f"{mongodb.TRUSTED_CACHE_PREFIX}nicknameTemplate": "1",
+                "unverifiedRoleName": "Unverified",
+            },
+        )
+
+        guild_data = await fetch_guild_data(test_guild)
+
+        assert guild_data.nicknameTemplate == "{roblox-name}"
+        assert guild_data.unverifiedRoleName == "Unverified"
+        migrate_nickname_template.assert_called()
+
+    @pytest.mark.benchmark
+    def test_trusted_construction_benchmark(self, test_guild: GuildSerializable):
+        """Compare trusted construction against full validation for a large guild"""
+
+        guild_data_dump = _guild_data_dump(test_guild.id, bind_count=500)
+        validated_times, trusted_times = [], []
+
+        # interleave the rounds so that load on the machine affects both equally
+        for _ in range(7):
+            validated_times.append(
+                timeit.timeit(lambda: GuildData(**guild_data_dump), number=5)
+            )
+            trusted_times.append(
+                timeit.timeit(
+                    lambda: GuildData.model_validate_trusted(guild_data_dump), number=5
+                )
+            )
+
+        assert min(trusted_times) < min(validated_times)
+
+
+class TestGuildDataProjection:
+    """Test fetching projections of guild data"""
+
+    @pytest.mark.asyncio()
+    async def test_fetch_guild_data_returns_projection(
+        self, mocker, test_guild: GuildSerializable
+    ):
+        """Test that fetching aspects only validates those aspects"""
+
+        mock_guild_data(
+            mocker,
+            GuildData(
+                id=test_guild.id,
+                verifiedRole="1",
+                nicknameTemplate="{roblox-name}",
+                restrictions=[
+                    GuildRestriction(
+                        id=1, displayName="Test", addedBy="2", type="users"
+                    )
+                ],
+            ),
+        )
+
+        guild_data = await fetch_guild_data(test_guild, "verifiedRole", "binds")
+
+        assert isinstance(guild_data, GuildData)
+        assert type(guild_data) is GuildData.projection("binds", "verifiedRole")
+        assert set(guild_data.model_fields) == {"id", "binds", "verifiedRole"}
+        assert guild_data.verifiedRole == "1"
+
+        # fields that were not projected come from the full model, with their defaults
+        assert guild_data.nicknameTemplate == "{smart-name}"
+        assert guild_data.full().verifiedRole == "1"
+        assert guild_data.full() is guild_data.full()
+
+    def test_projection_resets_full_model_on_assignment(self):
+        """Test that the full model reflects fields assigned on the projection"""
+
+        guild_data = GuildData.projection("verifiedRole")(id=1, verifiedRole="1")
+        assert guild_data.full().verifiedRole == "1"
+
+        guild_data.verifiedRole = "2"
+        assert guild_data.full().verifiedRole == "2"
+
+    def test_projection_runs_post_init(self):
+        """Test that projections normalise their fields like the schema, with the aspects they depend on"""
+
+        projection = GuildData.projection("verifiedRoleName")
+
+        assert projection is GuildData.projection("verifiedRole", "verifiedRoleName")
+
+        guild_data = projection(id=1, verifiedRole="5", verifiedRoleName="Verified")
+
+        assert guild_data.verifiedRoleName is None
+        assert guild_data.full().verifiedRoleName is None
+
+    def test_projection_without_role_fields_stays_lazy(self):
+        """Test that normalising a projection without the role fields does not build the full model"""
+
+        guild_data = GuildData.projection("binds")(id=1, binds=[])
+
+        assert guild_data._full is None  # pylint: disable=protected-access
+
+    def test_projection_assigns_missing_fields_to_full_model(self):
+        """Test that fields that were not projected can be assigned, and are kept by the full model"""
+
+        guild_data = GuildData.projection("verifiedRole")(id=1, verifiedRole="1")
+
+        guild_data.nicknameTemplate = "{roblox-name}"
+        guild_data.verifiedRole = "2"
+
+        assert guild_data.nicknameTemplate == "{roblox-name}"
+        assert guild_data.full().nicknameTemplate == "{roblox-name}"
+        assert guild_data.full().verifiedRole == "2"
+
+    def test_schema_validates_projection_as_full_model(self):
+        """Test that validating a projection with its schema gives the full schema"""
+
+        guild_data = GuildData.projection("verifiedRole")(id=1, verifiedRole="1")
+        validated_guild_data = GuildData.model_validate(guild_data)
+
+        assert type(validated_guild_data) is GuildData
+        assert validated_guild_data.verifiedRole == "1"
@@ -0,0 +1,33 @@
+from bloxlink_lib.models.schemas import DATABASE_INDEXES, DatabaseDomains
+from bloxlink_lib.test_utils.database import query_plan_stages
+
+
+class TestIndexSpec:
+    """Test the declared database indexes"""
+
+    def test_every_domain_declares_indexes(self):
+        """Test that no database domain is left out of the index spec"""
+
+        assert set(DATABASE_INDEXES) == set(DatabaseDomains)
+
+    def test_query_plan_stages(self):
+        """Test that the stages of nested query plans are all found"""
+
+        plan = {
+            "stage": "LIMIT",
+            "inputStage": {
+                "stage": "SORT_MERGE",
+                "inputStages": [
+                    {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}},
+                    {"stage": "COLLSCAN"},
+                ],
+            },
+        }
+
+        assert query_plan_stages(plan) == {
+            "LIMIT",
+            "SORT_MERGE",
+            "FETCH",
+            "IXSCAN",
+            "COLLSCAN",
+        }
@@ -0,0 +1,162 @@
+import enum
+import importlib
+from unittest.mock import AsyncMock, MagicMock
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+import pytest
+from bloxlink_lib.metrics import METRICS, MetricsRegistry, metrics_handler, size_bucket
+from bloxlink_lib.models.binds import BIND_EVALUATION_SECONDS, BindCriteria, GuildBind
+
+# the package re-exports functions under the same names as these modules
+fetch_module = importlib.import_module("bloxlink_lib.fetch")
+utils_module = importlib.import_module("bloxlink_lib.utils")
+
+
+class TestMetricsRegistry:
+    """Test the metrics registry and its text exposition"""
+
+    def test_counter_exposition(self):
+        """Test that counters are exposed per combination of labels, with escaped label values"""
+
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "A test counter.", ("result",))
+
+        counter.inc(result="hit")
+        counter.inc(2, result='"miss"')
+
+        assert registry.expose() == (
+            "# HELP test_total A test counter.\n"
+            "# TYPE test_total counter\n"
+            'test_total{result="hit"} 1\n'
+            'test_total{result="\\"miss\\""} 2\n'
+        )
+
+    def test_histogram_exposition(self):
+        """Test that histograms expose cumulative buckets, their sum and their count"""
+
+        registry = MetricsRegistry()
+        histogram = registry.histogram(
+            "test_seconds", "A test histogram.", ("host",), buckets=(0.1, 1)
+        )
+
+        histogram.observe(0.05, host="a")
+        histogram.observe(0.5, host="a")
+        histogram.observe(5, host="a")
+
+        assert registry.expose().splitlines()[2:] == [
+            'test_seconds_bucket{host="a",le="0.1"} 1',
+            'test_seconds_bucket{host="a",le="1"} 2',
+            'test_seconds_bucket{host="a",le="+Inf"} 3',
+            'test_seconds_sum{host="a"} 5.55',
+            'test_seconds_count{host="a"} 3',
+        ]
+
+    def test_registration(self):
+        """Test that registering a metric twice returns the same metric, and that labels are checked"""
+
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "A test counter.", ("result",))
+
+        assert registry.counter("test_total", "A test counter.", ("result",)) is counter
+
+        with pytest.raises(ValueError):
+            registry.histogram("test_total", "A test histogram.")
+
+        with pytest.raises(ValueError):
+            counter.inc(host="a")
+
+    @pytest.mark.parametrize(
+        "size,expected_bucket",
+        [(0, "0-10"), (10, "0-10"), (11, "11-50"), (1000, "251-1000"), (1001, "1001+")],
+    )
+    def test_size_bucket(self, size, expected_bucket):
+        """Test the labels of size buckets"""
+
+        assert size_bucket(size) == expected_bucket
+
+    @pytest.mark.asyncio()
+    async def test_metrics_handler(self):
+        """Test that the handler serves the metrics of the library"""
+
+        app = web.Application()
+        app.router.add_get("/metrics", metrics_handler)
+
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get("/metrics")
+
+            assert response.status == 200
+            assert response.content_type == "text/plain"
+            assert await response.text() == METRICS.expose()
+
+
+class TestInstrumentation:
+    """Test that the layers of the library record their metrics"""
+
+    @pytest.mark.asyncio()
+    async def test_fetch_latency(self):
+        """Test that requests are observed by host, endpoint and status, with IDs removed from the endpoint"""
+
+        async def _handler(_request: web.Request) -> web.Response:
+            return web.Response(text="{}")
+
+        app = web.Application()
+        app.router.add_get("/users/{user_id}/groups", _handler)
+
+        async with TestServer(app) as server:
+            labels = {
+                "host": server.host,
+                "endpoint": "/users/{id}/groups",
+                "status": "200",
+            }
+            observed = fetch_module.HTTP_REQUEST_SECONDS.count(**labels)
+
+            await fetch_module.fetch(
+                "GET", str(server.make_url("/users/123/groups")), parse_as="TEXT"
+            )
+
+        assert fetch_module.HTTP_REQUEST_SECONDS.count(**labels) == observed + 1
+
+    @pytest.mark.asyncio()
+    async def test_cached_request_hits(self, mocker):
+        """Test that cached requests count their hits and misses per cache type"""
+
+        class CacheType(enum.Enum):
+            TEST = "test"
+
+        async def fetch_value():
+            return {"value": 1}
+
+        redis_mock = mocker.patch.object(utils_module, "redis")
+        redis_mock.get = AsyncMock(side_effect=[None, '{"value": 1}'])
+        redis_mock.set = AsyncMock()
+
+        hits = utils_module.CACHED_REQUESTS.get(cache_type="test", result="hit")
+        misses = utils_module.CACHED_REQUESTS.get(cache_type="test", result="miss")
+
+        for _ in range(2):
+            request = fetch_value()
+            await utils_module.use_cached_request(
+                CacheType.TEST, 1, lambda data: data, request
+            )
+            request.close()
+
+        assert (
+            utils_module.CACHED_REQUESTS.get(cache_type="test", result="hit")
+            == hits + 1
+        )
+        assert (
+            utils_module.CACHED_REQUESTS.get(cache_type="test", result="miss")
+            == misses + 1
+        )
+
+    @pytest.mark.asyncio()
+    async def test_bind_evaluation_time(self):
+        """Test that bind evaluations are timed by bind type and the size of the guild"""
+
+        bind = GuildBind(roles=["1"], criteria=BindCriteria(type="unverified"))
+        labels = {"bind_type": "unverified", "guild_roles": "0-10"}
+        observed = BIND_EVALUATION_SECONDS.count(**labels)
+
+        await bind.satisfies_for(guild_roles={}, member=MagicMock(role_ids=[]))
+
+        assert BIND_EVALUATION_SECONDS.count(**labels) == observed + 1
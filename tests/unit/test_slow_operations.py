@@ -0,0 +1,115 @@
+import importlib
+import logging
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import pytest
+from bloxlink_lib.config import CONFIG
+from bloxlink_lib.slow_operations import record_operation, slow_operation
+
+slow_operations_module = importlib.import_module("bloxlink_lib.slow_operations")
+fetch_module = importlib.import_module("bloxlink_lib.fetch")
+
+
+class TestSlowOperations:
+    """Test the log of slow operations"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_limiter(self, mocker):
+        mocker.patch.object(
+            slow_operations_module, "_limiter", slow_operations_module._SlowLogLimiter()
+        )
+        mocker.patch.object(CONFIG, "SLOW_LOG_SAMPLE_RATE", 1)
+        mocker.patch.object(CONFIG, "SLOW_LOG_PER_SECOND", 5)
+
+    @staticmethod
+    def slow_records(caplog) -> list[dict]:
+        return [
+            record.slow_operation
+            for record in caplog.records
+            if hasattr(record, "slow_operation")
+        ]
+
+    def test_threshold(self, caplog):
+        """Test that only operations slower than their threshold are logged, with their fields and caller"""
+
+        with caplog.at_level(logging.WARNING):
+            record_operation("fast", 0.1, 1, key="a")
+            record_operation("slow", 2, 1, key="b", payload_size=10)
+
+        records = self.slow_records(caplog)
+
+        assert len(records) == 1
+        assert records[0]["operation"] == "slow"
+        assert records[0]["key"] == "b"
+        assert records[0]["duration"] == 2
+        assert records[0]["payload_size"] == 10
+        assert records[0]["caller"].startswith(__file__)
+
+    def test_context(self, caplog):
+        """Test that slow_operation() times its body, and logs the payload size set in it"""
+
+        with caplog.at_level(logging.WARNING):
+            with slow_operation("redis.hgetall", 0, "guilds:1") as timed_operation:
+                timed_operation.payload_size = 3
+
+        records = self.slow_records(caplog)
+
+        assert [(r["operation"], r["key"], r["payload_size"]) for r in records] == [
+            ("redis.hgetall", "guilds:1", 3)
+        ]
+
+    def test_rate_limit(self, caplog, mocker):
+        """Test that records beyond the rate limit are dropped, and counted in the next record"""
+
+        mocker.patch.object(CONFIG, "SLOW_LOG_PER_SECOND", 2)
+
+        with caplog.at_level(logging.WARNING):
+            for _ in range(5):
+                record_operation("slow", 2, 1)
+
+            assert len(self.slow_records(caplog)) == 2
+
+            # a second later the bucket is full again
+            slow_operations_module._limiter.updated_at -= 1
+            record_operation("slow", 2, 1)
+
+        records = self.slow_records(caplog)
+
+        assert len(records) == 3
+        assert records[-1]["suppressed"] == 3
+
+    def test_sampling(self, caplog, mocker):
+        """Test that slow operations that are not sampled are not logged"""
+
+        mocker.patch.object(CONFIG, "SLOW_LOG_SAMPLE_RATE", 0)
+
+        with caplog.at_level(logging.WARNING):
+            record_operation("slow", 2, 1)
+
+        assert not self.slow_records(caplog)
+
+    @pytest.mark.asyncio()
+    async def test_slow_fetch(self, caplog, mocker):
+        """Test that slow requests are logged with their endpoint, status and payload size"""
+
+        mocker.patch.object(CONFIG, "SLOW_FETCH_SECONDS", 0)
+
+        async def _handler(_request: web.Request) -> web.Response:
+            return web.Response(text="{}")
+
+        app = web.Application()
+        app.router.add_get("/users/{user_id}", _handler)
+
+        async with TestServer(app) as server:
+            with caplog.at_level(logging.WARNING):
+                await fetch_module.fetch(
+                    "GET", str(server.make_url("/users/1")), parse_as="TEXT"
+                )
+
+        records = self.slow_records(caplog)
+
+        assert len(records) == 1
+        assert records[0]["operation"] == "fetch"
+        assert records[0]["key"] == f"GET {server.host}/users/{{id}} (200)"
+        assert records[0]["payload_size"] == 2
+        assert records[0]["caller"].startswith(__file__)
@@ -0,0 +1,84 @@
+import importlib
+from unittest.mock import MagicMock
+import pytest
+from bloxlink_lib.config import CONFIG
+from bloxlink_lib.models.binds import BindCriteria, GuildBind
+from bloxlink_lib.tracing import NO_OP_SPAN, current_span, span, traced
+
+tracing_module = importlib.import_module("bloxlink_lib.tracing")
+binds_module = importlib.import_module("bloxlink_lib.models.binds")
+
+
+class TestTracing:
+    """Test the spans of the library"""
+
+    @pytest.fixture()
+    def enabled_tracing(self, mocker):
+        mocker.patch.object(CONFIG, "TRACING_ENABLED", True)
+        # the tests run without opentelemetry-api, so spans go to Sentry
+        mocker.patch.object(tracing_module, "otel_trace", None)
+
+    def test_disabled_spans(self, mocker):
+        """Test that disabled tracing shares one no-op span"""
+
+        mocker.patch.object(CONFIG, "TRACING_ENABLED", False)
+
+        assert span("test") is span("other")
+
+        with span("test", attribute=1) as test_span:
+            assert test_span is NO_OP_SPAN
+            assert current_span() is NO_OP_SPAN
+
+    def test_sentry_spans(self, enabled_tracing):
+        """Test that spans fall back to Sentry, without the attributes that are None"""
+
+        with span("test", attribute=1, missing=None) as test_span:
+            test_span.set_attribute("later", True)
+            data = test_span.sentry_span.to_json()
+
+            assert test_span.sentry_span.op == "test"
+            assert data["data"]["attribute"] == 1
+            assert data["data"]["later"] is True
+            assert "missing" not in data["data"]
+
+    @pytest.mark.asyncio()
+    async def test_traced(self, enabled_tracing):
+        """Test that traced coroutines run in their own span and keep their result"""
+
+        @traced("traced_test")
+        async def traced_test(value: int) -> int:
+            assert current_span().sentry_span.op == "traced_test"
+            return value
+
+        assert await traced_test(1) == 1
+
+    @pytest.mark.asyncio()
+    async def test_bind_evaluation_span(self, enabled_tracing, mocker):
+        """Test that bind evaluations record the bind and its outcome"""
+
+        start_span = mocker.spy(tracing_module, "_start_span")
+        bind = GuildBind(roles=["1"], criteria=BindCriteria(type="unverified"))
+
+        await bind.satisfies_for(guild_roles={}, member=MagicMock(role_ids=[]))
+
+        start_span.assert_called_once_with(
+            "bind.satisfies_for",
+            {
+                "bind.type": "unverified",
+                "bind.roles": 1,
+                "guild.roles": 0,
+                "roblox_user.verified": False,
+            },
+        )
+
+    @pytest.mark.asyncio()
+    async def test_bind_evaluation_without_tracing(self, mocker):
+        """Test that bind evaluations do not build span attributes while tracing is disabled"""
+
+        mocker.patch.object(CONFIG, "TRACING_ENABLED", False)
+        bind_span = mocker.spy(binds_module, "span")
+        bind = GuildBind(roles=["1"], criteria=BindCriteria(type="unverified"))
+
+        await bind.satisfies_for(guild_roles={}, member=MagicMock(role_ids=[]))
+
+        bind_span.assert_called_once_with("bind.satisfies_for")
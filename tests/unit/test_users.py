@@ -0,0 +1,507 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from bloxlink_lib.config import CONFIG
+from bloxlink_lib.exceptions import RobloxNotFound
+from bloxlink_lib.models.base import BaseResponse
+from bloxlink_lib.models.roblox.groups import GroupRoleset, RobloxGroup
+from bloxlink_lib.models.roblox import users
+from bloxlink_lib.test_utils.mockers import mock_redis_pipeline
+from bloxlink_lib.models.roblox.users import (
+    RobloxUser,
+    RobloxUserAvatar,
+    RobloxUserAvatarResponse,
+    UserAvatar,
+    RobloxUserGroup,
+    fetch_user_groups,
+    get_accounts,
+    sync_users,
+)
+from bloxlink_lib.models.schemas.users import (
+    UserData,
+)  # pylint: disable=no-name-in-module
+
+
+class TestGetAccounts:
+    """Test getting the linked accounts of a user"""
+
+    @pytest.mark.asyncio()
+    async def test_get_accounts_syncs_concurrently(self, mocker):
+        """Test that linked accounts are synced concurrently, and avatars are resolved in one request"""
+
+        mocker.patch.object(
+            users,
+            "fetch_user_data",
+            new_callable=AsyncMock,
+            return_value=UserData(
+                id=1,
+                robloxID="10",
+                robloxAccounts={"guilds": {"1": "10", "2": "20", "3": "30"}},
+            ),
+        )
+
+        running_syncs = 0
+        max_running_syncs = 0
+
+        async def _sync(self: RobloxUser, includes, *, resolve_avatar: bool):
+            nonlocal running_syncs, max_running_syncs
+
+            assert includes == ["groups"]
+            assert not resolve_avatar
+
+            running_syncs += 1
+            max_running_syncs = max(max_running_syncs, running_syncs)
+            await asyncio.sleep(0)
+            running_syncs -= 1
+
+            if self.id == 30:
+                raise RobloxNotFound()
+
+            self.avatar = UserAvatar(
+                bustThumbnail="", headshotThumbnail="", fullBody=""
+            )
+
+        sync_mock = mocker.patch.object(
+            RobloxUser, "sync", autospec=True, side_effect=_sync
+        )
+        fetch_mock = mocker.patch.object(
+            users,
+            "fetch_typed",
+            new_callable=AsyncMock,
+            return_value=(
+                RobloxUserAvatarResponse(
+                    data=[
+                        RobloxUserAvatar(targetId=i, state="Completed", imageUrl=str(i))
+                        for i in (10, 20)
+                    ]
+                ),
+                MagicMock(status=200),
+            ),
+        )
+
+        mock_redis_pipeline(mocker)
+
+        accounts = await get_accounts(1, sync=True, includes=["groups"], concurrency=2)
+
+        assert sorted(account.id for account in accounts) == [10, 20, 30]
+        assert sync_mock.await_count == 3
+        assert max_running_syncs == 2
+
+        fetch_mock.assert_awaited_once()
+        requested_ids = fetch_mock.await_args.args[1].split("userIds=")[1].split("&")[0]
+        assert sorted(requested_ids.split(",")) == ["10", "20"]
+        assert {account.id: account.avatar_url for account in accounts} == {
+            10: "10",
+            20: "20",
+            30: None,
+        }
+
+
+class TestUserProfileCache:
+    """Test the profile cache of Roblox users"""
+
+    @staticmethod
+    def _cached_base(roblox_id: int) -> RobloxUser:
+        return RobloxUser(
+            id=roblox_id,
+            name="john",
+            displayName="John",
+            profileLink="https://www.roblox.com/users/1/profile",
+            created="2020-01-01T00:00:00Z",
+            avatar=UserAvatar(bustThumbnail="", headshotThumbnail="", fullBody=""),
+        )
+
+    @pytest.mark.asyncio()
+    async def test_sync_only_fetches_missing_groups(self, mocker):
+        """Test that cached base data is merged, and only the groups are fetched"""
+
+        mocker.patch.object(
+            users,
+            "_read_cached_user_profile",
+            new_callable=AsyncMock,
+            return_value={
+                "base": self._cached_base(1),
+                "groups": None,
+                "avatar_url": "https://avatar",
+            },
+        )
+        fetch_groups_mock = mocker.patch.object(
+            users,
+            "fetch_user_groups",
+            new_callable=AsyncMock,
+            return_value={"groups": {}},
+        )
+        fetch_mock = mocker.patch.object(users, "fetch_typed", new_callable=AsyncMock)
+        pipeline = mock_redis_pipeline(mocker)
+
+        roblox_user = RobloxUser(id=1)
+        await roblox_user.sync(["groups"])
+
+        fetch_mock.assert_not_awaited()
+        fetch_groups_mock.assert_awaited_once_with(1)
+
+        assert roblox_user.username == "john"
+        assert roblox_user.avatar_url == "https://avatar"
+        assert roblox_user.age_days is not None
+        assert [c.args[0] for c in pipeline.set.await_args_list] == [
+            "roblox_users:1:groups"
+        ]
+
+    @pytest.mark.asyncio()
+    async def test_sync_caches_each_part(self, mocker):
+        """Test that a cold sync fetches from the bot API and caches the parts it fetched"""
+
+        mocker.patch.object(
+            users,
+            "_read_cached_user_profile",
+            new_callable=AsyncMock,
+            return_value={"base": None, "groups": None, "avatar_url": None},
+        )
+        fetch_mock = mocker.patch.object(
+            users,
+            "fetch_typed",
+            new_callable=AsyncMock,
+            return_value=(self._cached_base(1), MagicMock(status=200)),
+        )
+        pipeline = mock_redis_pipeline(mocker)
+
+        roblox_user = RobloxUser(id=1)
+        await roblox_user.sync(["groups"], resolve_avatar=False)
+
+        fetch_mock.assert_awaited_once()
+        assert [c.args[0] for c in pipeline.set.await_args_list] == [
+            "roblox_users:1:base",
+            "roblox_users:1:groups",
+        ]
+        assert (
+            RobloxUser.model_validate_json(
+                pipeline.set.await_args_list[0].args[1]
+            ).username
+            == "john"
+        )
+
+    @pytest.mark.asyncio()
+    async def test_sync_keeps_includes(self, mocker):
+        """Test that groups found in the cache are not removed from the includes of the caller or the module"""
+
+        mocker.patch.object(
+            users,
+            "_read_cached_user_profile",
+            new_callable=AsyncMock,
+            return_value={
+                "base": self._cached_base(1),
+                "groups": {},
+                "avatar_url": "https://avatar",
+            },
+        )
+        mocker.patch.object(users, "fetch_user_groups", new_callable=AsyncMock)
+        mock_redis_pipeline(mocker)
+
+        includes = ["groups"]
+
+        for _ in range(2):
+            await RobloxUser(id=1).sync(True)
+            await RobloxUser(id=1).sync(includes)
+
+        assert includes == ["groups"]
+        assert users.VALID_INFO_SERVER_SCOPES == ["groups", "badges"]
+
+
+class TestSyncUsers:
+    """Test syncing many Roblox users at once"""
+
+    @pytest.mark.asyncio()
+    async def test_sync_users_batches_ids(self, mocker):
+        """Test that users are fetched in batches, and each batch is validated as one list"""
+
+        mocker.patch.object(CONFIG, "BOT_API_BATCH_USERS", True)
+
+        async def _fetch(method, url, *, params, parse_as):
+            roblox_ids = [int(roblox_id) for roblox_id in params["ids"].split(",")]
+
+            return (
+                parse_as(
+                    success=True,
+                    data=[
+                        {
+                            "id": roblox_id,
+                            "name": f"user{roblox_id}",
+                            "created": "2020-01-01T00:00:00Z",
+                            "profileLink": f"https://www.roblox.com/users/{roblox_id}/profile",
+                            "avatar": {
+                                "bustThumbnail": "",
+                                "headshotThumbnail": "",
+                                "fullBody": "",
+                            },
+                        }
+                        for roblox_id in roblox_ids
+                        if roblox_id != 3
+                    ],
+                ),
+                MagicMock(status=200),
+            )
+
+        mocker.patch(
+            "bloxlink_lib.database.redis.redis.mget",
+            new_callable=AsyncMock,
+            side_effect=lambda keys: [None for _ in keys],
+        )
+        mock_redis_pipeline(mocker)
+        fetch_mock = mocker.patch.object(
+            users, "fetch", new_callable=AsyncMock, side_effect=_fetch
+        )
+        sync_mock = mocker.patch.object(RobloxUser, "sync", new_callable=AsyncMock)
+
+        roblox_users = [RobloxUser(id=roblox_id) for roblox_id in (1, 2, 3, 4, 5, 1)]
+
+        synced_users = [
+            roblox_user
+            async for roblox_user in sync_users(roblox_users, ["groups"], batch_size=2)
+        ]
+
+        assert fetch_mock.await_count == 3
+        assert (
+            fetch_mock.await_args.kwargs["parse_as"] is BaseResponse[list[RobloxUser]]
+        )
+        assert fetch_mock.await_args.kwargs["params"]["include"] == "groups"
+        sync_mock.assert_not_awaited()
+
+        assert sorted(roblox_user.id for roblox_user in synced_users) == [1, 2, 4, 5]
+        assert roblox_users[0] in synced_users
+        assert roblox_users[0].username == "user1"
+        assert roblox_users[0].age_days is not None
+        assert roblox_users[2].username is None
+
+    @pytest.mark.asyncio()
+    async def test_sync_users_batches_use_profile_cache(self, mocker):
+        """Test that batched users are served from the profile cache, and only missing users are fetched and cached"""
+
+        mocker.patch.object(CONFIG, "BOT_API_BATCH_USERS", True)
+
+        cached_user = TestUserProfileCache._cached_base(1)
+        cached_user.groups = {}
+        # the groups of user 2 are not cached
+        cached_parts = {
+            "roblox_users:1:base": cached_user.model_dump_json(
+                exclude={"groups"}, by_alias=True, exclude_none=True
+            ),
+            "roblox_users:1:groups": cached_user.model_dump_json(
+                include={"groups"}, by_alias=True
+            ),
+            "roblox_users:1:avatar_url": "https://avatar",
+            "roblox_users:2:base": TestUserProfileCache._cached_base(2).model_dump_json(
+                by_alias=True, exclude_none=True
+            ),
+        }
+
+        mget_mock = mocker.patch(
+            "bloxlink_lib.database.redis.redis.mget",
+            new_callable=AsyncMock,
+            side_effect=lambda keys: [cached_parts.get(key) for key in keys],
+        )
+        fetch_mock = mocker.patch.object(
+            users,
+            "fetch",
+            new_callable=AsyncMock,
+            return_value=(
+                BaseResponse[list[RobloxUser]](
+                    success=True,
+                    data=[
+                        TestUserProfileCache._cached_base(roblox_id)
+                        for roblox_id in (2, 3)
+                    ],
+                ),
+                MagicMock(status=200),
+            ),
+        )
+        pipeline = mock_redis_pipeline(mocker)
+
+        roblox_users = [RobloxUser(id=roblox_id) for roblox_id in (1, 2, 3)]
+
+        synced_users = [
+            roblox_user async for roblox_user in sync_users(roblox_users, ["groups"])
+        ]
+
+        mget_mock.assert_awaited_once()
+        assert fetch_mock.await_args.kwargs["params"]["ids"] == "2,3"
+        assert sorted(roblox_user.id for roblox_user in synced_users) == [1, 2, 3]
+        assert roblox_users[0].username == "john"
+        assert roblox_users[0].avatar_url == "https://avatar"
+        assert sorted(c.args[0] for c in pipeline.set.await_args_list) == [
+            "roblox_users:2:base",
+            "roblox_users:2:groups",
+            "roblox_users:3:base",
+            "roblox_users:3:groups",
+        ]
+
+    @pytest.mark.asyncio()
+    async def test_sync_users_falls_back_to_single_requests(self, mocker):
+        """Test that users are synced concurrently one by one without a batch endpoint, and failed users are skipped"""
+
+        mocker.patch.object(CONFIG, "BOT_API_BATCH_USERS", False)
+
+        async def _sync(self: RobloxUser, includes, *, resolve_avatar: bool):
+            assert includes == ["groups"]
+            assert not resolve_avatar
+
+            if self.id == 2:
+                raise RobloxNotFound()
+
+            if self.id == 3:
+                return False
+
+            self.username = f"user{self.id or 0}"
+
+            return True
+
+        sync_mock = mocker.patch.object(
+            RobloxUser, "sync", autospec=True, side_effect=_sync
+        )
+        fetch_mock = mocker.patch.object(users, "fetch", new_callable=AsyncMock)
+
+        synced_users = [
+            roblox_user
+            async for roblox_user in sync_users(
+                [
+                    RobloxUser(id=1),
+                    RobloxUser(id=2),
+                    RobloxUser(id=1),
+                    RobloxUser(id=3),
+                    RobloxUser(name="john"),
+                ],
+                ["groups"],
+            )
+        ]
+
+        fetch_mock.assert_not_awaited()
+        assert sync_mock.await_count == 4
+        assert sorted(roblox_user.username for roblox_user in synced_users) == [
+            "user0",
+            "user1",
+        ]
+
+
+class TestReverseLookupPages:
+    """Test the cursors of paginated reverse lookups"""
+
+    @staticmethod
+    def mock_users(mocker, *pages: list[int | str]) -> MagicMock:
+        """Serve the _ids of each page in order, from the users collection."""
+
+        users_collection = MagicMock()
+        users_collection.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(
+            side_effect=[[{"_id": user_id} for user_id in page] for page in pages]
+        )
+        mocker.patch.object(
+            users, "mongo", MagicMock(bloxlink={"users": users_collection})
+        )
+
+        return users_collection
+
+    @pytest.mark.asyncio()
+    @pytest.mark.parametrize("last_id", [2, "000002"])
+    async def test_cursor_keeps_id_type(self, mocker, last_id):
+        """Test that continuing from a cursor queries after an _id of the same type as the last one"""
+
+        self.mock_users(mocker, [1, last_id])
+        page = await anext(users.reverse_lookup_pages(RobloxUser(id=1000), page_size=2))
+
+        users_collection = self.mock_users(mocker, [3], [])
+        await anext(
+            users.reverse_lookup_pages(
+                RobloxUser(id=1000), page_size=2, after=page.cursor
+            )
+        )
+
+        assert users_collection.find.call_args_list[0].args[0]["_id"] == {
+            "$type": "string" if isinstance(last_id, str) else "number",
+            "$gt": last_id,
+        }
+
+    @pytest.mark.asyncio()
+    async def test_pages_continue_from_numbers_to_strings(self, mocker):
+        """Test that users with number _ids are read first, and a page continues into the string _ids"""
+
+        users_collection = self.mock_users(mocker, [1, 2], ["000003"], ["000004"])
+        pages = [
+            page
+            async for page in users.reverse_lookup_pages(
+                RobloxUser(id=1000), page_size=3
+            )
+        ]
+
+        assert [page.discord_ids for page in pages] == [[1, 2, 3], [4]]
+        assert pages[0].cursor == "str:000003"
+        assert [
+            call.args[0]["_id"] for call in users_collection.find.call_args_list
+        ] == [
+            {"$type": "number"},
+            {"$type": "string"},
+            {"$type": "string", "$gt": "000003"},
+        ]
+
+    @pytest.mark.asyncio()
+    async def test_invalid_cursor(self, mocker):
+        """Test that cursors that were not made by reverse_lookup_pages() are rejected"""
+
+        self.mock_users(mocker, [])
+
+        with pytest.raises(ValueError):
+            await anext(
+                users.reverse_lookup_pages(RobloxUser(id=1000), after="000002"),
+                None,
+            )
+
+
+class TestUserGroups:
+    """Test fetching the groups of a user"""
+
+    @pytest.mark.asyncio()
+    async def test_fetch_user_groups_streams_memberships(self, mocker):
+        """Test that memberships are collected from the streamed list, keeping only the group id and name"""
+
+        async def _fetch_list_items(url, item_model):
+            for group_id in (1, 2):
+                yield item_model.model_validate(
+                    {
+                        "group": {
+                            "id": group_id,
+                            "name": f"Group {group_id}",
+                            "description": "",
+                            "memberCount": 10,
+                            "hasVerifiedBadge": False,
+                        },
+                        "role": {"id": 5, "name": "Member", "rank": 1},
+                    }
+                )
+
+        mocker.patch.object(users, "fetch_list_items", new=_fetch_list_items)
+
+        user_groups = await fetch_user_groups(1)
+
+        assert list(user_groups["groups"]) == [1, 2]
+        assert user_groups["groups"][2].group.name == "Group 2"
+        assert user_groups["groups"][2].role.name == "Member"
+
+    @pytest.mark.asyncio()
+    async def test_fetch_user_groups_failure(self, mocker):
+        """Test that no groups are returned if the request fails"""
+
+        async def _fetch_list_items(url, item_model):
+            raise RobloxNotFound()
+            yield  # pylint: disable=unreachable
+
+        mocker.patch.object(users, "fetch_list_items", new=_fetch_list_items)
+
+        assert await fetch_user_groups(1) is None
+
+    def test_membership_from_group_entity(self):
+        """Test that a membership can still be built from a full RobloxGroup"""
+
+        membership = RobloxUserGroup(
+            group=RobloxGroup(id=1, name="Group"),
+            role=GroupRoleset(id=5, name="Member", rank=1),
+        )
+
+        assert membership.group.id == 1
+        assert membership.group.name == "Group"
@@ -0,0 +1,50 @@
+from pydantic import ConfigDict, Field
+from bloxlink_lib.models.base import BaseModel
+from bloxlink_lib.utils import parse_into
+
+
+class ParsedModel(BaseModel):
+    id: int
+    display_name: str = Field(alias="displayName", default=None)
+
+
+class StrictParsedModel(ParsedModel):
+    model_config = ConfigDict(extra="forbid")
+
+
+class TestParseInto:
+    """Test parsing response data into models"""
+
+    def test_parse_dict_ignores_extra_fields(self):
+        """Test that unknown fields are dropped and aliases are respected"""
+
+        parsed = parse_into({"id": 1, "displayName": "John", "extra": 2}, ParsedModel)
+
+        assert parsed == ParsedModel(id=1, displayName="John")
+
+    def test_parse_json_body(self):
+        """Test that a raw JSON body is validated directly"""
+
+        parsed = parse_into(
+            b'{"id": 1, "displayName": "John", "extra": 2}', ParsedModel
+        )
+
+        assert parsed == ParsedModel(id=1, displayName="John")
+
+    def test_parse_filters_models_that_forbid_extra_fields(self):
+        """Test that models which forbid extra fields only receive the fields they know"""
+
+        parsed = parse_into(
+            {"id": 1, "displayName": "John", "extra": 2}, StrictParsedModel
+        )
+        parsed_json = parse_into(
+            b'{"id": 1, "display_name": "John"}', StrictParsedModel
+        )
+
+        assert parsed.display_name == parsed_json.display_name == "John"
+
+    def test_parse_non_models(self):
+        """Test that other types are constructed from keyword arguments"""
+
+        assert parse_into({"a": 1}, dict) == {"a": 1}
+        assert parse_into(b'{"a": 1}', dict) == {"a": 1}